@@ -0,0 +1,12 @@
+from typing import Annotated
+from fastapi import Depends, Request
+from app.services.container import ServiceContainer
+
+def get_services(request: Request) -> ServiceContainer:
+    """返回lifespan中创建的服务容器；未执行lifespan时（如不进入上下文的TestClient）首次请求时创建"""
+    services = getattr(request.app.state, "services", None)
+    if services is None:
+        services = request.app.state.services = ServiceContainer()
+    return services
+
+Services = Annotated[ServiceContainer, Depends(get_services)]
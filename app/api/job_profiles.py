@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException
+from app.models.schemas import JobProfileCreate, JobProfile
+from app.api.dependencies import Services
+
+router = APIRouter()
+
+@router.post("/job-profiles", response_model=JobProfile)
+async def create_job_profile(profile_data: JobProfileCreate, services: Services):
+    """解析岗位HC并返回画像ID，后续接口可用该ID代替HC原文"""
+    if not profile_data.job_hc.strip():
+        raise HTTPException(status_code=400, detail="岗位描述不能为空")
+    try:
+        return await services.profiles.create_profile(profile_data.job_hc)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"岗位画像创建失败: {str(e)}")
+
+@router.get("/job-profiles/{profile_id}", response_model=JobProfile)
+async def get_job_profile(profile_id: str, services: Services):
+    profile = services.profiles.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"岗位画像不存在或已过期: {profile_id}")
+    return profile
+
+@router.delete("/job-profiles/{profile_id}")
+async def delete_job_profile(profile_id: str, services: Services):
+    services.profiles.delete_profile(profile_id)
+    return {"status": "ok", "profile_id": profile_id}
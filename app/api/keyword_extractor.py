@@ -1,22 +1,35 @@
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import ParsedResume, ExtractedKeywords, ResumeUpload
-from app.services.keyword_extractor import KeywordExtractorService
+from app.models.schemas import ParsedResume, ExtractedKeywords, JobResumeUpload
+from app.api.dependencies import Services
+from app.services.executors import get_stage_executor
+from app.core.cache import all_cache_stats
 
 router = APIRouter()
-extractor_service = KeywordExtractorService()
 
 @router.post("/extract-keywords", response_model=ExtractedKeywords)
-async def extract_keywords(resume_data: ResumeUpload, parsed_resume: ParsedResume):
+async def extract_keywords(resume_data: JobResumeUpload, parsed_resume: ParsedResume, services: Services):
     try:
-        extracted_keywords = await extractor_service.extract_keywords(parsed_resume, resume_data.job_hc)
+        job_hc, job_keywords = services.profiles.resolve(resume_data.job_hc, resume_data.job_profile_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    try:
+        tokenized_resume = await get_stage_executor().tokenize_resume(parsed_resume)
+        extracted_keywords = await services.extractor.extract_keywords(parsed_resume, job_hc, job_keywords, tokenized_resume)
         return extracted_keywords
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"关键字提取失败: {str(e)}")
 
 @router.post("/analyze-match")
-async def analyze_resume_job_match(resume_data: ResumeUpload, parsed_resume: ParsedResume):
+async def analyze_resume_job_match(resume_data: JobResumeUpload, parsed_resume: ParsedResume, services: Services):
+    try:
+        job_hc, job_keywords = services.profiles.resolve(resume_data.job_hc, resume_data.job_profile_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
     try:
-        extracted_keywords = await extractor_service.extract_keywords(parsed_resume, resume_data.job_hc)
+        tokenized_resume = await get_stage_executor().tokenize_resume(parsed_resume)
+        extracted_keywords = await services.extractor.extract_keywords(parsed_resume, job_hc, job_keywords, tokenized_resume)
         
         analysis = {
             "relevance_score": extracted_keywords.relevance_score,
@@ -37,4 +50,9 @@ async def analyze_resume_job_match(resume_data: ResumeUpload, parsed_resume: Par
             "extracted_keywords": extracted_keywords
         }
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"匹配度分析失败: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=f"匹配度分析失败: {str(e)}")
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """各缓存的命中统计，用于评估节省的LLM调用"""
+    return all_cache_stats()
\ No newline at end of file
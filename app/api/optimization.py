@@ -1,83 +1,255 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from app.models.schemas import ResumeUpload, OptimizationResult
-from app.services.resume_parser import ResumeParserService
-from app.services.keyword_extractor import KeywordExtractorService  
-from app.services.resume_editor import ResumeEditorService
-from app.services.resume_renderer import ResumeRendererService
+import json
+from contextlib import aclosing
+from typing import Annotated, Any, AsyncIterator, Callable, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query, UploadFile, File
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.api.dependencies import Services
+from app.core.log import bind_process_id, get_logger
+from app.core.metrics import IN_FLIGHT, collect_stage_timings, stage
+from app.models.schemas import JobResumeUpload, ResumeUpload, OptimizationResult, EditSuggestion, ExtractedKeywords, JobStatus, ParsedResume
+from app.services.container import ServiceContainer
+from app.services.executors import get_stage_executor
+from app.services.job_queue import JobQueueFull, get_job_queue
+from app.services.optimization_history import PreviousOptimization
+from app.services.resume_editor import collect_fallback_sections
 import uuid
 from datetime import datetime
 
 router = APIRouter()
+logger = get_logger(__name__)
 
-parser_service = ResumeParserService()
-extractor_service = KeywordExtractorService()
-editor_service = ResumeEditorService()
-renderer_service = ResumeRendererService()
+# 完整流程的四个顶层阶段；LLM调用等子阶段的耗时计入其中
+PIPELINE_STAGES = ("parse", "extract", "edit", "render")
 
-@router.post("/optimize-resume", response_model=OptimizationResult)
-async def optimize_resume_complete(resume_data: ResumeUpload):
-    """完整的简历优化流程"""
-    try:
-        process_id = str(uuid.uuid4())
-        print(f"开始处理简历优化请求: {process_id}")
-        
+async def _run_optimization(services: ServiceContainer, resume_data: ResumeUpload, job_hc: str, job_keywords: Optional[List[str]], process_id: str,
+                            on_stage: Optional[Callable[[str, float], None]] = None) -> OptimizationResult:
+    """依次执行解析、关键字提取、编辑、渲染四个阶段；各阶段（含其中的LLM调用）耗时写入直方图，并通过on_stage回报
+
+    提供previous_process_id时与上次的结果逐部分比较，未改动的部分沿用上次的关键字、建议和渲染结果。
+    """
+    previous = _previous_optimization(services, resume_data)
+    with IN_FLIGHT.track(kind="optimize"), collect_stage_timings(on_stage) as stage_timings:
         # 1. 解析简历
-        print("步骤1: 解析简历")
+        logger.debug("步骤1: 解析简历")
         try:
-            parsed_resume = parser_service.parse_markdown_resume(resume_data.markdown_content)
-            print(f"简历解析完成 - 个人信息: {len(parsed_resume.personal_info)}, 技能: {len(parsed_resume.skills)}, 工作经历: {len(parsed_resume.work_experience)}, 项目: {len(parsed_resume.projects)}, 教育: {len(parsed_resume.education)}")
-            print(f"解析结果: personal_info={parsed_resume.personal_info}, skills={parsed_resume.skills[:3] if parsed_resume.skills else []}")
+            with stage("parse"):
+                parsed_resume = await get_stage_executor().parse_resume(resume_data.markdown_content)
+            logger.debug("简历解析完成", extra={
+                "personal_info": len(parsed_resume.personal_info), "skills": len(parsed_resume.skills),
+                "work_experience": len(parsed_resume.work_experience), "projects": len(parsed_resume.projects),
+                "education": len(parsed_resume.education)
+            })
         except Exception as e:
-            print(f"简历解析失败: {e}")
+            logger.warning(f"简历解析失败: {e}")
             raise HTTPException(status_code=400, detail=f"简历解析失败: {str(e)}")
         
         # 2. 提取关键字
-        print("步骤2: 提取关键字")
+        logger.debug("步骤2: 提取关键字")
         try:
-            extracted_keywords = await extractor_service.extract_keywords(parsed_resume, resume_data.job_hc)
-            print("关键字提取完成")
+            with stage("extract"):
+                extracted_keywords = await _extract_keywords(services, parsed_resume, job_hc, job_keywords, previous)
+            logger.debug("关键字提取完成")
         except Exception as e:
-            print(f"关键字提取失败: {e}")
+            logger.warning(f"关键字提取失败: {e}")
             raise HTTPException(status_code=400, detail=f"关键字提取失败: {str(e)}")
         
         # 3. 编辑简历
-        print("步骤3: 编辑简历")
+        logger.debug("步骤3: 编辑简历")
         try:
-            edited_resume = await editor_service.edit_resume(parsed_resume, extracted_keywords, resume_data.job_hc)
-            print("简历编辑完成")
+            reused = previous.reusable_suggestions(parsed_resume, extracted_keywords, job_hc) if previous else {}
+            with stage("edit"), collect_fallback_sections() as fallback_sections:
+                edited_resume = await services.editor.edit_resume(parsed_resume, extracted_keywords, job_hc, resume_data.max_concurrency, resume_data.edit_mode, resume_data.bypass_cache, reused)
+            logger.debug("简历编辑完成", extra={"reused_sections": len(reused)})
         except Exception as e:
-            print(f"简历编辑失败: {e}")
+            logger.warning(f"简历编辑失败: {e}")
             raise HTTPException(status_code=400, detail=f"简历编辑失败: {str(e)}")
         
         # 4. 渲染简历
-        print("步骤4: 渲染简历")
+        logger.debug("步骤4: 渲染简历")
         try:
-            rendered_resume = await renderer_service.render_resume(edited_resume)
-            print("简历渲染完成")
+            with stage("render"):
+                rendered_resume = previous.rendered_for(edited_resume) if previous else None
+                if rendered_resume is None:
+                    rendered_resume = await get_stage_executor().run_light(services.renderer.render, edited_resume)
+            logger.debug("简历渲染完成")
         except Exception as e:
-            print(f"简历渲染失败: {e}")
+            logger.warning(f"简历渲染失败: {e}")
             raise HTTPException(status_code=400, detail=f"简历渲染失败: {str(e)}")
         
-        print(f"简历优化完成: {process_id}")
+        logger.info("简历优化完成", extra={"seconds": round(sum(stage_timings.get(name, 0.0) for name in PIPELINE_STAGES), 3)})
         
-        return OptimizationResult(
+        result = OptimizationResult(
             original_resume=parsed_resume,
             extracted_keywords=extracted_keywords,
             edited_resume=edited_resume,
             rendered_resume=rendered_resume,
-            process_id=process_id
+            process_id=process_id,
+            stage_timings=dict(stage_timings) if resume_data.include_stage_timings else None,
+            reused_sections=[services.editor.section_names(parsed_resume)[index] for index in sorted(reused)] if previous else None
         )
+        services.history.save(result, job_hc, fallback_sections)
+        return result
+
+def _previous_optimization(services: ServiceContainer, resume_data: ResumeUpload) -> Optional[PreviousOptimization]:
+    # 要求重新生成建议时不沿用上次的结果
+    if not resume_data.previous_process_id or resume_data.bypass_cache:
+        return None
+    previous = services.history.get(resume_data.previous_process_id)
+    if previous is None:
+        logger.info("上次的优化结果不存在或已过期，重新完整处理", extra={"previous_process_id": resume_data.previous_process_id})
+    return previous
+
+async def _extract_keywords(services: ServiceContainer, parsed_resume: ParsedResume, job_hc: str, job_keywords: Optional[List[str]],
+                            previous: Optional[PreviousOptimization]) -> ExtractedKeywords:
+    extracted_keywords = previous.keywords_for(parsed_resume, job_hc) if previous else None
+    if extracted_keywords is None:
+        tokenized_resume = await get_stage_executor().tokenize_resume(parsed_resume)
+        extracted_keywords = await services.extractor.extract_keywords(parsed_resume, job_hc, job_keywords, tokenized_resume)
+    return extracted_keywords
+
+def _submit_job(services: ServiceContainer, resume_data: ResumeUpload, job_hc: str, job_keywords: Optional[List[str]], process_id: str) -> JSONResponse:
+    job_queue = get_job_queue()
+    
+    async def run(job: JobStatus) -> OptimizationResult:
+        def record_stage(stage: str, seconds: float):
+            # 顶层阶段完成即写回，轮询时可以看到进度；每次LLM调用等子阶段只更新内存，
+            # 避免SQLite存储下每次调用都在事件循环中同步写库，任务结束时随最终状态一并保存
+            job.stage_timings[stage] = seconds
+            if stage in PIPELINE_STAGES:
+                job_queue.store.save(job)
+        
+        with bind_process_id(job.process_id):
+            logger.info("开始处理异步简历优化任务")
+            try:
+                return await _run_optimization(services, resume_data, job_hc, job_keywords, job.process_id, record_stage)
+            except HTTPException as e:
+                raise RuntimeError(e.detail)
+    
+    try:
+        job = job_queue.submit(process_id, run)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    logger.info("简历优化任务已排队", extra={"process_id": process_id, "pending": job_queue.pending})
+    return JSONResponse(status_code=202, content=job.model_dump(mode="json"))
+
+@router.post("/optimize-resume", response_model=OptimizationResult, responses={202: {"model": JobStatus}})
+async def optimize_resume_complete(resume_data: JobResumeUpload, services: Services, async_mode: Annotated[bool, Query(alias="async")] = False):
+    """完整的简历优化流程；async=true时立即返回任务ID，通过 GET /jobs/{process_id} 查询进度和结果"""
+    try:
+        process_id = str(uuid.uuid4())
+        
+        try:
+            job_hc, job_keywords = services.profiles.resolve(resume_data.job_hc, resume_data.job_profile_id)
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        
+        if async_mode:
+            return _submit_job(services, resume_data, job_hc, job_keywords, process_id)
+        
+        with bind_process_id(process_id):
+            logger.info("开始处理简历优化请求")
+            return await _run_optimization(services, resume_data, job_hc, job_keywords, process_id)
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"简历优化过程中发生未知错误: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"简历优化过程中发生未知错误: {e}")
         raise HTTPException(status_code=500, detail=f"简历优化失败: {str(e)}")
 
+@router.get("/jobs/{process_id}", response_model=JobStatus)
+async def get_job(process_id: str):
+    """查询异步优化任务的状态、各阶段耗时和结果"""
+    job = get_job_queue().get(process_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return job
+
+STREAM_MEDIA_TYPES = {"sse": "text/event-stream", "ndjson": "application/x-ndjson"}
+
+def _format_event(event: str, data: Any, stream_format: str) -> str:
+    if stream_format == "ndjson":
+        return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _optimization_events(services: ServiceContainer, resume_data: ResumeUpload, job_hc: str, job_keywords: Optional[List[str]], stream_format: str) -> AsyncIterator[str]:
+    """依次产出各阶段结果；客户端断开时所在任务被取消，编辑阶段未完成的LLM调用随之取消"""
+    process_id = str(uuid.uuid4())
+    previous = _previous_optimization(services, resume_data)
+    # 生成器在同一个请求任务中迭代，process_id在各次yield之间保持绑定
+    with bind_process_id(process_id):
+        logger.info("开始处理流式简历优化请求")
+        yield _format_event("start", {"process_id": process_id}, stream_format)
+        
+        current_stage = "parse"
+        try:
+            with stage("parse"):
+                parsed_resume = await get_stage_executor().parse_resume(resume_data.markdown_content)
+            yield _format_event("parsed", parsed_resume.model_dump(mode="json"), stream_format)
+            
+            current_stage = "extract"
+            with stage("extract"):
+                extracted_keywords = await _extract_keywords(services, parsed_resume, job_hc, job_keywords, previous)
+            yield _format_event("keywords", extracted_keywords.model_dump(mode="json"), stream_format)
+            
+            # 每条建议在对应的LLM调用返回时立即推送，最终结果仍按简历原始顺序组装
+            current_stage = "edit"
+            section_results: Dict[int, List[EditSuggestion]] = {}
+            reused = previous.reusable_suggestions(parsed_resume, extracted_keywords, job_hc) if previous else {}
+            suggestions_iter = services.editor.iter_edit_suggestions(
+                parsed_resume, extracted_keywords, job_hc, resume_data.max_concurrency, resume_data.edit_mode, resume_data.bypass_cache, reused
+            )
+            with collect_fallback_sections() as fallback_sections:
+                async with aclosing(suggestions_iter) as results:
+                    async for index, section_suggestions in results:
+                        section_results.setdefault(index, []).extend(section_suggestions)
+                        for suggestion in section_suggestions:
+                            yield _format_event("suggestion", suggestion.model_dump(mode="json"), stream_format)
+            suggestions = [suggestion for index in sorted(section_results) for suggestion in section_results[index]]
+            edited_resume = await services.editor.build_edited_resume(parsed_resume, suggestions, job_hc)
+            yield _format_event("edited", edited_resume.model_dump(mode="json"), stream_format)
+            
+            current_stage = "render"
+            with stage("render"):
+                rendered_resume = previous.rendered_for(edited_resume) if previous else None
+                if rendered_resume is None:
+                    rendered_resume = await get_stage_executor().run_light(services.renderer.render, edited_resume)
+            yield _format_event("rendered", rendered_resume.model_dump(mode="json"), stream_format)
+            
+            # 保存结果，之后可以用这次的process_id增量优化
+            services.history.save(OptimizationResult(
+                original_resume=parsed_resume,
+                extracted_keywords=extracted_keywords,
+                edited_resume=edited_resume,
+                rendered_resume=rendered_resume,
+                process_id=process_id
+            ), job_hc, fallback_sections)
+            logger.info("流式简历优化完成")
+            yield _format_event("done", {"process_id": process_id}, stream_format)
+        except Exception as e:
+            logger.warning(f"流式简历优化失败({current_stage}): {e}")
+            yield _format_event("error", {"process_id": process_id, "stage": current_stage, "detail": str(e)}, stream_format)
+
+@router.post("/optimize-resume/stream")
+async def optimize_resume_stream(resume_data: JobResumeUpload, services: Services, format: str = "sse"):
+    """流式简历优化：每个阶段完成即推送结果，支持SSE（默认）和NDJSON"""
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format仅支持sse或ndjson")
+    
+    try:
+        job_hc, job_keywords = services.profiles.resolve(resume_data.job_hc, resume_data.job_profile_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return StreamingResponse(
+        _optimization_events(services, resume_data, job_hc, job_keywords, format),
+        media_type=STREAM_MEDIA_TYPES[format],
+        # 禁止代理缓冲，保证事件及时送达
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/optimize-resume-file")
-async def optimize_resume_from_file(file: UploadFile = File(...), job_hc: str = ""):
+async def optimize_resume_from_file(services: Services, file: UploadFile = File(...), job_hc: str = "", job_profile_id: Optional[str] = None):
     """从文件上传优化简历"""
     try:
         if not file.filename.endswith('.md'):
@@ -86,12 +258,13 @@ async def optimize_resume_from_file(file: UploadFile = File(...), job_hc: str =
         content = await file.read()
         markdown_content = content.decode('utf-8')
         
-        resume_data = ResumeUpload(
+        resume_data = JobResumeUpload(
             markdown_content=markdown_content,
-            job_hc=job_hc
+            job_hc=job_hc,
+            job_profile_id=job_profile_id
         )
         
-        return await optimize_resume_complete(resume_data)
+        return await optimize_resume_complete(resume_data, services)
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"文件处理失败: {str(e)}")
@@ -100,8 +273,8 @@ async def optimize_resume_from_file(file: UploadFile = File(...), job_hc: str =
 async def debug_parse_resume(resume_data: ResumeUpload):
     """调试简历解析功能"""
     try:
-        print("开始调试解析")
-        parsed_resume = parser_service.parse_markdown_resume(resume_data.markdown_content)
+        logger.debug("开始调试解析")
+        parsed_resume = await get_stage_executor().parse_resume(resume_data.markdown_content)
         
         return {
             "personal_info": parsed_resume.personal_info,
@@ -112,16 +285,14 @@ async def debug_parse_resume(resume_data: ResumeUpload):
             "raw_sections": parsed_resume.raw_sections
         }
     except Exception as e:
-        print(f"调试解析失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"调试解析失败: {e}")
         raise HTTPException(status_code=400, detail=f"调试解析失败: {str(e)}")
 
 @router.post("/test-data")
 async def test_data_models(resume_data: ResumeUpload):
     """测试数据模型是否正确"""
     try:
-        print(f"接收到的数据: markdown_content长度={len(resume_data.markdown_content)}, job_hc长度={len(resume_data.job_hc)}")
+        logger.debug("接收到的数据", extra={"content_length": len(resume_data.markdown_content), "job_hc_length": len(resume_data.job_hc)})
         return {
             "status": "ok", 
             "message": "数据接收成功",
@@ -129,9 +300,7 @@ async def test_data_models(resume_data: ResumeUpload):
             "job_hc_length": len(resume_data.job_hc)
         }
     except Exception as e:
-        print(f"数据验证错误: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"数据验证错误: {e}")
         raise HTTPException(status_code=400, detail=f"数据验证失败: {str(e)}")
 
 @router.get("/health")
@@ -0,0 +1,52 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from app.models.schemas import IndexResumesRequest, ResumeIndexQuery, RankingResult
+from app.core.config import settings
+from app.api.dependencies import Services
+
+router = APIRouter()
+
+@router.post("/resume-index/resumes")
+async def index_resumes(request: IndexResumesRequest, services: Services):
+    """将简历加入倒排索引，相同resume_id会覆盖旧版本"""
+    if not request.resumes:
+        raise HTTPException(status_code=400, detail="简历列表不能为空")
+    if len(request.resumes) > settings.rank_max_resumes:
+        raise HTTPException(status_code=400, detail=f"单次最多入库{settings.rank_max_resumes}份简历")
+    
+    try:
+        indexed = await services.resume_index.add_resumes(request.resumes)
+        return {"indexed": indexed, "stats": services.resume_index.index.stats()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"简历入库失败: {str(e)}")
+
+@router.delete("/resume-index/resumes/{resume_id}")
+async def remove_indexed_resume(resume_id: str, services: Services):
+    if not await services.resume_index.remove_resume(resume_id):
+        raise HTTPException(status_code=404, detail=f"简历不在索引中: {resume_id}")
+    return {"status": "ok", "resume_id": resume_id}
+
+@router.post("/resume-index/query", response_model=RankingResult)
+async def query_resume_index(query: ResumeIndexQuery, services: Services):
+    """用岗位关键字检索简历库，返回匹配度最高的top_k份简历"""
+    try:
+        job_hc, job_keywords = services.profiles.resolve(query.job_hc, query.job_profile_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    try:
+        return await services.resume_index.query(job_hc, job_keywords, max(1, query.top_k))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"简历检索失败: {str(e)}")
+
+@router.post("/resume-index/compact")
+async def compact_resume_index(services: Services):
+    """手动将增量变更合并为新的基础段"""
+    await asyncio.to_thread(services.resume_index.index.compact)
+    return services.resume_index.index.stats()
+
+@router.get("/resume-index/stats")
+async def get_resume_index_stats(services: Services):
+    return services.resume_index.index.stats()
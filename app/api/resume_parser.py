@@ -1,14 +1,13 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from app.models.schemas import ResumeUpload, ParsedResume
-from app.services.resume_parser import ResumeParserService
+from app.services.executors import get_stage_executor
 
 router = APIRouter()
-parser_service = ResumeParserService()
 
 @router.post("/parse-resume", response_model=ParsedResume)
 async def parse_resume(resume_data: ResumeUpload):
     try:
-        parsed_resume = parser_service.parse_markdown_resume(resume_data.markdown_content)
+        parsed_resume = await get_stage_executor().parse_resume(resume_data.markdown_content)
         return parsed_resume
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"简历解析失败: {str(e)}")
@@ -22,7 +21,7 @@ async def parse_resume_file(file: UploadFile = File(...)):
         content = await file.read()
         markdown_content = content.decode('utf-8')
         
-        parsed_resume = parser_service.parse_markdown_resume(markdown_content)
+        parsed_resume = await get_stage_executor().parse_resume(markdown_content)
         return parsed_resume
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"文件解析失败: {str(e)}")
\ No newline at end of file
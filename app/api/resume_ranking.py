@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException
+from app.models.schemas import RankResumesRequest, RankingResult
+from app.core.config import settings
+from app.api.dependencies import Services
+
+router = APIRouter()
+
+@router.post("/rank-resumes", response_model=RankingResult)
+async def rank_resumes(request: RankResumesRequest, services: Services):
+    """一个岗位对多份简历批量匹配，按匹配度从高到低返回"""
+    if not request.resumes:
+        raise HTTPException(status_code=400, detail="简历列表不能为空")
+    if len(request.resumes) > settings.rank_max_resumes:
+        raise HTTPException(status_code=400, detail=f"单次最多排序{settings.rank_max_resumes}份简历")
+    
+    try:
+        job_hc, job_keywords = services.profiles.resolve(request.job_hc, request.job_profile_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    try:
+        return await services.ranking.rank_resumes(request.resumes, job_hc, job_keywords)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"简历排序失败: {str(e)}")
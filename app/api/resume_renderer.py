@@ -1,15 +1,15 @@
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from app.models.schemas import EditedResume, RenderedResume
-from app.services.resume_renderer import ResumeRendererService
+from app.api.dependencies import Services
+from app.services.executors import get_stage_executor
 
 router = APIRouter()
-renderer_service = ResumeRendererService()
 
 @router.post("/render-resume", response_model=RenderedResume)
-async def render_resume(edited_resume: EditedResume):
+async def render_resume(edited_resume: EditedResume, services: Services):
     try:
-        rendered_resume = await renderer_service.render_resume(edited_resume)
+        rendered_resume = await get_stage_executor().run_light(services.renderer.render, edited_resume)
         return rendered_resume
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"简历渲染失败: {str(e)}")
@@ -17,18 +17,19 @@ async def render_resume(edited_resume: EditedResume):
 @router.post("/render-with-template", response_model=RenderedResume)
 async def render_with_template(
     edited_resume: EditedResume, 
+    services: Services,
     template: str = Query(default="modern", description="模板类型: modern, professional, creative, technical")
 ):
     try:
-        rendered_resume = await renderer_service.render_with_template(edited_resume, template)
+        rendered_resume = await get_stage_executor().run_light(services.renderer.render, edited_resume, template)
         return rendered_resume
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"模板渲染失败: {str(e)}")
 
 @router.post("/preview-html", response_class=HTMLResponse)
-async def preview_html(edited_resume: EditedResume):
+async def preview_html(edited_resume: EditedResume, services: Services):
     try:
-        rendered_resume = await renderer_service.render_resume(edited_resume)
+        rendered_resume = await get_stage_executor().run_light(services.renderer.render, edited_resume)
         return HTMLResponse(content=rendered_resume.html_content)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"HTML预览失败: {str(e)}")
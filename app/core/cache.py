@@ -0,0 +1,191 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.core.metrics import REGISTRY
+
+def make_cache_key(*parts: str) -> str:
+    """对各组成部分做内容寻址，得到稳定的缓存键"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x1f')  # 分隔符，避免 "ab"+"c" 与 "a"+"bc" 冲突
+    return digest.hexdigest()
+
+class TTLCache:
+    """进程内LRU缓存，条目超过ttl秒后失效"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class SQLiteCache:
+    """基于SQLite的磁盘缓存，值以JSON存储，进程重启后仍然有效"""
+
+    def __init__(self, db_path: str, namespace: str, ttl: float = 86400):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                self._conn.commit()
+                return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, payload, time.time() + self.ttl)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class TieredCache:
+    """内存LRU + 可选SQLite两级缓存，并统计命中情况"""
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 3600, db_path: Optional[str] = None):
+        self.name = name
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteCache(db_path, namespace=name, ttl=ttl) if db_path else None
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                # 回填内存层，后续请求不再访问磁盘
+                self.memory.set(key, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "size": len(self.memory),
+            "disk_enabled": self.disk is not None
+        }
+
+_caches: Dict[str, TieredCache] = {}
+_caches_lock = threading.Lock()
+
+def get_cache(name: str, maxsize: int = 1024, ttl: float = 3600, db_path: Optional[str] = None) -> TieredCache:
+    """按名称返回进程内共享的缓存，多个服务实例复用同一份数据和统计"""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = TieredCache(name, maxsize=maxsize, ttl=ttl, db_path=db_path)
+        return _caches[name]
+
+def all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+# 命中数由各缓存自行统计，抓取指标时读取
+REGISTRY.callback(
+    "qiulao_cache_hits_total", "缓存命中次数", "counter",
+    lambda: [({"cache": name, "tier": tier}, cache.memory_hits if tier == "memory" else cache.disk_hits)
+             for name, cache in list(_caches.items()) for tier in ("memory", "disk")]
+)
+REGISTRY.callback(
+    "qiulao_cache_misses_total", "缓存未命中次数", "counter",
+    lambda: [({"cache": name}, cache.misses) for name, cache in list(_caches.items())]
+)
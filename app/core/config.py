@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -11,7 +12,100 @@ class Settings(BaseSettings):
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
     enable_ai: bool = os.getenv("ENABLE_AI", "True").lower() == "true"
     
+    # LLM调用超时与重试（秒）：读取超时默认与总超时相同；连接池超时为等待空闲连接的时间
+    openai_timeout: float = float(os.getenv("OPENAI_TIMEOUT", "60"))
+    openai_connect_timeout: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10"))
+    openai_read_timeout: float = float(os.getenv("OPENAI_READ_TIMEOUT", os.getenv("OPENAI_TIMEOUT", "60")))
+    openai_pool_timeout: float = float(os.getenv("OPENAI_POOL_TIMEOUT", "10"))
+    openai_max_retries: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    
+    # LLM连接池：最大连接数、保持的空闲连接数、空闲连接保留时间（秒），以及是否使用HTTP/2（默认关闭；开启需另行安装h2，即 pip install "httpx[http2]"，未安装时仍使用HTTP/1.1）
+    llm_max_connections: int = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))
+    llm_max_keepalive_connections: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "32"))
+    llm_keepalive_expiry: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+    llm_http2: bool = os.getenv("LLM_HTTP2", "False").lower() == "true"
+    
+    # LLM并发控制：进程内全局上限，以及单个请求内的建议生成并发数
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+    suggestion_concurrency: int = int(os.getenv("SUGGESTION_CONCURRENCY", "8"))
+    # 建议生成使用流式输出，逐条解析；网关不支持流式时关闭
+    llm_streaming: bool = os.getenv("LLM_STREAMING", "True").lower() == "true"
+    
+    # 简历编辑模式：per_section（每段一次LLM调用）或 batched（整份简历一次调用）
+    edit_mode: Literal["per_section", "batched"] = os.getenv("EDIT_MODE", "per_section")
+    
+    # 岗位关键字缓存：内存LRU条目数、过期时间（秒），以及可选的SQLite文件路径
+    keyword_cache_size: int = int(os.getenv("KEYWORD_CACHE_SIZE", "1024"))
+    keyword_cache_ttl: float = float(os.getenv("KEYWORD_CACHE_TTL", "86400"))
+    keyword_cache_db: str = os.getenv("KEYWORD_CACHE_DB", "")
+    
+    # 编辑建议的LLM回复缓存：按prompt指纹命中，内存LRU条目数、过期时间（秒），以及可选的SQLite文件路径
+    suggestion_cache_size: int = int(os.getenv("SUGGESTION_CACHE_SIZE", "2048"))
+    suggestion_cache_ttl: float = float(os.getenv("SUGGESTION_CACHE_TTL", "86400"))
+    suggestion_cache_db: str = os.getenv("SUGGESTION_CACHE_DB", "")
+    
+    # 岗位画像存储：条目数、过期时间（秒），以及可选的SQLite文件路径
+    job_profile_cache_size: int = int(os.getenv("JOB_PROFILE_CACHE_SIZE", "1000"))
+    job_profile_ttl: float = float(os.getenv("JOB_PROFILE_TTL", "604800"))
+    job_profile_db: str = os.getenv("JOB_PROFILE_DB", "")
+    
+    # 优化结果历史（供增量优化沿用未改动部分的结果）：条目数、过期时间（秒），以及可选的SQLite文件路径
+    optimization_history_size: int = int(os.getenv("OPTIMIZATION_HISTORY_SIZE", "1000"))
+    optimization_history_ttl: float = float(os.getenv("OPTIMIZATION_HISTORY_TTL", "86400"))
+    optimization_history_db: str = os.getenv("OPTIMIZATION_HISTORY_DB", "")
+    
+    # 异步优化任务：worker数量、排队上限（超出时返回503）、任务状态保留时间（秒）、内存中保留的条数，以及可选的SQLite文件路径
+    job_workers: int = int(os.getenv("JOB_WORKERS", "4"))
+    job_queue_size: int = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+    job_ttl: float = float(os.getenv("JOB_TTL", "86400"))
+    job_store_size: int = int(os.getenv("JOB_STORE_SIZE", "1000"))
+    job_store_db: str = os.getenv("JOB_STORE_DB", "")
+    
+    # 批量简历排序：进程池大小（0表示CPU核数）、启用进程池的最小简历数、单次请求上限
+    rank_workers: int = int(os.getenv("RANK_WORKERS", "0"))
+    rank_parallel_threshold: int = int(os.getenv("RANK_PARALLEL_THRESHOLD", "8"))
+    rank_max_resumes: int = int(os.getenv("RANK_MAX_RESUMES", "1000"))
+    
+    # 简历倒排索引：存储目录，以及累计多少次变更后合并为新的基础段
+    resume_index_dir: str = os.getenv("RESUME_INDEX_DIR", "data/resume_index")
+    resume_index_compact_threshold: int = int(os.getenv("RESUME_INDEX_COMPACT_THRESHOLD", "1000"))
+    
+    # 技能词表：文件路径（为空时使用内置词表），以及检查文件变化的间隔（秒，0表示不热加载）
+    skill_taxonomy_path: str = os.getenv("SKILL_TAXONOMY_PATH", "")
+    skill_taxonomy_reload_interval: float = float(os.getenv("SKILL_TAXONOMY_RELOAD_INTERVAL", "5"))
+    
+    # 相关度评分：BM25参数；分区权重格式为 分区=权重，逗号分隔
+    bm25_k1: float = float(os.getenv("BM25_K1", "1.2"))
+    bm25_b: float = float(os.getenv("BM25_B", "0.75"))
+    section_weights: str = os.getenv("SECTION_WEIGHTS", "skills=2.0,work_experience=1.0,responsibilities=1.0,projects=1.5")
+    
+    # 语义匹配：默认关闭；开启后用本地哈希向量为未精确命中的岗位关键字查找相近的简历句子
+    semantic_match: bool = os.getenv("SEMANTIC_MATCH", "False").lower() == "true"
+    semantic_dim: int = int(os.getenv("SEMANTIC_DIM", "512"))
+    semantic_threshold: float = float(os.getenv("SEMANTIC_THRESHOLD", "0.5"))
+    semantic_top_k: int = int(os.getenv("SEMANTIC_TOP_K", "3"))
+    semantic_vector_dir: str = os.getenv("SEMANTIC_VECTOR_DIR", "data/semantic_vectors")
+    # 句子向量缓存的条目上限（每条约dim*4字节），超出时只保留最近使用的条目，0表示不限制
+    semantic_vector_max_entries: int = int(os.getenv("SEMANTIC_VECTOR_MAX_ENTRIES", "100000"))
+    
+    # jieba预热：启动时构建词典；缓存文件可在构建镜像时预先生成，自定义词典为可选的jieba格式词典
+    jieba_warmup: bool = os.getenv("JIEBA_WARMUP", "True").lower() == "true"
+    jieba_cache_file: str = os.getenv("JIEBA_CACHE_FILE", "")
+    jieba_user_dict: str = os.getenv("JIEBA_USER_DICT", "")
+    
+    # 日志：级别、格式（json或text），以及DEBUG日志的采样比例（按请求采样，1表示全部输出）
+    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_format: str = os.getenv("LOG_FORMAT", "json")
+    log_debug_sample_rate: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+    
+    # CPU密集阶段的执行方式：process（解析、分词放入进程池，渲染放入线程池）、thread（全部放入线程池）、inline（在事件循环中执行）；
+    # 线程池和进程池大小（进程数0表示CPU核数），以及启动时是否预先拉起全部worker进程
+    cpu_executor: str = os.getenv("CPU_EXECUTOR", "process")
+    executor_thread_workers: int = int(os.getenv("EXECUTOR_THREAD_WORKERS", "8"))
+    executor_process_workers: int = int(os.getenv("EXECUTOR_PROCESS_WORKERS", "0"))
+    executor_prewarm: bool = os.getenv("EXECUTOR_PREWARM", "True").lower() == "true"
+    
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,87 @@
+import json
+import re
+from typing import Any, Iterable, List, Tuple
+
+class JSONArrayStreamParser:
+    """增量解析流式文本中指定键下的JSON对象数组
+
+    每收到一段文本调用一次feed，数组中的对象一闭合就被解析返回，无需等待完整回复。
+    只识别 "键": [ 的形式，之前或之后的说明文字、```json 代码块标记都会被忽略；
+    无法解析的对象直接跳过。
+    """
+
+    # 键与左括号之间允许的最大空白长度，用于处理键被截断在两段文本之间的情况
+    _LOOKBEHIND = 64
+
+    def __init__(self, keys: Iterable[str]):
+        self._key_pattern = re.compile(r'"(' + '|'.join(re.escape(key) for key in keys) + r')"\s*:\s*\[')
+        self._buffer = ""
+        self._pos = 0
+        self._state = "search"  # search: 查找数组 / array: 数组内等待对象 / object: 对象内
+        self._key = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start = 0
+        self.opened_keys: List[str] = []  # 已经出现的数组键，按出现顺序
+        self.closed_keys: List[str] = []  # 已经闭合的数组键
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """追加一段文本，返回本次新闭合的(键, 对象)列表"""
+        self._buffer += chunk
+        results = []
+        buffer = self._buffer
+
+        while self._pos < len(buffer):
+            if self._state == "search":
+                match = self._key_pattern.search(buffer, self._pos)
+                if not match:
+                    # 末尾可能是被截断的键，保留一小段等待后续文本
+                    self._pos = max(self._pos, len(buffer) - self._LOOKBEHIND)
+                    break
+                self._key = match.group(1)
+                self.opened_keys.append(self._key)
+                self._state = "array"
+                self._pos = match.end()
+
+            elif self._state == "array":
+                char = buffer[self._pos]
+                if char == '{':
+                    self._state = "object"
+                    self._start = self._pos
+                    self._depth = 1
+                    self._in_string = self._escape = False
+                elif char == ']':
+                    self.closed_keys.append(self._key)
+                    self._state = "search"
+                self._pos += 1
+
+            else:
+                char = buffer[self._pos]
+                self._pos += 1
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif char == '\\':
+                        self._escape = True
+                    elif char == '"':
+                        self._in_string = False
+                elif char == '"':
+                    self._in_string = True
+                elif char == '{':
+                    self._depth += 1
+                elif char == '}':
+                    self._depth -= 1
+                    if self._depth == 0:
+                        try:
+                            results.append((self._key, json.loads(buffer[self._start:self._pos])))
+                        except ValueError:
+                            pass
+                        self._state = "array"
+
+        # 丢弃已经处理过的文本，未闭合的对象从起始位置保留
+        keep_from = self._start if self._state == "object" else self._pos
+        self._buffer = buffer[keep_from:]
+        self._start -= keep_from
+        self._pos -= keep_from
+        return results
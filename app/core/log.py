@@ -0,0 +1,149 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator, Optional
+from app.core.config import settings
+
+ROOT_LOGGER = "qiulao"
+
+# 当前请求的process_id，子任务复制上下文后自动带上
+_process_id: ContextVar[Optional[str]] = ContextVar("process_id", default=None)
+
+# LogRecord自带的属性，其余属性视为通过extra传入的结构化字段
+_RESERVED = set(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {"message", "asctime", "process_id"}
+
+@contextmanager
+def bind_process_id(process_id: str) -> Iterator[None]:
+    """在上下文内的日志中附带process_id，便于按请求检索"""
+    token = _process_id.set(process_id)
+    try:
+        yield
+    finally:
+        _process_id.reset(token)
+
+def current_process_id() -> Optional[str]:
+    return _process_id.get()
+
+class ContextFilter(logging.Filter):
+    """把当前上下文的process_id写入日志记录"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # 通过extra显式传入的process_id优先
+        if not getattr(record, "process_id", None):
+            record.process_id = _process_id.get()
+        return True
+
+class DebugSamplingFilter(logging.Filter):
+    """按比例采样DEBUG日志，其他级别全部保留
+
+    有process_id时按其哈希决定，同一请求的调试日志要么全部保留要么全部丢弃，
+    排查时看到的是完整的请求过程。
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        if self.rate <= 0:
+            return False
+        process_id = getattr(record, "process_id", None)
+        if process_id:
+            return zlib.crc32(process_id.encode('utf-8')) % 10000 < self.rate * 10000
+        return random.random() < self.rate
+
+class JSONFormatter(logging.Formatter):
+    """每条日志输出一行JSON，extra传入的字段原样附带"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "process_id", None):
+            payload["process_id"] = record.process_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = {key: value for key, value in record.__dict__.items() if key not in _RESERVED}
+        if getattr(record, "process_id", None):
+            fields = {"process_id": record.process_id, **fields}
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+class _StdoutHandler(logging.StreamHandler):
+    # 每次输出时取当前的sys.stdout，测试框架替换标准输出后仍然有效
+    def emit(self, record: logging.LogRecord):
+        self.stream = sys.stdout
+        super().emit(record)
+
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+def configure_logging(level: Optional[str] = None, log_format: Optional[str] = None,
+                      debug_sample_rate: Optional[float] = None):
+    """配置应用日志：请求线程只把记录放入队列，由后台线程格式化并写出，不阻塞事件循环
+
+    重复调用会按新参数重新配置。
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+
+        output = _StdoutHandler()
+        output.setFormatter(JSONFormatter() if (log_format or settings.log_format) == "json" else TextFormatter())
+        _listener = QueueListener(queue.SimpleQueue(), output, respect_handler_level=True)
+        _listener.start()
+
+        # 上下文字段要在放入队列之前读取，过滤器挂在请求线程一侧的QueueHandler上
+        queue_handler = QueueHandler(_listener.queue)
+        queue_handler.addFilter(ContextFilter())
+        queue_handler.addFilter(DebugSamplingFilter(
+            settings.log_debug_sample_rate if debug_sample_rate is None else debug_sample_rate
+        ))
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.handlers = [queue_handler]
+        root.setLevel((level or settings.log_level).upper())
+        root.propagate = False
+
+def shutdown_logging():
+    """写出队列中剩余的日志并停止后台线程"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+def get_logger(name: str) -> logging.Logger:
+    """返回应用日志器（传入模块的__name__），首次调用时按配置初始化"""
+    if _listener is None:
+        configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name.removeprefix('app.')}")
+
+atexit.register(shutdown_logging)
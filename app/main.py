@@ -1,15 +1,62 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, FileResponse
-from app.api import resume_parser, keyword_extractor, resume_editor, resume_renderer, optimization
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, PlainTextResponse
+from app.api import resume_parser, keyword_extractor, resume_editor, resume_renderer, optimization, job_profiles, resume_ranking, resume_index
 from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.services.container import ServiceContainer
+from app.services.executors import get_stage_executor
+from app.services.job_queue import get_job_queue
+from app.services.resume_analysis import get_resume_analyzer
+from app.services.resume_index import close_resume_index
+from app.services.semantic_matcher import close_sentence_vector_store
+from app.services.skill_taxonomy import get_taxonomy_store
+from app.services.tokenizer import tokenizer_ready, warm_up_tokenizer, warmup_seconds
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 技能词表在后台监听文件变化并热加载
+    taxonomy_watcher = None
+    if settings.skill_taxonomy_reload_interval > 0:
+        taxonomy_watcher = asyncio.create_task(get_taxonomy_store().watch())
+    # jieba词典构建耗时较长，放到线程中预热，完成（或失败后回退为惰性加载）前/ready返回503
+    tokenizer_warmup = asyncio.create_task(asyncio.to_thread(warm_up_tokenizer)) if settings.jieba_warmup else None
+    # 所有路由共用的服务实例和LLM客户端
+    app.state.services = ServiceContainer()
+    # 解析、分词用的进程池在后台拉起，worker启动时各自加载jieba词典
+    stage_executor = get_stage_executor()
+    executor_prewarm = asyncio.create_task(stage_executor.prewarm()) if settings.executor_prewarm else None
+    # 异步优化任务的worker
+    job_queue = get_job_queue()
+    job_queue.start()
+    
+    yield
+    
+    await job_queue.shutdown()
+    if executor_prewarm and not executor_prewarm.done():
+        executor_prewarm.cancel()
+    stage_executor.shutdown()
+    await app.state.services.close()
+    app.state.services = None
+    if tokenizer_warmup and not tokenizer_warmup.done():
+        tokenizer_warmup.cancel()
+    
+    if taxonomy_watcher:
+        taxonomy_watcher.cancel()
+    # 关闭时释放简历分析用的进程池、索引和向量文件
+    get_resume_analyzer().shutdown()
+    close_resume_index()
+    close_sentence_vector_store()
 
 app = FastAPI(
     title="求捞 - AI简历优化系统",
     description="智能简历优化系统，帮助用户根据岗位HC自动优化简历",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -31,6 +78,9 @@ app.include_router(keyword_extractor.router, prefix="/api/v1", tags=["关键字
 app.include_router(resume_editor.router, prefix="/api/v1", tags=["简历编辑"])
 app.include_router(resume_renderer.router, prefix="/api/v1", tags=["简历渲染"])
 app.include_router(optimization.router, prefix="/api/v1", tags=["完整优化流程"])
+app.include_router(job_profiles.router, prefix="/api/v1", tags=["岗位画像"])
+app.include_router(resume_ranking.router, prefix="/api/v1", tags=["简历排序"])
+app.include_router(resume_index.router, prefix="/api/v1", tags=["简历库检索"])
 
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
@@ -42,4 +92,18 @@ async def favicon():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "message": "服务运行正常"}
\ No newline at end of file
+    return {"status": "ok", "message": "服务运行正常"}
+
+@app.get("/ready")
+async def readiness_check():
+    # 分词词典预热完成后才接收流量，避免首个请求承担词典构建的延迟
+    if settings.jieba_warmup and not tokenizer_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up", "message": "分词词典预热中"})
+    if settings.executor_prewarm and not get_stage_executor().ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "message": "进程池预热中"})
+    return {"status": "ready", "warmup_seconds": warmup_seconds(), "executor": get_stage_executor().mode}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus文本格式：各阶段耗时直方图、LLM调用与降级计数、缓存命中、进行中的请求数、执行器排队任务数
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
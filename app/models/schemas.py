@@ -1,10 +1,36 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 
 class ResumeUpload(BaseModel):
     markdown_content: str
+    job_hc: str = ""
+    job_profile_id: Optional[str] = None  # 已创建的岗位画像ID，提供时可省略job_hc
+    max_concurrency: Optional[int] = Field(None, ge=1)  # 单个请求内LLM调用的并发上限，默认取配置
+    edit_mode: Optional[Literal["per_section", "batched"]] = None  # per_section 或 batched，默认取配置
+    include_stage_timings: bool = False  # 是否在结果中返回各阶段耗时，用于排查慢请求
+    bypass_cache: bool = False  # 不使用已缓存的编辑建议，重新调用LLM生成（新结果仍会写入缓存）
+    previous_process_id: Optional[str] = None  # 上次优化的process_id，提供时只重新处理改动的部分
+
+class JobResumeUpload(ResumeUpload):
+    """需要岗位信息的接口（关键字提取、完整优化）使用；仅解析简历的接口沿用ResumeUpload，可不提供岗位"""
+
+    @model_validator(mode="after")
+    def check_job(self):
+        if not self.job_hc.strip() and not self.job_profile_id:
+            raise ValueError("job_hc和job_profile_id至少提供一个")
+        return self
+
+class JobProfileCreate(BaseModel):
+    job_hc: str
+
+class JobProfile(BaseModel):
+    profile_id: str
     job_hc: str
+    job_keywords: List[str]
+    job_tokens: List[str]
+    created_at: datetime
+    degraded: bool = False  # AI调用失败时使用了备用关键字，再次创建同一岗位的画像时会重新提取
 
 class ParsedResume(BaseModel):
     personal_info: Dict[str, Any]
@@ -14,6 +40,11 @@ class ParsedResume(BaseModel):
     projects: List[Dict[str, Any]]
     raw_sections: Dict[str, Any]
 
+class SemanticMatch(BaseModel):
+    keyword: str
+    sentences: List[str]  # 相似度达到阈值的简历句子，按相似度降序
+    score: float  # 最高余弦相似度
+
 class ExtractedKeywords(BaseModel):
     job_keywords: List[str]
     skill_keywords: List[str]
@@ -21,6 +52,37 @@ class ExtractedKeywords(BaseModel):
     matched_keywords: List[str]
     missing_keywords: List[str]
     relevance_score: float
+    semantic_matches: List[SemanticMatch] = []  # 未精确命中、但语义相近的岗位关键字
+
+class RankResumeInput(BaseModel):
+    resume_id: Optional[str] = None  # 未提供时使用在请求中的序号
+    markdown_content: Optional[str] = None
+    parsed_resume: Optional[ParsedResume] = None
+
+class RankResumesRequest(BaseModel):
+    job_hc: str = ""
+    job_profile_id: Optional[str] = None
+    resumes: List[RankResumeInput]
+
+class IndexResumesRequest(BaseModel):
+    resumes: List[RankResumeInput]  # 入库时resume_id必填
+
+class ResumeIndexQuery(BaseModel):
+    job_hc: str = ""
+    job_profile_id: Optional[str] = None
+    top_k: int = 10
+
+class RankedResume(BaseModel):
+    resume_id: str
+    rank: int
+    relevance_score: float  # 命中关键字的IDF加权占比
+    bm25_score: float = 0.0  # 排序依据
+    matched_keywords: List[str]
+    missing_keywords: List[str]
+
+class RankingResult(BaseModel):
+    job_keywords: List[str]
+    rankings: List[RankedResume]
 
 class EditSuggestion(BaseModel):
     section: str
@@ -45,4 +107,16 @@ class OptimizationResult(BaseModel):
     extracted_keywords: ExtractedKeywords
     edited_resume: EditedResume
     rendered_resume: RenderedResume
-    process_id: str
\ No newline at end of file
+    process_id: str
+    stage_timings: Optional[Dict[str, float]] = None  # 各阶段耗时（秒），同名阶段（如多次LLM调用）累加
+    reused_sections: Optional[List[str]] = None  # 增量优化时沿用上次建议的部分
+
+class JobStatus(BaseModel):
+    process_id: str
+    status: str  # queued / running / succeeded / failed
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    stage_timings: Dict[str, float] = {}  # 各阶段耗时（秒），运行中逐步补充
+    result: Optional[OptimizationResult] = None
+    error: Optional[str] = None
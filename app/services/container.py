@@ -0,0 +1,30 @@
+from typing import Optional
+from app.services.job_profile import JobProfileService
+from app.services.keyword_extractor import KeywordExtractorService
+from app.services.llm_client import LLMClient, close_llm_client, get_llm_client
+from app.services.optimization_history import OptimizationHistory
+from app.services.resume_editor import ResumeEditorService
+from app.services.resume_index import ResumeIndexService
+from app.services.resume_ranking import ResumeRankingService
+from app.services.resume_renderer import ResumeRendererService
+
+class ServiceContainer:
+    """应用级服务容器，在lifespan中创建，各路由通过依赖注入取用
+
+    每个worker进程只有一组服务实例：共用一个LLM客户端（一个连接池）和同一组缓存，
+    路由模块导入时不再创建服务。默认使用get_llm_client()的共享客户端，容器外创建的服务也复用同一个连接池。
+    """
+
+    def __init__(self, llm_client: Optional[LLMClient] = None):
+        self.llm_client = llm_client or get_llm_client()
+        self.extractor = KeywordExtractorService(self.llm_client)
+        self.editor = ResumeEditorService(self.llm_client)
+        self.renderer = ResumeRendererService()
+        self.profiles = JobProfileService(self.extractor)
+        self.ranking = ResumeRankingService(self.extractor)
+        self.resume_index = ResumeIndexService(self.extractor)
+        self.history = OptimizationHistory(self.editor)
+
+    async def close(self):
+        """释放LLM客户端的连接池"""
+        await close_llm_client(self.llm_client)
@@ -0,0 +1,190 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import REGISTRY
+from app.models.schemas import ParsedResume
+from app.services.resume_analysis import _get_worker_services
+from app.services.skill_taxonomy import get_taxonomy_store
+from app.services.tokenizer import TokenizedResume, warm_up_tokenizer
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# process: 解析和分词放入进程池，渲染放入线程池 / thread: 全部放入线程池 / inline: 在事件循环中直接执行，便于调试
+EXECUTOR_MODES = ("process", "thread", "inline")
+
+def _initialize_worker():
+    """进程池worker启动时执行：构建jieba词典并创建解析、分词服务，解析用的正则在模块导入时已编译
+
+    词典构建失败时只记录日志，由jieba在首次分词时加载，不让初始化异常拖垮整个进程池。
+    """
+    warm_up_tokenizer()
+    _get_worker_services()
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+def parse_resume(markdown_content: str) -> ParsedResume:
+    """解析markdown简历（正则密集），可在进程池中执行"""
+    parser, _ = _get_worker_services()
+    return parser.parse_markdown_resume(markdown_content)
+
+def tokenize_resume(parsed_resume: ParsedResume) -> TokenizedResume:
+    """对整份简历分词（jieba），可在进程池中执行"""
+    _, extractor = _get_worker_services()
+    # worker进程没有后台监听任务，分词前顺带检查词表是否更新
+    get_taxonomy_store().maybe_reload()
+    return extractor.tokenize_resume(parsed_resume)
+
+class StageExecutor:
+    """把解析、分词、渲染等同步的CPU密集阶段移出事件循环，一份大简历不再阻塞同一worker上的其他请求
+
+    较轻的工作（渲染）放入线程池；jieba分词和正则解析放入进程池，不受GIL限制。
+    进程池使用spawn启动，worker启动时即加载jieba词典，prewarm可以在服务启动时拉起全部worker。
+    """
+
+    def __init__(self, mode: str = "process", thread_workers: int = 8, process_workers: int = 0):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"不支持的执行方式: {mode}，可选 {', '.join(EXECUTOR_MODES)}")
+        self.mode = mode
+        self.thread_workers = max(1, thread_workers)
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # 已提交但尚未完成的任务数，超出worker数的部分即为排队中的任务
+        self._in_flight = {"thread": 0, "process": 0}
+        self._ready = mode != "process"
+        self.prewarm_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="stage")
+            return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._process_pool is None:
+                # spawn避免在已有线程和事件循环的进程中fork
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize_worker
+                )
+            return self._process_pool
+
+    async def _submit(self, pool_name: str, pool: Executor, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self._in_flight[pool_name] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+        finally:
+            with self._lock:
+                self._in_flight[pool_name] -= 1
+
+    async def run_light(self, func: Callable[..., T], *args: Any) -> T:
+        """在线程池中执行较轻的同步函数，保留当前上下文（日志中的process_id等）"""
+        if self.mode == "inline":
+            return func(*args)
+        context = contextvars.copy_context()
+        return await self._submit("thread", self._get_thread_pool(), context.run, func, *args)
+
+    async def run_cpu(self, func: Callable[..., T], *args: Any) -> T:
+        """执行CPU密集的函数：process模式下放入进程池，func须为模块级函数，参数和返回值须可pickle"""
+        if self.mode != "process":
+            return await self.run_light(func, *args)
+        pool = self._get_process_pool()
+        try:
+            return await self._submit("process", pool, func, *args)
+        except BrokenProcessPool:
+            # worker异常退出后进程池不可再用，丢弃后下次调用重新创建
+            logger.error("进程池已损坏，将重新创建")
+            with self._lock:
+                if self._process_pool is pool:
+                    self._process_pool = None
+            raise
+
+    async def parse_resume(self, markdown_content: str) -> ParsedResume:
+        return await self.run_cpu(parse_resume, markdown_content)
+
+    async def tokenize_resume(self, parsed_resume: ParsedResume) -> TokenizedResume:
+        return await self.run_cpu(tokenize_resume, parsed_resume)
+
+    async def prewarm(self):
+        """拉起全部worker进程并等待初始化完成，首批请求不必承担进程启动和词典加载的延迟"""
+        if self.mode != "process":
+            self._ready = True
+            return
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        pool = self._get_process_pool()
+        try:
+            # 每次提交在没有空闲worker时启动一个新进程，提交worker数个任务即拉起全部进程
+            pids = await asyncio.gather(*[
+                loop.run_in_executor(pool, _worker_pid) for _ in range(self.process_workers)
+            ])
+        except Exception as e:
+            # 进程池无法启动（如容器限制了进程数）时回退到线程池，服务仍可用，不会一直返回503
+            self.prewarm_error = str(e)
+            logger.error(f"进程池预热失败，改用线程池执行: {e}")
+            with self._lock:
+                self.mode = "thread"
+                self._process_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._ready = True
+            return
+        self._ready = True
+        logger.info("进程池预热完成", extra={
+            "workers": len(set(pids)), "seconds": round(time.perf_counter() - started, 3)
+        })
+
+    def task_counts(self) -> List[Tuple[Dict[str, str], float]]:
+        """各线程池/进程池中执行中和排队中的任务数"""
+        samples = []
+        with self._lock:
+            in_flight = dict(self._in_flight)
+        for pool_name, workers in (("thread", self.thread_workers), ("process", self.process_workers)):
+            running = min(in_flight[pool_name], workers)
+            samples.append(({"pool": pool_name, "state": "running"}, running))
+            samples.append(({"pool": pool_name, "state": "queued"}, in_flight[pool_name] - running))
+        return samples
+
+    def shutdown(self):
+        with self._lock:
+            thread_pool, process_pool = self._thread_pool, self._process_pool
+            self._thread_pool = self._process_pool = None
+        if thread_pool is not None:
+            thread_pool.shutdown(wait=False, cancel_futures=True)
+        if process_pool is not None:
+            process_pool.shutdown(wait=False, cancel_futures=True)
+        self._ready = self.mode != "process"
+
+_shared_executor: Optional[StageExecutor] = None
+
+def get_stage_executor() -> StageExecutor:
+    """进程内共享的阶段执行器，各路由的解析、分词、渲染共用同一组线程池和进程池"""
+    global _shared_executor
+    if _shared_executor is None:
+        _shared_executor = StageExecutor(
+            settings.cpu_executor, settings.executor_thread_workers, settings.executor_process_workers
+        )
+    return _shared_executor
+
+REGISTRY.callback(
+    "qiulao_executor_tasks", "解析、分词、渲染执行器中执行中和排队中的任务数", "gauge",
+    lambda: _shared_executor.task_counts() if _shared_executor is not None else []
+)
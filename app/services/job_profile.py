@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.models.schemas import JobProfile
+from app.core.cache import get_cache, make_cache_key
+from app.core.config import settings
+from app.services.keyword_extractor import KeywordExtractorService, JOB_KEYWORDS_PROMPT_VERSION
+
+class JobProfileService:
+    """岗位画像：岗位HC只解析一次，之后按ID复用关键字和分词结果"""
+
+    def __init__(self, extractor_service: KeywordExtractorService):
+        self.extractor_service = extractor_service
+        self.store = get_cache(
+            "job_profiles",
+            maxsize=settings.job_profile_cache_size,
+            ttl=settings.job_profile_ttl,
+            db_path=settings.job_profile_db or None
+        )
+
+    async def create_profile(self, job_hc: str) -> JobProfile:
+        # ID由岗位内容决定，同一岗位重复创建得到同一个画像
+        normalized_hc = ' '.join(job_hc.split())
+        profile_id = "jp_" + make_cache_key(normalized_hc, JOB_KEYWORDS_PROMPT_VERSION)[:16]
+
+        # AI调用失败时保存的是备用关键字，再次创建时重新提取，不长期沿用降级结果
+        existing = self.get_profile(profile_id)
+        if existing and not existing.degraded:
+            return existing
+
+        job_keywords, cacheable = await self.extractor_service._lookup_job_keywords(job_hc)
+        if existing and not cacheable:
+            return existing
+
+        profile = JobProfile(
+            profile_id=profile_id,
+            job_hc=job_hc,
+            job_keywords=job_keywords,
+            job_tokens=self.extractor_service._tokenize_job_hc(job_hc),
+            created_at=datetime.now(),
+            degraded=not cacheable
+        )
+        self.store.set(profile_id, profile.model_dump(mode="json"))
+        return profile
+
+    def get_profile(self, profile_id: str) -> Optional[JobProfile]:
+        data = self.store.get(profile_id)
+        return JobProfile(**data) if data else None
+
+    def delete_profile(self, profile_id: str):
+        self.store.delete(profile_id)
+
+    def resolve(self, job_hc: str, profile_id: Optional[str]) -> Tuple[str, Optional[List[str]]]:
+        """返回(岗位HC, 预提取的岗位关键字)；未提供画像ID时关键字为None，由调用方现场提取"""
+        if not profile_id:
+            return job_hc, None
+        profile = self.get_profile(profile_id)
+        if profile is None:
+            raise LookupError(f"岗位画像不存在或已过期: {profile_id}")
+        return profile.job_hc, profile.job_keywords
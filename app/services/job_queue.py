@@ -0,0 +1,128 @@
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+from app.core.cache import SQLiteCache, TTLCache
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import IN_FLIGHT, REGISTRY
+from app.models.schemas import JobStatus, OptimizationResult
+
+logger = get_logger(__name__)
+
+JobRunner = Callable[[JobStatus], Awaitable[OptimizationResult]]
+
+class JobQueueFull(Exception):
+    """排队中的任务数达到上限"""
+
+class JobStore:
+    """任务状态存储：默认保存在进程内，配置SQLite路径后多个进程共享同一份任务状态"""
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 86400, db_path: Optional[str] = None):
+        # SQLite模式下不叠加内存层，避免读到其他进程已经更新过的旧状态
+        self._backend = SQLiteCache(db_path, namespace="jobs", ttl=ttl) if db_path else TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def save(self, job: JobStatus):
+        self._backend.set(job.process_id, job.model_dump(mode="json"))
+
+    def get(self, process_id: str) -> Optional[JobStatus]:
+        data = self._backend.get(process_id)
+        return JobStatus(**data) if data is not None else None
+
+    def close(self):
+        if isinstance(self._backend, SQLiteCache):
+            self._backend.close()
+
+class JobQueue:
+    """有界的进程内任务队列，固定数量的worker协程依次执行优化任务
+
+    排队任务数达到上限时submit直接拒绝，由调用方返回503让客户端稍后重试，
+    而不是无限堆积请求直到代理超时。
+    """
+
+    def __init__(self, store: JobStore, workers: int = 4, max_pending: int = 100):
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """在当前事件循环中启动worker，重复调用无副作用"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        self._queue = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, process_id: str, runner: JobRunner) -> JobStatus:
+        """登记任务并放入队列，队列已满时抛出JobQueueFull"""
+        self.start()
+        job = JobStatus(process_id=process_id, status="queued", created_at=datetime.now())
+        try:
+            self._queue.put_nowait((job, runner))
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"排队任务已达上限({self.max_pending})，请稍后重试")
+        # 入队与保存之间没有await，worker不会先于这里更新状态
+        self.store.save(job)
+        return job
+
+    def get(self, process_id: str) -> Optional[JobStatus]:
+        return self.store.get(process_id)
+
+    async def _worker(self):
+        while True:
+            job, runner = await self._queue.get()
+            try:
+                await self._run(job, runner)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: JobStatus, runner: JobRunner):
+        job.status = "running"
+        job.started_at = datetime.now()
+        self.store.save(job)
+        try:
+            with IN_FLIGHT.track(kind="job"):
+                job.result = await runner(job)
+            job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "服务关闭，任务被取消"
+            job.finished_at = datetime.now()
+            self.store.save(job)
+            raise
+        except Exception as e:
+            logger.warning(f"异步优化任务失败: {e}", extra={"process_id": job.process_id})
+            job.status = "failed"
+            job.error = str(e)
+        job.finished_at = datetime.now()
+        self.store.save(job)
+
+_shared_queue: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    global _shared_queue
+    if _shared_queue is None:
+        store = JobStore(settings.job_store_size, settings.job_ttl, settings.job_store_db or None)
+        _shared_queue = JobQueue(store, settings.job_workers, settings.job_queue_size)
+    return _shared_queue
+
+REGISTRY.callback(
+    "qiulao_job_queue_pending", "排队等待执行的异步优化任务数", "gauge",
+    lambda: [({}, _shared_queue.pending if _shared_queue is not None else 0)]
+)
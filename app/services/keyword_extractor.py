@@ -1,41 +1,91 @@
-import openai
+import asyncio
 import re
 import jieba
-from typing import List, Set
-from app.models.schemas import ParsedResume, ExtractedKeywords
+from typing import Dict, List, Set, Optional, Tuple
+from app.models.schemas import ParsedResume, ExtractedKeywords, SemanticMatch
+from app.core.cache import get_cache, make_cache_key
 from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import LLM_FALLBACKS, stage
+from app.services.llm_client import LLMClient, get_llm_client
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.skill_taxonomy import get_skill_taxonomy
+from app.services.semantic_matcher import SemanticMatcher, get_semantic_matcher
+from app.services.relevance_scoring import CorpusStats, get_relevance_scorer, index_corpus_stats, section_weights
+from app.services.tokenizer import TokenizedResume, is_keyword_token
+
+logger = get_logger(__name__)
+
+# 修改岗位关键字提取prompt或备用算法时需要递增，使旧缓存自然失效
+JOB_KEYWORDS_PROMPT_VERSION = "v1"
 
 class KeywordExtractorService:
-    def __init__(self):
-        if settings.enable_ai and settings.openai_api_key:
-            self.client = openai.OpenAI(
-                api_key=settings.openai_api_key,
-                base_url=settings.openai_base_url
-            )
-        else:
-            self.client = None
-            print("AI功能已禁用，将使用基础算法进行关键字提取")
+    def __init__(self, llm_client: Optional[LLMClient] = None, semantic_matcher: Optional[SemanticMatcher] = None):
+        self.llm_client = llm_client or get_llm_client()
+        self._semantic_matcher = semantic_matcher
+        if not self.llm_client.enabled:
+            logger.info("AI功能已禁用，将使用基础算法进行关键字提取")
         
-        self.tech_keywords = {
-            'programming_languages': ['Python', 'Java', 'JavaScript', 'C++', 'Go', 'Rust', 'TypeScript'],
-            'frameworks': ['Django', 'Flask', 'FastAPI', 'Spring', 'React', 'Vue', 'Angular'],
-            'databases': ['MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Oracle'],
-            'tools': ['Docker', 'Kubernetes', 'Git', 'Jenkins', 'AWS', 'Azure']
-        }
+        self.job_keywords_cache = get_cache(
+            "job_keywords",
+            maxsize=settings.keyword_cache_size,
+            ttl=settings.keyword_cache_ttl,
+            db_path=settings.keyword_cache_db or None
+        )
     
-    async def extract_keywords(self, parsed_resume: ParsedResume, job_hc: str) -> ExtractedKeywords:
-        job_keywords = await self._extract_job_keywords(job_hc)
+    @property
+    def tech_matcher(self) -> KeywordMatcher:
+        # 每次从当前词表快照取匹配器，词表热加载后立即生效
+        return get_skill_taxonomy().skill_matcher
+    
+    async def extract_keywords(self, parsed_resume: ParsedResume, job_hc: str, job_keywords: Optional[List[str]] = None,
+                               tokenized_resume: Optional[TokenizedResume] = None) -> ExtractedKeywords:
+        # 传入预先提取的岗位关键字（如岗位画像）时跳过岗位解析
+        if job_keywords is None:
+            with stage("job_keywords"):
+                job_keywords = await self._extract_job_keywords(job_hc)
+        # 别名归一为标准名，例如岗位写K8s、简历写Kubernetes也能匹配
+        job_keywords = self._canonicalize_keywords(job_keywords)
         
-        resume_text = self._resume_to_text(parsed_resume)
-        resume_keywords = self._extract_resume_keywords(resume_text)
+        with stage("resume_keywords"):
+            return await self._match_resume(parsed_resume, job_keywords, tokenized_resume)
+    
+    async def _match_resume(self, parsed_resume: ParsedResume, job_keywords: List[str],
+                            tokenized_resume: Optional[TokenizedResume]) -> ExtractedKeywords:
+        # 整份简历只分词一次，简历关键字和经历关键字共用
+        if tokenized_resume is None:
+            tokenized_resume = self.tokenize_resume(parsed_resume)
+        resume_keywords = self._extract_resume_keywords(tokenized_resume)
         
         skill_keywords = self._extract_skill_keywords(parsed_resume.skills)
-        experience_keywords = self._extract_experience_keywords(parsed_resume.work_experience)
+        experience_keywords = self._extract_experience_keywords(parsed_resume.work_experience, tokenized_resume)
         
-        matched_keywords = list(set(job_keywords) & set(resume_keywords))
-        missing_keywords = list(set(job_keywords) - set(resume_keywords))
+        # 按岗位关键字的原始顺序输出：简历未改动时编辑建议的prompt逐字相同，缓存和增量优化才能命中
+        resume_keyword_set = set(resume_keywords)
+        unique_job_keywords = list(dict.fromkeys(job_keywords))
+        matched_keywords = [keyword for keyword in unique_job_keywords if keyword in resume_keyword_set]
+        missing_keywords = [keyword for keyword in unique_job_keywords if keyword not in resume_keyword_set]
         
-        relevance_score = len(matched_keywords) / len(job_keywords) if job_keywords else 0
+        # 可选的语义匹配：未精确命中的关键字再与简历句子比较向量相似度，结果单独返回，
+        # 不改变missing_keywords。词表内的技能已通过别名精确匹配，语义上相近的只会是
+        # 同类的其他技能（如Rust与Python），因此只对词表外的关键字做语义匹配
+        semantic_matches = []
+        if settings.semantic_match and missing_keywords:
+            taxonomy = get_skill_taxonomy()
+            candidates = [keyword for keyword in missing_keywords if keyword not in taxonomy.skill_categories]
+            if candidates:
+                semantic_matches = await self._semantic_matches(candidates, tokenized_resume)
+        
+        # 按语料库IDF加权，稀有的技术词比常见的填充词更重要；语义命中按相似度折算
+        relevance_score = 0.0
+        if job_keywords:
+            corpus = await self._corpus_stats(job_keywords)
+            weights = get_relevance_scorer().keyword_weights(len(job_keywords), corpus)
+            columns = {keyword: j for j, keyword in enumerate(job_keywords)}
+            relevance_score = float(
+                sum(weights[columns[keyword]] for keyword in matched_keywords)
+                + sum(weights[columns[match.keyword]] * match.score for match in semantic_matches)
+            )
         
         return ExtractedKeywords(
             job_keywords=job_keywords,
@@ -43,10 +93,32 @@ class KeywordExtractorService:
             experience_keywords=experience_keywords,
             matched_keywords=matched_keywords,
             missing_keywords=missing_keywords,
-            relevance_score=relevance_score
+            relevance_score=relevance_score,
+            semantic_matches=semantic_matches
         )
     
     async def _extract_job_keywords(self, job_hc: str) -> List[str]:
+        keywords, _ = await self._lookup_job_keywords(job_hc)
+        return keywords
+    
+    async def _lookup_job_keywords(self, job_hc: str) -> Tuple[List[str], bool]:
+        """返回(关键字, 是否可缓存)，命中缓存时总是可缓存"""
+        # 相同岗位描述（忽略空白差异）+ 模型 + prompt版本命中同一缓存
+        normalized_hc = ' '.join(job_hc.split())
+        source = self.llm_client.model_name if self.llm_client.enabled else "fallback"
+        cache_key = make_cache_key(normalized_hc, source, JOB_KEYWORDS_PROMPT_VERSION)
+        
+        cached = self.job_keywords_cache.get(cache_key)
+        if cached is not None:
+            return list(cached), True
+        
+        keywords, cacheable = await self._extract_job_keywords_uncached(job_hc)
+        if cacheable:
+            self.job_keywords_cache.set(cache_key, list(keywords))
+        return keywords, cacheable
+    
+    async def _extract_job_keywords_uncached(self, job_hc: str) -> Tuple[List[str], bool]:
+        """返回(关键字, 是否可缓存)；AI调用失败时的备用结果不缓存，避免长期命中降级结果"""
         prompt = f"""
         请从以下岗位描述中提取关键技能和要求关键字：
 
@@ -67,28 +139,18 @@ class KeywordExtractorService:
             if response:  # 如果API调用成功
                 keywords_data = self._parse_json_response(response)
                 if keywords_data.get("keywords"):
-                    return keywords_data["keywords"]
+                    return keywords_data["keywords"], True
             # 如果API调用失败或没有返回有效数据，使用fallback
-            return self._extract_keywords_fallback(job_hc)
+            LLM_FALLBACKS.inc(component="job_keywords")
+            return self._extract_keywords_fallback(job_hc), not self.llm_client.enabled
         except Exception as e:
-            print(f"关键字提取失败，使用备用方案: {e}")
-            return self._extract_keywords_fallback(job_hc)
+            logger.warning(f"关键字提取失败，使用备用方案: {e}")
+            LLM_FALLBACKS.inc(component="job_keywords")
+            return self._extract_keywords_fallback(job_hc), False
     
     async def _call_openai(self, prompt: str) -> str:
-        if not self.client:
-            return ""  # 如果没有AI客户端，直接返回空字符串
-        
-        try:
-            response = self.client.chat.completions.create(
-                model=settings.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"OpenAI API调用失败: {e}")
-            # 返回空字符串，触发fallback逻辑
-            return ""
+        # 失败时返回空字符串，触发fallback逻辑
+        return await self.llm_client.chat(prompt, temperature=0.3)
     
     def _parse_json_response(self, response: str) -> dict:
         import json
@@ -106,59 +168,81 @@ class KeywordExtractorService:
         keywords = []
         
         # 提取技术关键字
-        for category, tech_list in self.tech_keywords.items():
-            for tech in tech_list:
-                if tech.lower() in job_hc.lower():
-                    keywords.append(tech)
+        keywords.extend(self.tech_matcher.find_all(job_hc))
         
         # 使用jieba分词提取中文关键字
-        words = jieba.lcut(job_hc)
-        filtered_words = [word for word in words if len(word) >= 2 and word.isalnum()]
-        keywords.extend(filtered_words[:20])  # 取前20个词
+        keywords.extend(self._tokenize_job_hc(job_hc)[:20])  # 取前20个词
         
         return list(set(keywords))
     
-    def _resume_to_text(self, parsed_resume: ParsedResume) -> str:
+    def _canonicalize_keywords(self, keywords: List[str]) -> List[str]:
+        taxonomy = get_skill_taxonomy()
+        return list(dict.fromkeys(taxonomy.canonicalize(keyword) for keyword in keywords))
+    
+    def _tokenize_job_hc(self, job_hc: str) -> List[str]:
+        return [word for word in jieba.lcut(job_hc) if is_keyword_token(word)]
+    
+    def _resume_text_parts(self, parsed_resume: ParsedResume) -> List[Tuple[str, str]]:
+        """按(分区, 文本)列出参与关键字提取的简历内容"""
         text_parts = []
         
         # 添加技能
-        if parsed_resume.skills:
-            text_parts.extend(parsed_resume.skills)
+        for skill in parsed_resume.skills:
+            text_parts.append(("skills", skill))
         
         # 添加工作经验
         for work in parsed_resume.work_experience:
-            text_parts.append(work.get('company', ''))
-            text_parts.append(work.get('position', ''))
-            if 'responsibilities' in work:
-                text_parts.extend(work['responsibilities'])
+            text_parts.append(("work_experience", work.get('company', '')))
+            text_parts.append(("work_experience", work.get('position', '')))
+            for resp in work.get('responsibilities', []):
+                text_parts.append(("responsibilities", resp))
         
         # 添加项目经验
         for project in parsed_resume.projects:
-            text_parts.append(project.get('name', ''))
-            text_parts.append(project.get('technologies', ''))
+            text_parts.append(("projects", project.get('name', '')))
+            text_parts.append(("projects", project.get('technologies', '')))
             if 'description' in project:
                 if isinstance(project['description'], list):
-                    text_parts.extend(project['description'])
+                    text_parts.extend(("projects", line) for line in project['description'])
                 else:
-                    text_parts.append(project['description'])
+                    text_parts.append(("projects", project['description']))
         
-        return ' '.join(text_parts)
+        return text_parts
     
-    def _extract_resume_keywords(self, resume_text: str) -> List[str]:
-        keywords = []
-        
-        # 提取技术关键字
-        for category, tech_list in self.tech_keywords.items():
-            for tech in tech_list:
-                if tech.lower() in resume_text.lower():
-                    keywords.append(tech)
-        
-        # 使用jieba分词
-        words = jieba.lcut(resume_text)
-        filtered_words = [word for word in words if len(word) >= 2 and word.isalnum()]
-        keywords.extend(filtered_words)
-        
-        return list(set(keywords))
+    def tokenize_resume(self, parsed_resume: ParsedResume) -> TokenizedResume:
+        return TokenizedResume(self._resume_text_parts(parsed_resume))
+    
+    def _extract_resume_keywords(self, tokenized_resume: TokenizedResume) -> List[str]:
+        # 技术关键字 + jieba分词结果
+        return tokenized_resume.keywords()
+    
+    def _resume_term_frequencies(self, tokenized_resume: TokenizedResume) -> Dict[str, float]:
+        """与_extract_resume_keywords相同的关键字，别名归一为标准名，附带按分区加权的词频，供评分和倒排索引使用"""
+        taxonomy = get_skill_taxonomy()
+        frequencies: Dict[str, float] = {}
+        for term, frequency in tokenized_resume.term_frequencies(section_weights()).items():
+            # 技术词匹配已把各别名计入标准名，分词得到的别名取较大值合并，不重复计数
+            canonical = taxonomy.canonicalize(term)
+            frequencies[canonical] = max(frequencies.get(canonical, 0.0), frequency)
+        return frequencies
+    
+    async def _semantic_matches(self, keywords: List[str], tokenized_resume: TokenizedResume) -> List[SemanticMatch]:
+        if self._semantic_matcher is None:
+            self._semantic_matcher = get_semantic_matcher()
+        sentences = [text for _, text in tokenized_resume.parts]
+        try:
+            return await asyncio.to_thread(self._semantic_matcher.match, keywords, sentences)
+        except Exception as e:
+            logger.warning(f"语义匹配失败，仅使用精确匹配: {e}")
+            return []
+    
+    async def _corpus_stats(self, keywords: List[str]) -> Optional[CorpusStats]:
+        try:
+            return await asyncio.to_thread(index_corpus_stats, keywords)
+        except Exception as e:
+            # 简历库不可用时关键字等权，不影响关键字提取
+            logger.warning(f"读取简历库统计失败，关键字按等权计算: {e}")
+            return None
     
     def _extract_skill_keywords(self, skills: List[str]) -> List[str]:
         skill_keywords = []
@@ -169,7 +253,7 @@ class KeywordExtractorService:
         
         return list(set(skill_keywords))
     
-    def _extract_experience_keywords(self, work_experience: List[dict]) -> List[str]:
+    def _extract_experience_keywords(self, work_experience: List[dict], tokenized_resume: TokenizedResume) -> List[str]:
         experience_keywords = []
         
         for work in work_experience:
@@ -183,11 +267,7 @@ class KeywordExtractorService:
             if position:
                 experience_keywords.append(position)
             
-            # 提取工作职责关键字
-            responsibilities = work.get('responsibilities', [])
-            for resp in responsibilities:
-                words = jieba.lcut(resp)
-                filtered_words = [word for word in words if len(word) >= 2]
-                experience_keywords.extend(filtered_words)
+        # 工作职责关键字直接取简历分词结果中的职责分区
+        experience_keywords.extend(word for word in tokenized_resume.section_tokens("responsibilities") if len(word) >= 2)
         
         return list(set(experience_keywords))
\ No newline at end of file
@@ -0,0 +1,88 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+class KeywordMatcher:
+    """Aho-Corasick多模式匹配器
+
+    构建一次后对文本做单次扫描即可找出所有词典词，耗时与文本长度成正比，
+    与词典大小无关。匹配不区分大小写；以英文字母或数字开头/结尾的词要求
+    两侧是单词边界，因此 "Go" 不会匹配 "Google"，中文词不受此限制。
+    """
+
+    def __init__(self, patterns: Union[Dict[str, str], Iterable[str]]):
+        # patterns可以是 词 -> 归一化值 的映射，也可以直接是词列表
+        if not isinstance(patterns, dict):
+            patterns = {pattern: pattern for pattern in patterns}
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._patterns: List[Tuple[int, str, bool, bool]] = []  # (长度, 值, 需要左边界, 需要右边界)
+
+        for pattern, value in patterns.items():
+            key = pattern.strip().lower()
+            if not key:
+                continue
+            node = 0
+            for char in key:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(len(self._patterns))
+            self._patterns.append((len(key), value, _is_word_char(key[0]), _is_word_char(key[-1])))
+
+        # 广度优先构建失败指针，并把后缀节点的输出合并进来
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_node] = self._goto[fail].get(char, 0)
+                self._output[next_node] = self._output[next_node] + self._output[self._fail[next_node]]
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """依次产出 (起始位置, 结束位置, 值)"""
+        lowered = text.lower()
+        length = len(lowered)
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self._patterns
+        root = goto[0]
+
+        node = 0
+        for i, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0) if node else root.get(char, 0)
+            if not node:
+                continue
+            for pattern_index in output[node]:
+                pattern_length, value, left_boundary, right_boundary = patterns[pattern_index]
+                start = i - pattern_length + 1
+                if left_boundary and start > 0 and _is_word_char(lowered[start - 1]):
+                    continue
+                if right_boundary and i + 1 < length and _is_word_char(lowered[i + 1]):
+                    continue
+                yield start, i + 1, value
+
+    def find_all(self, text: str) -> List[str]:
+        """文本中出现的所有值，按首次出现顺序去重"""
+        return list(dict.fromkeys(value for _, _, value in self.iter_matches(text)))
+
+    def count(self, text: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for _, _, value in self.iter_matches(text):
+            counts[value] = counts.get(value, 0) + 1
+        return counts
@@ -0,0 +1,145 @@
+import asyncio
+import httpx
+import openai
+from typing import AsyncIterator, Optional
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import IN_FLIGHT, LLM_CALLS, stage
+
+logger = get_logger(__name__)
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def llm_timeout(timeout: Optional[float] = None) -> httpx.Timeout:
+    """传入timeout时读取超时与总超时都使用该值，否则按配置"""
+    return httpx.Timeout(
+        timeout or settings.openai_timeout,
+        connect=settings.openai_connect_timeout,
+        read=timeout or settings.openai_read_timeout,
+        pool=settings.openai_pool_timeout
+    )
+
+def create_http_client(timeout: Optional[float] = None, max_connections: Optional[int] = None) -> httpx.AsyncClient:
+    """LLM调用使用的HTTP连接池：空闲连接保留较长时间，避免频繁重新建立TCP和TLS连接"""
+    max_connections = max_connections or settings.llm_max_connections
+    http2 = settings.llm_http2 and _http2_available()
+    if settings.llm_http2 and not http2:
+        logger.info("未安装h2，LLM调用使用HTTP/1.1")
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(settings.llm_max_keepalive_connections, max_connections),
+            keepalive_expiry=settings.llm_keepalive_expiry
+        ),
+        timeout=llm_timeout(timeout)
+    )
+
+class LLMClient:
+    """基于AsyncOpenAI的共享LLM客户端，避免同步调用阻塞事件循环"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 model_name: Optional[str] = None, timeout: Optional[float] = None,
+                 http_client: Optional[httpx.AsyncClient] = None):
+        # 未显式传入api_key时遵循全局AI开关
+        if api_key is None:
+            api_key = settings.openai_api_key if settings.enable_ai else ""
+
+        self.model_name = model_name or settings.model_name
+
+        if api_key:
+            self.client = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url or settings.openai_base_url,
+                # SDK会为每个请求单独设置超时，这里与连接池的超时保持一致
+                timeout=llm_timeout(timeout),
+                max_retries=settings.openai_max_retries,
+                http_client=http_client or create_http_client(timeout)
+            )
+        else:
+            self.client = None
+
+        # 全局并发上限，防止单个worker同时向网关发起过多请求
+        self._semaphore = asyncio.Semaphore(max(1, settings.llm_max_concurrency))
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    async def chat(self, prompt: str, temperature: float = 0.7) -> str:
+        if not self.client:
+            return ""  # 如果没有AI客户端，直接返回空字符串
+
+        try:
+            async with self._semaphore:
+                # 只统计拿到并发名额之后的耗时，排队等待不计入
+                with IN_FLIGHT.track(kind="llm"), stage("llm_call"):
+                    response = await self.client.chat.completions.create(
+                        model=self.model_name,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature
+                    )
+            LLM_CALLS.inc(mode="chat", outcome="ok")
+            return response.choices[0].message.content or ""
+        except Exception as e:
+            LLM_CALLS.inc(mode="chat", outcome="error")
+            logger.warning(f"OpenAI API调用失败: {e}")
+            # 返回空字符串，让调用方使用备用逻辑
+            return ""
+
+    async def chat_stream(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """流式返回回复内容的增量片段；失败时提前结束，由调用方根据已收到的内容决定是否降级"""
+        if not self.client:
+            return
+        
+        if not settings.llm_streaming:
+            # 网关不支持流式时整段返回
+            content = await self.chat(prompt, temperature)
+            if content:
+                yield content
+            return
+        
+        try:
+            async with self._semaphore:
+                with IN_FLIGHT.track(kind="llm"), stage("llm_call"):
+                    stream = await self.client.chat.completions.create(
+                        model=self.model_name,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        stream=True
+                    )
+                    try:
+                        async for chunk in stream:
+                            if chunk.choices and chunk.choices[0].delta.content:
+                                yield chunk.choices[0].delta.content
+                    finally:
+                        await stream.close()
+            LLM_CALLS.inc(mode="stream", outcome="ok")
+        except Exception as e:
+            LLM_CALLS.inc(mode="stream", outcome="error")
+            logger.warning(f"OpenAI流式调用失败: {e}")
+    
+    async def close(self):
+        if self.client:
+            await self.client.close()
+
+_shared_client: Optional[LLMClient] = None
+
+def get_llm_client() -> LLMClient:
+    """返回进程内共享的LLM客户端，所有服务复用同一个连接池"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = LLMClient()
+    return _shared_client
+
+async def close_llm_client(client: LLMClient):
+    """关闭客户端的连接池；关闭的是共享客户端时一并清除，下次get_llm_client重新创建"""
+    global _shared_client
+    if client is _shared_client:
+        _shared_client = None
+    await client.close()
@@ -0,0 +1,84 @@
+from typing import Collection, Dict, List, Optional, Tuple
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.models.schemas import EditedResume, EditSuggestion, ExtractedKeywords, OptimizationResult, ParsedResume, RenderedResume
+from app.services.resume_editor import ResumeEditorService
+
+class PreviousOptimization:
+    """一次已完成的优化，按部分比较输入，找出新提交中可以沿用的结果"""
+
+    def __init__(self, result: OptimizationResult, job_hc: str, editor: ResumeEditorService, fallback_sections: Collection[str] = ()):
+        self.result = result
+        self.job_hc = job_hc
+        self.editor = editor
+        self.fallback_sections = set(fallback_sections)
+
+    def keywords_for(self, parsed_resume: ParsedResume, job_hc: str) -> Optional[ExtractedKeywords]:
+        """简历各部分原文和岗位都没有变化时沿用上次的关键字提取结果"""
+        if job_hc == self.job_hc and parsed_resume.raw_sections == self.result.original_resume.raw_sections:
+            return self.result.extracted_keywords
+        return None
+
+    def reusable_suggestions(self, parsed_resume: ParsedResume, extracted_keywords: ExtractedKeywords, job_hc: str) -> Dict[int, List[EditSuggestion]]:
+        """返回新简历中输入未变的部分（部分序号 -> 上次的建议）
+
+        按输入指纹而不是位置匹配，新增或删除一段经历后，其余未改动的经历仍能沿用。
+        上次退回备用逻辑的部分不沿用，重新调用LLM。
+        """
+        previous = self.result.original_resume
+        # 两段原文相同的经历指纹相同，用（指纹, 第几次出现）作键，各自只对应上次同位次那一段的建议
+        previous_keys = self._occurrence_keys(self.editor.section_fingerprints(previous, self.result.extracted_keywords, self.job_hc))
+        previous_names = dict(zip(self.editor.section_names(previous), previous_keys))
+        groups: Dict[Tuple[str, int], List[EditSuggestion]] = {key: [] for key in previous_keys}
+        for name in self.fallback_sections:
+            groups.pop(previous_names.get(name), None)
+        for suggestion in self.result.edited_resume.suggestions:
+            key = previous_names.get(suggestion.section)
+            if key in groups:
+                groups[key].append(suggestion)
+
+        names = self.editor.section_names(parsed_resume)
+        reused = {}
+        for index, key in enumerate(self._occurrence_keys(self.editor.section_fingerprints(parsed_resume, extracted_keywords, job_hc))):
+            if key in groups:
+                # 经历增删后序号可能变化，按新的位置重新命名
+                reused[index] = [suggestion.model_copy(update={"section": names[index]}) for suggestion in groups[key]]
+        return reused
+
+    @staticmethod
+    def _occurrence_keys(fingerprints: List[str]) -> List[Tuple[str, int]]:
+        counts: Dict[str, int] = {}
+        keys = []
+        for fingerprint in fingerprints:
+            keys.append((fingerprint, counts.get(fingerprint, 0)))
+            counts[fingerprint] = counts.get(fingerprint, 0) + 1
+        return keys
+
+    def rendered_for(self, edited_resume: EditedResume) -> Optional[RenderedResume]:
+        """优化后的内容与上次相同时沿用上次的渲染结果"""
+        if edited_resume.content == self.result.edited_resume.content:
+            return self.result.rendered_resume
+        return None
+
+class OptimizationHistory:
+    """保存每次优化的结果，用户修改简历后带上previous_process_id重新提交时，只重新处理改动的部分"""
+
+    def __init__(self, editor: ResumeEditorService):
+        self.editor = editor
+        self.store = get_cache(
+            "optimization_history",
+            maxsize=settings.optimization_history_size,
+            ttl=settings.optimization_history_ttl,
+            db_path=settings.optimization_history_db or None
+        )
+
+    def save(self, result: OptimizationResult, job_hc: str, fallback_sections: Collection[str] = ()):
+        self.store.set(result.process_id, {
+            "job_hc": job_hc, "result": result.model_dump(mode="json"), "fallback_sections": sorted(fallback_sections)
+        })
+
+    def get(self, process_id: str) -> Optional[PreviousOptimization]:
+        data = self.store.get(process_id)
+        if data is None:
+            return None
+        return PreviousOptimization(OptimizationResult(**data["result"]), data["job_hc"], self.editor, data.get("fallback_sections", ()))
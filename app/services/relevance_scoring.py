@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+
+# (语料库文档数, 各关键字的文档频率, 平均文档长度)
+CorpusStats = Tuple[int, np.ndarray, float]
+
+def parse_section_weights(spec: str) -> Dict[str, float]:
+    """解析 "skills=2,projects=1.5" 形式的分区权重"""
+    weights = {}
+    for item in spec.split(','):
+        if '=' in item:
+            section, weight = item.split('=', 1)
+            weights[section.strip()] = float(weight)
+    return weights
+
+def section_weights() -> Dict[str, float]:
+    return parse_section_weights(settings.section_weights)
+
+def index_corpus_stats(keywords: List[str]) -> Optional[CorpusStats]:
+    """以简历库倒排索引作为语料库：索引持久化在磁盘上，简历入库/删除时随之更新；未使用简历库时返回None"""
+    # 延迟导入，resume_index依赖关键字提取服务
+    from app.services.resume_index import existing_resume_index
+    index = existing_resume_index()
+    return index.corpus_stats(keywords) if index is not None else None
+
+class RelevanceScorer:
+    """岗位关键字与简历的加权相关度
+
+    关键字按语料库IDF加权，常见的填充词（如"负责"、"熟悉"）几乎不贡献分数；
+    coverage为命中关键字的IDF占比（0~1），bm25为按文档长度归一化的BM25得分。
+    简历以稀疏向量（行号、列号、词频三个数组）表示，多份简历一次向量化计算。
+    """
+
+    def __init__(self, k1: Optional[float] = None, b: Optional[float] = None):
+        self.k1 = settings.bm25_k1 if k1 is None else k1
+        self.b = settings.bm25_b if b is None else b
+
+    def idf(self, doc_count: int, document_frequencies: np.ndarray) -> np.ndarray:
+        # BM25的IDF加1平滑，保证为正；语料库为空时所有关键字权重相同
+        document_frequencies = np.asarray(document_frequencies, dtype=np.float64)
+        return np.log1p((doc_count - document_frequencies + 0.5) / (document_frequencies + 0.5))
+
+    def keyword_weights(self, keyword_count: int, corpus: Optional[CorpusStats] = None) -> np.ndarray:
+        """各关键字的IDF占比（和为1），没有语料库时等权"""
+        if corpus is not None and corpus[0] > 0:
+            idf = self.idf(corpus[0], corpus[1])
+        else:
+            idf = np.ones(keyword_count)
+        total = idf.sum()
+        return idf / total if total else idf
+
+    def coverage(self, idf: np.ndarray, rows: np.ndarray, cols: np.ndarray, size: int) -> np.ndarray:
+        total = idf.sum()
+        if not total:
+            return np.zeros(size)
+        return np.bincount(rows, weights=idf[cols], minlength=size) / total
+
+    def bm25(self, idf: np.ndarray, rows: np.ndarray, cols: np.ndarray, tfs: np.ndarray,
+             doc_lengths: np.ndarray, avg_length: float, size: int) -> np.ndarray:
+        tfs = np.asarray(tfs, dtype=np.float64)
+        if avg_length:
+            norm = self.k1 * (1 - self.b + self.b * doc_lengths[rows] / avg_length)
+        else:
+            norm = self.k1
+        weights = idf[cols] * tfs * (self.k1 + 1) / (tfs + norm)
+        return np.bincount(rows, weights=weights, minlength=size)
+
+    def score_resumes(self, keywords: List[str], resume_terms: List[Dict[str, float]],
+                      corpus: Optional[CorpusStats] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """对每份简历返回(coverage, bm25, 命中矩阵)，命中矩阵形状为(简历数, 关键字数)
+
+        语料库为空时，多份简历以本批简历为语料库；单份简历时关键字等权。
+        """
+        columns = {keyword: j for j, keyword in enumerate(keywords)}
+        rows, cols, tfs = [], [], []
+        for i, terms in enumerate(resume_terms):
+            for keyword, j in columns.items():
+                tf = terms.get(keyword)
+                if tf:
+                    rows.append(i)
+                    cols.append(j)
+                    tfs.append(tf)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        tfs = np.asarray(tfs, dtype=np.float64)
+        size = len(resume_terms)
+        doc_lengths = np.fromiter((sum(terms.values()) for terms in resume_terms), dtype=np.float64, count=size)
+
+        if corpus is not None and corpus[0] > 0:
+            doc_count, document_frequencies, avg_length = corpus
+        elif size > 1:
+            doc_count = size
+            document_frequencies = np.bincount(cols, minlength=len(keywords))
+            avg_length = float(doc_lengths.mean())
+        else:
+            doc_count, document_frequencies = 0, np.zeros(len(keywords))
+            avg_length = float(doc_lengths.mean()) if size else 0.0
+
+        idf = self.idf(doc_count, document_frequencies)
+        hits = np.zeros((size, len(keywords)), dtype=bool)
+        hits[rows, cols] = True
+        return (
+            self.coverage(idf, rows, cols, size),
+            self.bm25(idf, rows, cols, tfs, doc_lengths, avg_length, size),
+            hits
+        )
+
+_shared_scorer: Optional[RelevanceScorer] = None
+
+def get_relevance_scorer() -> RelevanceScorer:
+    global _shared_scorer
+    if _shared_scorer is None:
+        _shared_scorer = RelevanceScorer()
+    return _shared_scorer
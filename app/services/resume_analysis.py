@@ -0,0 +1,91 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from app.models.schemas import ParsedResume, RankResumeInput
+from app.core.config import settings
+from app.services.keyword_extractor import KeywordExtractorService
+from app.services.llm_client import LLMClient
+from app.services.resume_parser import ResumeParserService
+from app.services.skill_taxonomy import get_taxonomy_store
+from app.services.tokenizer import initialize_tokenizer
+
+# 每个进程（包括进程池worker）各自持有的解析与分词服务，按需创建
+_worker_services: Dict[str, Any] = {}
+
+def _get_worker_services():
+    if not _worker_services:
+        _worker_services["parser"] = ResumeParserService()
+        # 本地分析只做分词，不需要LLM客户端
+        _worker_services["extractor"] = KeywordExtractorService(llm_client=LLMClient(api_key=""))
+    return _worker_services["parser"], _worker_services["extractor"]
+
+def _analyze_batch(payloads: List[Dict[str, Any]]) -> List[Dict[str, int]]:
+    """解析并分词一批简历，返回每份简历的关键字词频（CPU密集，运行在进程池中）"""
+    parser, extractor = _get_worker_services()
+    # worker进程没有后台监听任务，处理前顺带检查词表是否更新
+    get_taxonomy_store().maybe_reload()
+    results = []
+    for payload in payloads:
+        if payload.get("parsed_resume") is not None:
+            parsed_resume = ParsedResume(**payload["parsed_resume"])
+        else:
+            parsed_resume = parser.parse_markdown_resume(payload["markdown_content"])
+        results.append(extractor._resume_term_frequencies(extractor.tokenize_resume(parsed_resume)))
+    return results
+
+class ResumeAnalyzer:
+    """批量解析简历并统计关键字词频，数量较多时分批交给进程池"""
+
+    BATCH_SIZE = 16
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn避免在已有线程和事件循环的进程中fork；worker启动时即加载分词词典，
+            # 第一批任务不必承担词典构建的延迟
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.rank_workers or os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initialize_tokenizer
+            )
+        return self._pool
+
+    async def analyze(self, resumes: List[RankResumeInput]) -> List[Dict[str, int]]:
+        payloads = []
+        for resume in resumes:
+            if resume.parsed_resume is None and not resume.markdown_content:
+                raise ValueError("每份简历需要提供markdown_content或parsed_resume")
+            payloads.append({
+                "markdown_content": resume.markdown_content,
+                "parsed_resume": resume.parsed_resume.model_dump() if resume.parsed_resume else None
+            })
+
+        # 少量简历时进程间通信的开销大于收益，直接在线程中处理
+        if len(payloads) < settings.rank_parallel_threshold:
+            return await asyncio.to_thread(_analyze_batch, payloads)
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        batches = [payloads[i:i + self.BATCH_SIZE] for i in range(0, len(payloads), self.BATCH_SIZE)]
+        batch_results = await asyncio.gather(*[
+            loop.run_in_executor(pool, _analyze_batch, batch) for batch in batches
+        ])
+        return [frequencies for batch in batch_results for frequencies in batch]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+_shared_analyzer: Optional[ResumeAnalyzer] = None
+
+def get_resume_analyzer() -> ResumeAnalyzer:
+    """进程内共享的简历分析器，排序与索引复用同一个进程池"""
+    global _shared_analyzer
+    if _shared_analyzer is None:
+        _shared_analyzer = ResumeAnalyzer()
+    return _shared_analyzer
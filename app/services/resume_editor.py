@@ -1,26 +1,62 @@
-import openai
+import asyncio
 import re
-from typing import List, Dict, Any
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Iterator, List, Dict, Any, Optional, Set, Tuple
 from app.models.schemas import ParsedResume, ExtractedKeywords, EditedResume, EditSuggestion
+from app.core.cache import get_cache, make_cache_key
 from app.core.config import settings
+from app.core.json_stream import JSONArrayStreamParser
+from app.core.log import get_logger
+from app.core.metrics import LLM_FALLBACKS, stage
+from app.services.llm_client import LLMClient, get_llm_client
+
+logger = get_logger(__name__)
+
+# 缓存键已包含完整prompt，修改prompt会自然失效；修改回复的解析或校验逻辑时需要递增
+SUGGESTION_PROMPT_VERSION = "v1"
+
+# 当前请求中使用备用逻辑（AI调用失败或禁用）的部分，由collect_fallback_sections设置；并发生成的子任务共享同一个集合
+_fallback_sections: ContextVar[Optional[Set[str]]] = ContextVar("fallback_sections", default=None)
+
+@contextmanager
+def collect_fallback_sections() -> Iterator[Set[str]]:
+    """收集本次生成建议时退回备用逻辑的部分名称，增量优化时这些部分不沿用，下次重新调用LLM"""
+    sections: Set[str] = set()
+    token = _fallback_sections.set(sections)
+    try:
+        yield sections
+    finally:
+        _fallback_sections.reset(token)
+
+def _record_fallback(section: str):
+    sections = _fallback_sections.get()
+    if sections is not None:
+        sections.add(section)
 
 class ResumeEditorService:
-    def __init__(self):
-        if settings.enable_ai and settings.openai_api_key:
-            self.client = openai.OpenAI(
-                api_key=settings.openai_api_key,
-                base_url=settings.openai_base_url
-            )
-        else:
-            self.client = None
-            print("AI功能已禁用，将使用基础算法进行简历编辑")
+    def __init__(self, llm_client: Optional[LLMClient] = None):
+        self.llm_client = llm_client or get_llm_client()
+        if not self.llm_client.enabled:
+            logger.info("AI功能已禁用，将使用基础算法进行简历编辑")
+        
+        # 按prompt指纹缓存LLM回复：简历小改后重新提交时，未改动部分的prompt不变，直接复用
+        self.suggestion_cache = get_cache(
+            "edit_suggestions",
+            maxsize=settings.suggestion_cache_size,
+            ttl=settings.suggestion_cache_ttl,
+            db_path=settings.suggestion_cache_db or None
+        )
     
-    async def edit_resume(self, parsed_resume: ParsedResume, extracted_keywords: ExtractedKeywords, job_hc: str) -> EditedResume:
-        suggestions = await self._generate_edit_suggestions(parsed_resume, extracted_keywords, job_hc)
-        
-        optimized_content = await self._apply_optimizations(parsed_resume, suggestions, job_hc)
-        
-        improvement_summary = await self._generate_improvement_summary(suggestions)
+    async def edit_resume(self, parsed_resume: ParsedResume, extracted_keywords: ExtractedKeywords, job_hc: str, max_concurrency: Optional[int] = None, edit_mode: Optional[str] = None, bypass_cache: bool = False, reused: Optional[Dict[int, List[EditSuggestion]]] = None) -> EditedResume:
+        with stage("suggestions"):
+            suggestions = await self._generate_edit_suggestions(parsed_resume, extracted_keywords, job_hc, max_concurrency, edit_mode, bypass_cache, reused)
+        return await self.build_edited_resume(parsed_resume, suggestions, job_hc)
+    
+    async def build_edited_resume(self, parsed_resume: ParsedResume, suggestions: List[EditSuggestion], job_hc: str) -> EditedResume:
+        with stage("apply"):
+            optimized_content = await self._apply_optimizations(parsed_resume, suggestions, job_hc)
+            improvement_summary = await self._generate_improvement_summary(suggestions)
         
         return EditedResume(
             content=optimized_content,
@@ -28,26 +64,201 @@ class ResumeEditorService:
             improvement_summary=improvement_summary
         )
     
-    async def _generate_edit_suggestions(self, parsed_resume: ParsedResume, extracted_keywords: ExtractedKeywords, job_hc: str) -> List[EditSuggestion]:
+    async def _generate_edit_suggestions(self, parsed_resume: ParsedResume, extracted_keywords: ExtractedKeywords, job_hc: str, max_concurrency: Optional[int] = None, edit_mode: Optional[str] = None, bypass_cache: bool = False, reused: Optional[Dict[int, List[EditSuggestion]]] = None) -> List[EditSuggestion]:
+        # 结果按各部分的原始顺序合并，与完成顺序无关
+        section_results: Dict[int, List[EditSuggestion]] = {}
+        async with aclosing(self.iter_edit_suggestions(parsed_resume, extracted_keywords, job_hc, max_concurrency, edit_mode, bypass_cache, reused)) as results:
+            async for index, section_suggestions in results:
+                section_results.setdefault(index, []).extend(section_suggestions)
+        
         suggestions = []
+        for index in sorted(section_results):
+            suggestions.extend(section_results[index])
         
-        # 技能部分建议
-        skills_suggestions = await self._suggest_skills_improvements(parsed_resume.skills, extracted_keywords, job_hc)
-        suggestions.extend(skills_suggestions)
+        return suggestions
+    
+    async def iter_edit_suggestions(self, parsed_resume: ParsedResume, extracted_keywords: ExtractedKeywords, job_hc: str, max_concurrency: Optional[int] = None, edit_mode: Optional[str] = None, bypass_cache: bool = False, reused: Optional[Dict[int, List[EditSuggestion]]] = None) -> AsyncIterator[Tuple[int, List[EditSuggestion]]]:
+        """按生成顺序产出(部分序号, 建议列表)，序号对应技能、各段工作经历、各段项目经历的原始顺序
+
+        技能建议和批量模式的建议来自流式输出，每条建议的JSON对象闭合后立即产出，
+        同一部分可能产出多次。生成器被关闭或所在任务被取消时（如客户端断开流式连接），
+        尚未完成的LLM调用会一并取消。bypass_cache为True时不读取回复缓存，重新调用LLM并刷新缓存。
+        reused为增量优化时沿用上次结果的部分（部分序号 -> 建议），这些部分直接产出，不再调用LLM。
+        """
+        reused = reused or {}
+        for index in sorted(reused):
+            yield index, reused[index]
+        # 已有结果、无需再逐段生成的部分
+        done = set(reused)
+        
+        # 增量优化时只为改动的部分逐段生成，一处修改只需一次LLM调用
+        if (edit_mode or settings.edit_mode) == "batched" and not reused:
+            async with aclosing(self._stream_batched_suggestions(parsed_resume, extracted_keywords, job_hc, bypass_cache)) as results:
+                async for index, suggestions in results:
+                    done.add(index)
+                    yield index, suggestions
+            section_count = 1 + len(parsed_resume.work_experience) + len(parsed_resume.projects)
+            if len(done) == section_count:
+                return
+            # 批量结果无法解析、被截断、超出长度校验或遗漏了部分段落时，其余部分退回逐段生成
+            if done:
+                logger.warning("批量建议不完整，其余部分逐段生成", extra={"missing_sections": section_count - len(done)})
+                LLM_FALLBACKS.inc(component="batched")
+        
+        # 各部分的LLM调用并发执行，受单请求信号量约束；结果经队列按到达顺序转交
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.suggestion_concurrency))
+        sources = []
+        if 0 not in done:
+            sources.append((0, self._stream_skills_improvements(parsed_resume.skills, extracted_keywords, job_hc, bypass_cache)))
+        for i, work in enumerate(parsed_resume.work_experience):
+            if 1 + i not in done:
+                sources.append((1 + i, self._entry_stream(self._suggest_work_entry_improvement, i, work, extracted_keywords, job_hc, bypass_cache)))
+        project_offset = 1 + len(parsed_resume.work_experience)
+        for i, project in enumerate(parsed_resume.projects):
+            if project_offset + i not in done:
+                sources.append((project_offset + i, self._entry_stream(self._suggest_project_entry_improvement, i, project, extracted_keywords, job_hc, bypass_cache)))
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.ensure_future(self._produce(index, source, semaphore, queue)) for index, source in sources]
+        finished = 0
+        try:
+            while finished < len(tasks):
+                index, item = await queue.get()
+                if item is None:
+                    finished += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield index, item
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    def section_names(self, parsed_resume: ParsedResume) -> List[str]:
+        """各部分的名称，顺序与iter_edit_suggestions的部分序号一致"""
+        return (["技能"]
+                + [f"工作经历{i+1}" for i in range(len(parsed_resume.work_experience))]
+                + [f"项目经历{i+1}" for i in range(len(parsed_resume.projects))])
+    
+    def section_fingerprints(self, parsed_resume: ParsedResume, extracted_keywords: ExtractedKeywords, job_hc: str) -> List[str]:
+        """各部分prompt输入的指纹，指纹相同的部分LLM建议可以沿用
+
+        经历的prompt只包含该段原文和岗位，改动一段经历不影响其他经历；技能的prompt还包含缺失的关键字。
+        备用逻辑用到的匹配关键字不计入指纹，备用结果本身不沿用（见collect_fallback_sections）。
+        """
+        missing = ', '.join(extracted_keywords.missing_keywords[:10])
+        fingerprints = [make_cache_key("技能", "\n".join(parsed_resume.skills), job_hc, missing)]
+        fingerprints.extend(make_cache_key("工作经历", work.get('raw_text', ''), job_hc) for work in parsed_resume.work_experience)
+        fingerprints.extend(make_cache_key("项目经历", project.get('raw_text', ''), job_hc) for project in parsed_resume.projects)
+        return fingerprints
+    
+    async def _produce(self, index: int, source: AsyncIterator[List[EditSuggestion]], semaphore: asyncio.Semaphore, queue: asyncio.Queue):
+        # 以None标记该部分结束，异常转交给消费方抛出
+        try:
+            async with semaphore:
+                async with aclosing(source) as suggestions_iter:
+                    async for suggestions in suggestions_iter:
+                        await queue.put((index, suggestions))
+        except Exception as e:
+            await queue.put((index, e))
+            return
+        await queue.put((index, None))
+    
+    async def _entry_stream(self, suggest, *args) -> AsyncIterator[List[EditSuggestion]]:
+        # 单次调用的部分包装成流，生成器在获得信号量之前不会创建协程
+        yield await suggest(*args)
+    
+    def _skill_suggestion(self, item: Dict[str, Any]) -> EditSuggestion:
+        return EditSuggestion(
+            section="技能",
+            original_text=item.get("original", ""),
+            suggested_text=item.get("improved", ""),
+            reason=item.get("reason", ""),
+            priority="high"
+        )
+    
+    async def _stream_batched_suggestions(self, parsed_resume: ParsedResume, extracted_keywords: ExtractedKeywords, job_hc: str, bypass_cache: bool = False) -> AsyncIterator[Tuple[int, List[EditSuggestion]]]:
+        """用一次流式LLM调用生成整份简历的建议，每段建议解析完成即产出；未产出的部分由调用方退回逐段模式"""
+        current_skills_text = "\n".join(parsed_resume.skills) if parsed_resume.skills else "无技能描述"
+        
+        # 按 工作经历N / 项目经历N 编号各段内容，N与逐段模式保持一致；
+        # 部分序号同样与逐段模式一致：0为技能，之后依次为各段工作经历和项目经历
+        sections = {}
+        for i, work in enumerate(parsed_resume.work_experience):
+            if work.get('raw_text'):
+                sections[f"工作经历{i+1}"] = (1 + i, work['raw_text'], 1.5, "优化工作描述表达")
+        for i, project in enumerate(parsed_resume.projects):
+            if project.get('raw_text'):
+                sections[f"项目经历{i+1}"] = (1 + len(parsed_resume.work_experience) + i, project['raw_text'], 1.4, "优化项目描述表达")
+        
+        sections_text = "\n\n".join(f"[{name}]\n{text}" for name, (_, text, _, _) in sections.items())
         
-        # 工作经验建议
-        work_suggestions = await self._suggest_work_experience_improvements(parsed_resume.work_experience, extracted_keywords, job_hc)
-        suggestions.extend(work_suggestions)
+        prompt = f"""
+        岗位要求：
+        {job_hc}
         
-        # 项目经验建议
-        project_suggestions = await self._suggest_project_improvements(parsed_resume.projects, extracted_keywords, job_hc)
-        suggestions.extend(project_suggestions)
+        缺失的关键技能：
+        {', '.join(extracted_keywords.missing_keywords[:10])}
         
-        return suggestions
-    
-    async def _suggest_skills_improvements(self, skills: List[str], extracted_keywords: ExtractedKeywords, job_hc: str) -> List[EditSuggestion]:
-        suggestions = []
+        当前技能描述：
+        {current_skills_text}
+        
+        以下是简历中的各段经历，每段以[段落名]开头：
+        {sections_text or "无"}
         
+        请一次性完成以下优化：
+        1. 为技能部分提供优化建议，突出与岗位相关的技能，保持真实性，不添加虚假技能
+        2. 对每段经历进行表达优化，保持所有事实内容不变，不添加任何虚构信息
+        3. 优化语言表达，使其更专业和简洁，突出重点成就和技术亮点
+        4. 绝对不能编造数据、项目名称、技术栈或工作成果
+        
+        请以JSON格式返回，section必须使用上面给出的段落名：
+        {{"skills": [{{"original": "原文", "improved": "改进后", "reason": "改进原因"}}],
+          "sections": [{{"section": "工作经历1", "improved_text": "优化后的文本", "reason": "优化原因"}}]}}
+        """
+        
+        parser = JSONArrayStreamParser(["skills", "sections"])
+        # sections数组出现之前无法确认回复格式有效，技能建议先暂存，避免退回逐段模式时重复
+        pending_skills: List[EditSuggestion] = []
+        emitted = set()
+        async for delta in self._stream_llm(prompt, bypass_cache, lambda: "sections" in parser.closed_keys):
+            for key, item in parser.feed(delta):
+                if not isinstance(item, dict):
+                    continue
+                if key == "skills":
+                    pending_skills.append(self._skill_suggestion(item))
+                    continue
+                name = item.get("section")
+                if name not in sections or name in emitted or not item.get("improved_text"):
+                    continue
+                index, original_text, max_ratio, default_reason = sections[name]
+                # 与逐段模式相同的长度校验，防止引入虚构内容
+                if len(item["improved_text"]) > len(original_text) * max_ratio:
+                    continue
+                emitted.add(name)
+                yield index, [EditSuggestion(
+                    section=name,
+                    original_text=original_text,
+                    suggested_text=item["improved_text"],
+                    reason=item.get("reason", default_reason),
+                    priority="medium"
+                )]
+            if pending_skills and "sections" in parser.opened_keys:
+                yield 0, pending_skills
+                pending_skills = []
+        
+        if "sections" in parser.opened_keys:
+            # 即使没有任何建议也产出一次，表示批量模式已成功完成
+            yield 0, pending_skills
+        else:
+            logger.warning("批量建议解析失败，退回逐段生成")
+            LLM_FALLBACKS.inc(component="batched")
+    
+    async def _stream_skills_improvements(self, skills: List[str], extracted_keywords: ExtractedKeywords, job_hc: str, bypass_cache: bool = False) -> AsyncIterator[List[EditSuggestion]]:
+        """流式生成技能建议，suggestions数组中每个对象闭合后立即产出"""
         current_skills_text = "\n".join(skills) if skills else "无技能描述"
         
         prompt = f"""
@@ -70,172 +281,165 @@ class ResumeEditorService:
         {{"suggestions": [{{"original": "原文", "improved": "改进后", "reason": "改进原因"}}]}}
         """
         
+        received = False
+        emitted = False
+        try:
+            parser = JSONArrayStreamParser(["suggestions"])
+            async for delta in self._stream_llm(prompt, bypass_cache, lambda: "suggestions" in parser.closed_keys):
+                received = True
+                suggestions = [self._skill_suggestion(item) for _, item in parser.feed(delta) if isinstance(item, dict)]
+                if suggestions:
+                    emitted = True
+                    yield suggestions
+        except Exception as e:
+            logger.warning(f"技能建议生成失败: {e}")
+            received = emitted
+            _record_fallback("技能")
+        
+        # API调用失败（没有收到任何内容）时的备用建议
+        if not received:
+            LLM_FALLBACKS.inc(component="skills")
+            _record_fallback("技能")
+        if not received and extracted_keywords.missing_keywords:
+            yield [EditSuggestion(
+                section="技能",
+                original_text=current_skills_text,
+                suggested_text=current_skills_text + "\n- " + "\n- ".join(extracted_keywords.missing_keywords[:5]),
+                reason="建议添加岗位要求的关键技能",
+                priority="high"
+            )]
+    
+    async def _suggest_work_entry_improvement(self, i: int, work: Dict[str, Any], extracted_keywords: ExtractedKeywords, job_hc: str, bypass_cache: bool = False) -> List[EditSuggestion]:
+        suggestions = []
+        
+        work_text = work.get('raw_text', '')
+        if not work_text:
+            return suggestions
+        
+        # 只做基础的格式和表达优化，不添加虚构内容
+        prompt = f"""
+        当前工作经历描述：
+        {work_text}
+        
+        岗位要求：
+        {job_hc}
+        
+        请对这段工作经历进行表达优化，要求：
+        1. 保持所有事实内容不变，不添加任何虚构信息
+        2. 优化语言表达，使其更专业和简洁
+        3. 调整句式结构，突出重点成就
+        4. 如果内容中提到的技术与岗位要求匹配，可以适当强调
+        5. 绝对不能编造数据、项目名称、技术栈或工作成果
+        
+        请以JSON格式返回：
+        {{"improved_text": "优化后的文本", "reason": "优化原因"}}
+        """
+        
         try:
-            response = await self._call_openai(prompt)
+            response = await self._call_openai(prompt, bypass_cache)
             if response:  # 如果API调用成功
-                suggestions_data = self._parse_json_response(response)
+                suggestion_data = self._parse_json_response(response)
                 
-                for suggestion in suggestions_data.get("suggestions", []):
+                if suggestion_data.get("improved_text"):
+                    # 验证优化内容是否过于偏离原文
+                    original_length = len(work_text)
+                    improved_length = len(suggestion_data["improved_text"])
+                    
+                    # 如果优化后的内容长度增加超过50%，可能包含虚构内容，使用原文
+                    if improved_length > original_length * 1.5:
+                        return suggestions
+                    
                     suggestions.append(EditSuggestion(
-                        section="技能",
-                        original_text=suggestion.get("original", ""),
-                        suggested_text=suggestion.get("improved", ""),
-                        reason=suggestion.get("reason", ""),
-                        priority="high"
+                        section=f"工作经历{i+1}",
+                        original_text=work_text,
+                        suggested_text=suggestion_data["improved_text"],
+                        reason=suggestion_data.get("reason", "优化工作描述表达"),
+                        priority="medium"
                     ))
             else:
-                # API调用失败时的备用建议
-                if extracted_keywords.missing_keywords:
+                # API调用失败时，只做基础的关键词优化
+                LLM_FALLBACKS.inc(component="work_experience")
+                _record_fallback(f"工作经历{i+1}")
+                if extracted_keywords.matched_keywords:
+                    enhanced_text = work_text + f"\n\n技术关键词：{', '.join(extracted_keywords.matched_keywords[:3])}"
                     suggestions.append(EditSuggestion(
-                        section="技能",
-                        original_text=current_skills_text,
-                        suggested_text=current_skills_text + "\n- " + "\n- ".join(extracted_keywords.missing_keywords[:5]),
-                        reason="建议添加岗位要求的关键技能",
-                        priority="high"
+                        section=f"工作经历{i+1}",
+                        original_text=work_text,
+                        suggested_text=enhanced_text,
+                        reason="突出相关技术关键词",
+                        priority="low"
                     ))
         except Exception as e:
-            print(f"技能建议生成失败: {e}")
-            # 提供基础的改进建议
-            if extracted_keywords.missing_keywords:
-                suggestions.append(EditSuggestion(
-                    section="技能",
-                    original_text=current_skills_text,
-                    suggested_text=current_skills_text + "\n- " + "\n- ".join(extracted_keywords.missing_keywords[:5]),
-                    reason="建议添加岗位要求的关键技能",
-                    priority="high"
-                ))
+            logger.warning(f"工作经历建议生成失败: {e}")
+            _record_fallback(f"工作经历{i+1}")
+            # 不添加任何建议，保持原文
         
         return suggestions
     
-    async def _suggest_work_experience_improvements(self, work_experience: List[Dict[str, Any]], extracted_keywords: ExtractedKeywords, job_hc: str) -> List[EditSuggestion]:
+    async def _suggest_project_entry_improvement(self, i: int, project: Dict[str, Any], extracted_keywords: ExtractedKeywords, job_hc: str, bypass_cache: bool = False) -> List[EditSuggestion]:
         suggestions = []
         
-        for i, work in enumerate(work_experience):
-            work_text = work.get('raw_text', '')
-            if not work_text:
-                continue
-            
-            # 只做基础的格式和表达优化，不添加虚构内容
-            prompt = f"""
-            当前工作经历描述：
-            {work_text}
-            
-            岗位要求：
-            {job_hc}
-            
-            请对这段工作经历进行表达优化，要求：
-            1. 保持所有事实内容不变，不添加任何虚构信息
-            2. 优化语言表达，使其更专业和简洁
-            3. 调整句式结构，突出重点成就
-            4. 如果内容中提到的技术与岗位要求匹配，可以适当强调
-            5. 绝对不能编造数据、项目名称、技术栈或工作成果
-            
-            请以JSON格式返回：
-            {{"improved_text": "优化后的文本", "reason": "优化原因"}}
-            """
-            
-            try:
-                response = await self._call_openai(prompt)
-                if response:  # 如果API调用成功
-                    suggestion_data = self._parse_json_response(response)
-                    
-                    if suggestion_data.get("improved_text"):
-                        # 验证优化内容是否过于偏离原文
-                        original_length = len(work_text)
-                        improved_length = len(suggestion_data["improved_text"])
-                        
-                        # 如果优化后的内容长度增加超过50%，可能包含虚构内容，使用原文
-                        if improved_length > original_length * 1.5:
-                            continue
-                        
-                        suggestions.append(EditSuggestion(
-                            section=f"工作经历{i+1}",
-                            original_text=work_text,
-                            suggested_text=suggestion_data["improved_text"],
-                            reason=suggestion_data.get("reason", "优化工作描述表达"),
-                            priority="medium"
-                        ))
-                else:
-                    # API调用失败时，只做基础的关键词优化
-                    if extracted_keywords.matched_keywords:
-                        enhanced_text = work_text + f"\n\n技术关键词：{', '.join(extracted_keywords.matched_keywords[:3])}"
-                        suggestions.append(EditSuggestion(
-                            section=f"工作经历{i+1}",
-                            original_text=work_text,
-                            suggested_text=enhanced_text,
-                            reason="突出相关技术关键词",
-                            priority="low"
-                        ))
-            except Exception as e:
-                print(f"工作经历建议生成失败: {e}")
-                # 不添加任何建议，保持原文
-                continue
+        project_text = project.get('raw_text', '')
+        if not project_text:
+            return suggestions
         
-        return suggestions
-    
-    async def _suggest_project_improvements(self, projects: List[Dict[str, Any]], extracted_keywords: ExtractedKeywords, job_hc: str) -> List[EditSuggestion]:
-        suggestions = []
+        # 只做基础的格式和表达优化，不添加虚构内容
+        prompt = f"""
+        当前项目经历描述：
+        {project_text}
         
-        for i, project in enumerate(projects):
-            project_text = project.get('raw_text', '')
-            if not project_text:
-                continue
-            
-            # 只做基础的格式和表达优化，不添加虚构内容
-            prompt = f"""
-            当前项目经历描述：
-            {project_text}
-            
-            岗位要求：
-            {job_hc}
-            
-            请对这个项目描述进行表达优化，要求：
-            1. 保持所有事实内容不变，不添加任何虚构信息
-            2. 优化语言表达，使其更专业和简洁
-            3. 调整句式结构，突出技术亮点和个人贡献
-            4. 如果内容中提到的技术与岗位要求匹配，可以适当强调
-            5. 绝对不能编造技术栈、项目成果、数据指标或业务背景
-            
-            请以JSON格式返回：
-            {{"improved_text": "优化后的文本", "reason": "优化原因"}}
-            """
-            
-            try:
-                response = await self._call_openai(prompt)
-                if response:  # 如果API调用成功
-                    suggestion_data = self._parse_json_response(response)
+        岗位要求：
+        {job_hc}
+        
+        请对这个项目描述进行表达优化，要求：
+        1. 保持所有事实内容不变，不添加任何虚构信息
+        2. 优化语言表达，使其更专业和简洁
+        3. 调整句式结构，突出技术亮点和个人贡献
+        4. 如果内容中提到的技术与岗位要求匹配，可以适当强调
+        5. 绝对不能编造技术栈、项目成果、数据指标或业务背景
+        
+        请以JSON格式返回：
+        {{"improved_text": "优化后的文本", "reason": "优化原因"}}
+        """
+        
+        try:
+            response = await self._call_openai(prompt, bypass_cache)
+            if response:  # 如果API调用成功
+                suggestion_data = self._parse_json_response(response)
+                
+                if suggestion_data.get("improved_text"):
+                    # 验证优化内容是否过于偏离原文
+                    original_length = len(project_text)
+                    improved_length = len(suggestion_data["improved_text"])
                     
-                    if suggestion_data.get("improved_text"):
-                        # 验证优化内容是否过于偏离原文
-                        original_length = len(project_text)
-                        improved_length = len(suggestion_data["improved_text"])
-                        
-                        # 如果优化后的内容长度增加超过40%，可能包含虚构内容
-                        if improved_length > original_length * 1.4:
-                            continue
-                        
-                        suggestions.append(EditSuggestion(
-                            section=f"项目经历{i+1}",
-                            original_text=project_text,
-                            suggested_text=suggestion_data["improved_text"],
-                            reason=suggestion_data.get("reason", "优化项目描述表达"),
-                            priority="medium"
-                        ))
-                else:
-                    # API调用失败时，只做基础的关键词优化
-                    if extracted_keywords.matched_keywords:
-                        enhanced_text = project_text + f"\n\n相关技术：{', '.join(extracted_keywords.matched_keywords[:3])}"
-                        suggestions.append(EditSuggestion(
-                            section=f"项目经历{i+1}",
-                            original_text=project_text,
-                            suggested_text=enhanced_text,
-                            reason="突出相关技术栈",
-                            priority="low"
-                        ))
-            except Exception as e:
-                print(f"项目经历建议生成失败: {e}")
-                # 不添加任何建议，保持原文
-                continue
+                    # 如果优化后的内容长度增加超过40%，可能包含虚构内容
+                    if improved_length > original_length * 1.4:
+                        return suggestions
+                    
+                    suggestions.append(EditSuggestion(
+                        section=f"项目经历{i+1}",
+                        original_text=project_text,
+                        suggested_text=suggestion_data["improved_text"],
+                        reason=suggestion_data.get("reason", "优化项目描述表达"),
+                        priority="medium"
+                    ))
+            else:
+                # API调用失败时，只做基础的关键词优化
+                LLM_FALLBACKS.inc(component="projects")
+                _record_fallback(f"项目经历{i+1}")
+                if extracted_keywords.matched_keywords:
+                    enhanced_text = project_text + f"\n\n相关技术：{', '.join(extracted_keywords.matched_keywords[:3])}"
+                    suggestions.append(EditSuggestion(
+                        section=f"项目经历{i+1}",
+                        original_text=project_text,
+                        suggested_text=enhanced_text,
+                        reason="突出相关技术栈",
+                        priority="low"
+                    ))
+        except Exception as e:
+            logger.warning(f"项目经历建议生成失败: {e}")
+            _record_fallback(f"项目经历{i+1}")
+            # 不添加任何建议，保持原文
         
         return suggestions
     
@@ -454,21 +658,43 @@ class ResumeEditorService:
         
         return "\n".join(summary_parts)
     
-    async def _call_openai(self, prompt: str) -> str:
-        if not self.client:
-            return ""  # 如果没有AI客户端，直接返回空字符串
-        
-        try:
-            response = self.client.chat.completions.create(
-                model=settings.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"OpenAI API调用失败: {e}")
-            # 返回空字符串，让调用方使用备用逻辑
+    def _prompt_key(self, prompt: str) -> str:
+        return make_cache_key(prompt, self.llm_client.model_name, SUGGESTION_PROMPT_VERSION)
+    
+    async def _call_openai(self, prompt: str, bypass_cache: bool = False) -> str:
+        # AI禁用时不读缓存，保持备用逻辑的行为
+        if not self.llm_client.enabled:
             return ""
+        key = self._prompt_key(prompt)
+        if not bypass_cache:
+            cached = self.suggestion_cache.get(key)
+            if cached is not None:
+                return cached
+        # 失败时返回空字符串，让调用方使用备用逻辑；无法解析的回复不缓存
+        response = await self.llm_client.chat(prompt, temperature=0.7)
+        if response and self._parse_json_response(response):
+            self.suggestion_cache.set(key, response)
+        return response
+    
+    async def _stream_llm(self, prompt: str, bypass_cache: bool, is_complete: Callable[[], bool]) -> AsyncIterator[str]:
+        """流式调用LLM，命中缓存时整段返回
+
+        流式调用中途失败时回复并不完整，由调用方通过is_complete判断已解析的内容是否完整，完整时才写入缓存。
+        """
+        if not self.llm_client.enabled:
+            return
+        key = self._prompt_key(prompt)
+        if not bypass_cache:
+            cached = self.suggestion_cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        chunks = []
+        async for delta in self.llm_client.chat_stream(prompt, temperature=0.7):
+            chunks.append(delta)
+            yield delta
+        if chunks and is_complete():
+            self.suggestion_cache.set(key, "".join(chunks))
     
     def _parse_json_response(self, response: str) -> dict:
         import json
@@ -0,0 +1,344 @@
+import asyncio
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.models.schemas import RankResumeInput, RankedResume, RankingResult
+from app.core.config import settings
+from app.services.keyword_extractor import KeywordExtractorService
+from app.services.relevance_scoring import CorpusStats, RelevanceScorer, get_relevance_scorer
+from app.services.resume_analysis import ResumeAnalyzer, get_resume_analyzer
+
+EMPTY = np.empty(0, dtype=np.int32)
+EMPTY_TFS = np.empty(0, dtype=np.float32)
+
+class ResumeIndex:
+    """关键字 → 简历ID（含词频）的倒排索引
+
+    磁盘上由一个不可变的基础段和一个追加式变更日志组成：
+    - 基础段的postings按关键字连续存放在 .npy 文件中，以内存映射方式读取，
+      每个关键字的doc_id升序排列
+    - 新增/删除先写入变更日志并更新内存增量，累计到阈值后合并为新的基础段
+    同一索引目录只允许一个进程写入。
+    """
+
+    def __init__(self, index_dir: str, compact_threshold: int = 1000, scorer: Optional[RelevanceScorer] = None):
+        self.index_dir = index_dir
+        self.compact_threshold = compact_threshold
+        self.scorer = scorer or get_relevance_scorer()
+        self._lock = threading.RLock()
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _load(self):
+        meta_path = self._path("meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+        else:
+            meta = {"generation": 0, "terms": {}, "resume_ids": []}
+
+        self._generation = meta["generation"]
+        self._terms: Dict[str, Tuple[int, int]] = meta["terms"]  # 关键字 -> (offset, length)
+        self._resume_ids: List[Optional[str]] = meta["resume_ids"]  # doc_id -> resume_id
+        self._base_doc_count = len(self._resume_ids)
+        if self._generation:
+            self._docs = np.load(self._path(f"segment_{self._generation}_docs.npy"), mmap_mode='r')
+            self._tfs = np.load(self._path(f"segment_{self._generation}_tfs.npy"), mmap_mode='r')
+        else:
+            self._docs = EMPTY
+            self._tfs = EMPTY_TFS
+
+        # 文档长度（加权词频之和）由postings汇总得到，无需单独持久化；BM25长度归一化使用
+        self._base_lengths = np.bincount(self._docs, weights=self._tfs, minlength=self._base_doc_count)
+        self._delta_lengths: List[float] = []
+        self._doc_ids: Dict[str, int] = {resume_id: doc_id for doc_id, resume_id in enumerate(self._resume_ids)}
+        self._total_length = float(self._base_lengths.sum())
+        self._delta: Dict[str, Dict[int, int]] = {}
+        self._deleted: set = set()
+        self._pending_changes = 0
+
+        # 重放上次合并之后的变更
+        journal_path = self._path("journal.jsonl")
+        if os.path.exists(journal_path):
+            with open(journal_path, encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if entry["op"] == "add":
+                        self._apply_add(entry["resume_id"], entry["terms"])
+                    else:
+                        self._apply_remove(entry["resume_id"])
+        self._journal = open(journal_path, 'a', encoding='utf-8')
+
+    def _write_journal(self, entry: dict):
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._journal.flush()
+
+    def _doc_length(self, doc_id: int) -> float:
+        if doc_id < self._base_doc_count:
+            return float(self._base_lengths[doc_id])
+        return self._delta_lengths[doc_id - self._base_doc_count]
+
+    def _apply_add(self, resume_id: str, terms: Dict[str, float]):
+        # 同一ID重复添加视为替换，旧文档标记删除
+        self._apply_remove(resume_id)
+        doc_id = len(self._resume_ids)
+        self._resume_ids.append(resume_id)
+        self._doc_ids[resume_id] = doc_id
+        length = float(sum(terms.values()))
+        self._delta_lengths.append(length)
+        self._total_length += length
+        for term, tf in terms.items():
+            self._delta.setdefault(term, {})[doc_id] = tf
+        self._pending_changes += 1
+
+    def _apply_remove(self, resume_id: str) -> bool:
+        doc_id = self._doc_ids.pop(resume_id, None)
+        if doc_id is None:
+            return False
+        self._deleted.add(doc_id)
+        self._total_length -= self._doc_length(doc_id)
+        self._pending_changes += 1
+        return True
+
+    def add(self, resume_id: str, terms: Dict[str, float]):
+        with self._lock:
+            self._write_journal({"op": "add", "resume_id": resume_id, "terms": terms})
+            self._apply_add(resume_id, terms)
+
+    def remove(self, resume_id: str) -> bool:
+        with self._lock:
+            if resume_id not in self._doc_ids:
+                return False
+            self._write_journal({"op": "remove", "resume_id": resume_id})
+            return self._apply_remove(resume_id)
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self._pending_changes >= self.compact_threshold
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """返回关键字的(doc_id数组, 词频数组)，doc_id升序且已排除删除的文档"""
+        docs, tfs = EMPTY, EMPTY_TFS
+        if term in self._terms:
+            offset, length = self._terms[term]
+            docs = self._docs[offset:offset + length]
+            tfs = self._tfs[offset:offset + length]
+
+        delta = self._delta.get(term)
+        if delta:
+            # 增量文档的doc_id总是大于基础段，拼接后仍保持升序
+            delta_docs = np.fromiter(delta.keys(), dtype=np.int32, count=len(delta))
+            delta_tfs = np.fromiter(delta.values(), dtype=np.float32, count=len(delta))
+            order = np.argsort(delta_docs)
+            docs = np.concatenate([docs, delta_docs[order]])
+            tfs = np.concatenate([tfs, delta_tfs[order]])
+
+        if self._deleted and len(docs):
+            alive = ~np.isin(docs, np.fromiter(self._deleted, dtype=np.int32))
+            docs, tfs = docs[alive], tfs[alive]
+
+        return docs, tfs
+
+    def corpus_stats(self, terms: List[str]) -> CorpusStats:
+        """返回(在库简历数, 各关键字的文档频率, 平均文档长度)，用于计算IDF"""
+        with self._lock:
+            doc_count = len(self._doc_ids)
+            document_frequencies = np.array([len(self._postings(term)[0]) for term in terms], dtype=np.int64)
+            return doc_count, document_frequencies, self._total_length / doc_count if doc_count else 0.0
+
+    def query(self, job_keywords: List[str], top_k: int = 10) -> List[Tuple[str, float, List[str], List[str], float]]:
+        """返回命中至少一个关键字的前top_k份简历：(resume_id, 匹配度, 命中关键字, 缺失关键字, BM25得分)
+
+        匹配度为命中关键字的IDF占比，按BM25得分排序。
+        """
+        keywords = list(dict.fromkeys(job_keywords))
+        if not keywords:
+            return []
+
+        with self._lock:
+            postings = [self._postings(keyword) for keyword in keywords]
+            resume_ids = list(self._resume_ids)
+            doc_count = len(self._doc_ids)
+            avg_length = self._total_length / doc_count if doc_count else 0.0
+            doc_lengths = np.concatenate([self._base_lengths, np.asarray(self._delta_lengths, dtype=np.float64)])
+
+        all_docs = np.concatenate([docs for docs, _ in postings])
+        if not len(all_docs):
+            return []
+        all_tfs = np.concatenate([tfs for _, tfs in postings])
+        document_frequencies = np.array([len(docs) for docs, _ in postings])
+        all_terms = np.repeat(np.arange(len(keywords)), document_frequencies)
+
+        # 所有命中的postings一次性计算，按文档汇总
+        size = len(resume_ids)
+        idf = self.scorer.idf(doc_count, document_frequencies)
+        coverage = self.scorer.coverage(idf, all_docs, all_terms, size)
+        scores = self.scorer.bm25(idf, all_docs, all_terms, all_tfs, doc_lengths, avg_length, size)
+
+        # BM25得分优先，相同时按入库顺序
+        candidates = np.unique(all_docs)
+        order = np.lexsort((candidates, -scores[candidates]))
+        top_docs = candidates[order[:top_k]]
+
+        # 每个关键字的postings有序，用二分查找判断top文档是否命中
+        hits = np.zeros((len(keywords), len(top_docs)), dtype=bool)
+        for i, (docs, _) in enumerate(postings):
+            if len(docs):
+                positions = np.searchsorted(docs, top_docs)
+                hits[i] = docs[np.minimum(positions, len(docs) - 1)] == top_docs
+
+        results = []
+        for j, doc_id in enumerate(top_docs):
+            matched = [keyword for i, keyword in enumerate(keywords) if hits[i, j]]
+            missing = [keyword for i, keyword in enumerate(keywords) if not hits[i, j]]
+            results.append((resume_ids[doc_id], float(coverage[doc_id]), matched, missing, float(scores[doc_id])))
+        return results
+
+    def compact(self):
+        """把增量和删除合并进新的基础段，并重新编号doc_id"""
+        with self._lock:
+            live_doc_ids = sorted(self._doc_ids.values())
+            remap = np.full(len(self._resume_ids) + 1, -1, dtype=np.int32)
+            remap[live_doc_ids] = np.arange(len(live_doc_ids), dtype=np.int32)
+
+            terms = {}
+            doc_chunks, tf_chunks = [], []
+            offset = 0
+            for term in sorted(set(self._terms) | set(self._delta)):
+                docs, tfs = self._postings(term)
+                if not len(docs):
+                    continue
+                doc_chunks.append(remap[docs])
+                tf_chunks.append(np.asarray(tfs, dtype=np.float32))
+                terms[term] = (offset, len(docs))
+                offset += len(docs)
+
+            generation = self._generation + 1
+            np.save(self._path(f"segment_{generation}_docs.npy"),
+                    np.concatenate(doc_chunks) if doc_chunks else EMPTY)
+            np.save(self._path(f"segment_{generation}_tfs.npy"),
+                    np.concatenate(tf_chunks) if tf_chunks else EMPTY_TFS)
+
+            meta = {
+                "generation": generation,
+                "terms": terms,
+                "resume_ids": [self._resume_ids[doc_id] for doc_id in live_doc_ids]
+            }
+            tmp_path = self._path("meta.json.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            # meta.json替换完成即视为新段生效；之后崩溃时重放旧日志结果一致
+            os.replace(tmp_path, self._path("meta.json"))
+
+            self._journal.close()
+            open(self._path("journal.jsonl"), 'w').close()
+            old_generation = self._generation
+            self._docs, self._tfs = EMPTY, EMPTY_TFS
+            self._load()
+
+            for suffix in ("docs", "tfs"):
+                old_path = self._path(f"segment_{old_generation}_{suffix}.npy")
+                if old_generation and os.path.exists(old_path):
+                    os.remove(old_path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "resumes": len(self._doc_ids),
+                "terms": len(set(self._terms) | set(self._delta)),
+                "segment_resumes": self._base_doc_count,
+                "pending_changes": self._pending_changes,
+                "generation": self._generation
+            }
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
+
+class ResumeIndexService:
+    """简历库倒排索引：入库时分词一次，之后新岗位只需查询索引"""
+
+    def __init__(self, extractor_service: KeywordExtractorService, index: Optional[ResumeIndex] = None,
+                 analyzer: Optional[ResumeAnalyzer] = None):
+        self.extractor_service = extractor_service
+        self._index = index
+        self.analyzer = analyzer or get_resume_analyzer()
+
+    @property
+    def index(self) -> ResumeIndex:
+        # 首次使用时才打开索引目录，导入模块没有磁盘副作用
+        if self._index is None:
+            self._index = get_resume_index()
+        return self._index
+
+    async def add_resumes(self, resumes: List[RankResumeInput]) -> int:
+        if any(not resume.resume_id for resume in resumes):
+            raise ValueError("入库的简历必须提供resume_id")
+
+        resume_terms = await self.analyzer.analyze(resumes)
+        # 写变更日志和合并都是磁盘IO，与查询一样放到线程中执行，不阻塞事件循环
+        await asyncio.to_thread(self._add_terms, [(resume.resume_id, terms) for resume, terms in zip(resumes, resume_terms)])
+        return len(resumes)
+
+    def _add_terms(self, entries: List[Tuple[str, Dict[str, float]]]):
+        for resume_id, terms in entries:
+            self.index.add(resume_id, terms)
+        if self.index.needs_compaction:
+            self.index.compact()
+
+    async def remove_resume(self, resume_id: str) -> bool:
+        return await asyncio.to_thread(self.index.remove, resume_id)
+
+    async def query(self, job_hc: str, job_keywords: Optional[List[str]] = None, top_k: int = 10) -> RankingResult:
+        if job_keywords is None:
+            job_keywords = await self.extractor_service._extract_job_keywords(job_hc)
+        job_keywords = self.extractor_service._canonicalize_keywords(job_keywords)
+
+        results = await asyncio.to_thread(self.index.query, job_keywords, top_k)
+        return RankingResult(
+            job_keywords=job_keywords,
+            rankings=[
+                RankedResume(
+                    resume_id=resume_id,
+                    rank=rank,
+                    relevance_score=score,
+                    bm25_score=bm25_score,
+                    matched_keywords=matched,
+                    missing_keywords=missing
+                )
+                for rank, (resume_id, score, matched, missing, bm25_score) in enumerate(results, 1)
+            ]
+        )
+
+_shared_index: Optional[ResumeIndex] = None
+_shared_index_lock = threading.Lock()
+
+def get_resume_index() -> ResumeIndex:
+    # 可能在多个线程中同时首次调用，加锁保证只打开一次变更日志
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = ResumeIndex(settings.resume_index_dir, settings.resume_index_compact_threshold)
+        return _shared_index
+
+def existing_resume_index() -> Optional[ResumeIndex]:
+    """已打开或磁盘上已存在的简历库；从未入库过简历时返回None，不创建索引目录和变更日志"""
+    if _shared_index is None:
+        index_dir = settings.resume_index_dir
+        if not any(os.path.exists(os.path.join(index_dir, name)) for name in ("meta.json", "journal.jsonl")):
+            return None
+    return get_resume_index()
+
+def close_resume_index():
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is not None:
+            _shared_index.close()
+            _shared_index = None
@@ -2,14 +2,48 @@ import re
 import markdown
 from typing import Dict, List, Any
 from app.models.schemas import ParsedResume
+from app.core.log import get_logger
+
+logger = get_logger(__name__)
+
+# 解析用到的正则在模块加载时统一编译，不依赖re模块容量有限的内部缓存
+_CITIES = [
+    "北京", "上海", "广州", "深圳", "杭州", "厦门", "福州", "成都", "武汉", "重庆", "南京", "苏州", "天津", "西安",
+    "郑州", "长沙", "青岛", "大连", "宁波", "无锡", "佛山", "烟台", "东莞", "南通", "唐山", "泉州", "常州", "石家庄",
+    "济南", "温州", "绍兴", "嘉兴", "太原", "贵阳", "昆明", "兰州", "银川", "西宁", "乌鲁木齐", "拉萨", "呼和浩特",
+    "南宁", "海口", "哈尔滨", "长春", "沈阳",
+]
+
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_PHONE_PATTERN = re.compile(r'1[3-9]\d{9}')
+_LOCATION_PATTERNS = [
+    re.compile(r'📍\s*([^\|]+)'),  # 📍厦门
+    re.compile(r'地址[：:]\s*([^\n\|]+)'),
+    # 城市名的多选分支，较长的名称优先
+    re.compile('((?:' + '|'.join(sorted(_CITIES, key=len, reverse=True)) + r')[^|\n]*)'),
+]
+_LOCATION_NOISE_PATTERN = re.compile(r'[📍|｜\s]+')
+_BOLD_PATTERN = re.compile(r'\*\*(.*?)\*\*')
+_CONTACT_CHAR_PATTERN = re.compile(r'[@📞📧📍|｜\d]')
+_ROLE_PATTERNS = [re.compile(pattern) for pattern in (r'技术架构师', r'架构师', r'工程师', r'开发(?:者|人员)?', r'经理', r'总监')]
+_BLANK_LINE_PATTERN = re.compile(r'\n\s*\n')
+_YEAR_PATTERN = re.compile(r'\d{4}')
+_COMPANY_PATTERN = re.compile(r'\*\*([^*]+)\*\*\s*\|\s*([^*\n]+)')  # **公司名** | 职位
+# 工作经历条目的起始行：**公司名** | 职位，或以年份开头的 时间 | 职位 | 公司
+_BOLD_WORK_ENTRY_PATTERN = re.compile(r'\*\*[^*]+\*\*\s*\|\s*[^*\n]+')
+_YEAR_WORK_ENTRY_PATTERN = re.compile(r'^[ \t]*\d{4}[^|\n]*\|[^|\n]*\|[^\n]*', re.MULTILINE)
+_BULLET_SKILL_SEPARATOR = re.compile(r'[|｜,，、]')
+_LIST_SKILL_SEPARATOR = re.compile(r'[,，、]')
+_INLINE_SKILL_SEPARATOR = re.compile(r'[,，、|｜]')
+_PARENTHESES_PATTERN = re.compile(r'[()（）].*?[)）]')
 
 class ResumeParserService:
     def __init__(self):
         self.md = markdown.Markdown(extensions=['tables', 'fenced_code'])
     
     def parse_markdown_resume(self, markdown_content: str) -> ParsedResume:
-        print(f"开始解析简历，内容长度: {len(markdown_content)}")
-        print(f"简历前500字符: {markdown_content[:500]}")
+        # 简历内容含个人信息，日志中只记录长度和数量
+        logger.debug("开始解析简历", extra={"content_length": len(markdown_content)})
         
         sections = self._split_into_sections(markdown_content)
         
@@ -19,7 +53,10 @@ class ResumeParserService:
         skills = self._extract_skills(sections)
         projects = self._extract_projects(sections)
         
-        print(f"解析结果统计: personal_info={len(personal_info)}, education={len(education)}, work_experience={len(work_experience)}, skills={len(skills)}, projects={len(projects)}")
+        logger.debug("简历解析结果统计", extra={
+            "personal_info": len(personal_info), "education": len(education),
+            "work_experience": len(work_experience), "skills": len(skills), "projects": len(projects)
+        })
         
         return ParsedResume(
             personal_info=personal_info,
@@ -68,9 +105,7 @@ class ResumeParserService:
         if current_content:
             sections[current_section] = '\n'.join(current_content).strip()
         
-        print(f"解析到的sections: {list(sections.keys())}")
-        for key, value in sections.items():
-            print(f"Section '{key}': {value[:100]}..." if len(value) > 100 else f"Section '{key}': {value}")
+        logger.debug("简历分段完成", extra={"section_lengths": [len(value) for value in sections.values()]})
         
         return sections
     
@@ -93,11 +128,8 @@ class ResumeParserService:
                 header_content = sections[first_key]
         
         # 首先提取邮箱和电话（避免被误认为姓名）
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        phone_pattern = r'1[3-9]\d{9}'
-        
-        email_match = re.search(email_pattern, header_content)
-        phone_match = re.search(phone_pattern, header_content)
+        email_match = _EMAIL_PATTERN.search(header_content)
+        phone_match = _PHONE_PATTERN.search(header_content)
         
         if email_match:
             personal_info["email"] = email_match.group()
@@ -105,18 +137,12 @@ class ResumeParserService:
             personal_info["phone"] = phone_match.group()
         
         # 提取地址（寻找地名）
-        location_patterns = [
-            r'📍\s*([^\|]+)',  # 📍厦门
-            r'地址[：:]\s*([^\n\|]+)',
-            r'([北京|上海|广州|深圳|杭州|厦门|福州|成都|武汉|重庆|南京|苏州|天津|西安|郑州|长沙|青岛|大连|宁波|无锡|佛山|烟台|东莞|南通|唐山|泉州|常州|石家庄|济南|温州|绍兴|嘉兴|太原|贵阳|昆明|兰州|银川|西宁|乌鲁木齐|拉萨|呼和浩特|南宁|海口|哈尔滨|长春|沈阳][^|\n]*)'
-        ]
-        
-        for pattern in location_patterns:
-            location_match = re.search(pattern, header_content)
+        for pattern in _LOCATION_PATTERNS:
+            location_match = pattern.search(header_content)
             if location_match:
                 location = location_match.group(1).strip()
                 # 清理地址中的emoji和多余字符
-                location = re.sub(r'[📍|｜\s]+', '', location).strip()
+                location = _LOCATION_NOISE_PATTERN.sub('', location).strip()
                 if location:
                     personal_info["address"] = location
                 break
@@ -132,29 +158,20 @@ class ResumeParserService:
                 
             if line.startswith('###') and '**' in line:
                 # 处理 ### **徐俊飞** 这种格式
-                name_match = re.search(r'\*\*(.*?)\*\*', line)
+                name_match = _BOLD_PATTERN.search(line)
                 if name_match:
                     name = name_match.group(1).strip()
                     # 确保姓名不包含特殊字符
-                    if not re.search(r'[@📞📧📍|｜\d]', name) and len(name) <= 10:
+                    if not _CONTACT_CHAR_PATTERN.search(name) and len(name) <= 10:
                         personal_info["name"] = name
             elif line and i < 3 and not line.startswith('#') and not line.startswith('**'):
                 # 前几行的简短文本可能是姓名，但要排除联系方式
-                if len(line) <= 10 and not re.search(r'[@📞📧📍|｜\d]', line):
+                if len(line) <= 10 and not _CONTACT_CHAR_PATTERN.search(line):
                     personal_info["name"] = line.strip()
         
         # 提取职位/角色
-        role_patterns = [
-            r'技术架构师',
-            r'架构师',
-            r'工程师',
-            r'开发[者|人员]?',
-            r'经理',
-            r'总监'
-        ]
-        
-        for pattern in role_patterns:
-            role_match = re.search(pattern, header_content)
+        for pattern in _ROLE_PATTERNS:
+            role_match = pattern.search(header_content)
             if role_match:
                 personal_info["role"] = role_match.group()
                 break
@@ -171,7 +188,7 @@ class ResumeParserService:
             return []
         
         education_list = []
-        entries = re.split(r'\n\s*\n', education_content.strip())
+        entries = _BLANK_LINE_PATTERN.split(education_content.strip())
         
         for entry in entries:
             if entry.strip():
@@ -189,7 +206,7 @@ class ResumeParserService:
         education_item = {"raw_text": entry}
         
         for line in lines:
-            if re.search(r'\d{4}', line):
+            if _YEAR_PATTERN.search(line):
                 education_item["period"] = line
             elif any(keyword in line for keyword in ["大学", "学院", "学校"]):
                 education_item["school"] = line
@@ -221,43 +238,14 @@ class ResumeParserService:
         
         # 如果有统一的工作经历content，也处理它
         if work_content.strip():
-            # 按公司分割（寻找公司名称模式）
-            company_pattern = r'\*\*([^*]+)\*\*\s*\|\s*([^*\n]+)'  # **公司名** | 职位
-            companies = re.finditer(company_pattern, work_content)
-            
-            current_pos = 0
-            for match in companies:
-                # 处理前一段内容（如果有）
-                if match.start() > current_pos:
-                    prev_content = work_content[current_pos:match.start()].strip()
-                    if prev_content and len(prev_content) > 20:  # 避免很短的片段
-                        work_item = self._parse_work_entry_flexible(prev_content)
-                        if work_item:
-                            work_list.append(work_item)
-                
-                # 寻找当前公司的结束位置（下一个公司开始或文本结束）
-                next_match = None
-                for next_company in re.finditer(company_pattern, work_content[match.end():]):
-                    next_match = next_company
-                    break
-                
-                if next_match:
-                    end_pos = match.end() + next_match.start()
-                else:
-                    end_pos = len(work_content)
-                
-                # 提取当前公司的完整内容
-                company_content = work_content[match.start():end_pos].strip()
-                work_item = self._parse_work_entry_flexible(company_content)
+            for entry in self._segment_work_entries(work_content):
+                work_item = self._parse_work_entry_flexible(entry)
                 if work_item:
                     work_list.append(work_item)
-                
-                current_pos = end_pos
             
-            # 如果没有找到公司模式，尝试按空行分割
-            if not work_list and work_content.strip():
-                entries = re.split(r'\n\s*\n', work_content.strip())
-                for entry in entries:
+            # 如果没有找到条目起始行，尝试按空行分割
+            if not work_list:
+                for entry in _BLANK_LINE_PATTERN.split(work_content.strip()):
                     if entry.strip() and len(entry.strip()) > 20:
                         work_item = self._parse_work_entry_flexible(entry)
                         if work_item:
@@ -265,6 +253,27 @@ class ResumeParserService:
         
         return work_list
     
+    def _segment_work_entries(self, work_content: str) -> List[str]:
+        """一次扫描找出所有条目的起始位置，再按相邻起点切片，耗时与内容长度成线性关系"""
+        starts = [match.start() for match in _BOLD_WORK_ENTRY_PATTERN.finditer(work_content)]
+        # 粗体条目下的 "2020-2023 | 北京 | 全职" 是该条目的明细行，只有出现在第一个粗体条目之前的年份行才算条目起点
+        first_bold = starts[0] if starts else len(work_content)
+        starts = [match.start() for match in _YEAR_WORK_ENTRY_PATTERN.finditer(work_content, 0, first_bold)] + starts
+        if not starts:
+            return []
+        
+        entries = []
+        # 第一个条目之前的内容（如果有）
+        preamble = work_content[:starts[0]].strip()
+        if len(preamble) > 20:  # 避免很短的片段
+            entries.append(preamble)
+        
+        for start, end in zip(starts, starts[1:] + [len(work_content)]):
+            entry = work_content[start:end].strip()
+            if entry:
+                entries.append(entry)
+        return entries
+    
     def _parse_work_entry_flexible(self, entry: str) -> Dict[str, Any]:
         lines = [line.strip() for line in entry.split('\n') if line.strip()]
         if not lines:
@@ -283,7 +292,7 @@ class ResumeParserService:
                 work_item["company"] = parts[2]
             elif len(parts) == 2:
                 # 时间 | 职位 或 职位 | 公司
-                if re.search(r'\d{4}', parts[0]):
+                if _YEAR_PATTERN.search(parts[0]):
                     work_item["period"] = parts[0]
                     work_item["position"] = parts[1]
                 else:
@@ -293,14 +302,14 @@ class ResumeParserService:
         # 提取公司和职位信息（备用方法）
         for line in lines:
             # **公司名** | 职位 格式
-            company_match = re.search(r'\*\*([^*]+)\*\*\s*\|\s*([^*\n]+)', line)
+            company_match = _COMPANY_PATTERN.search(line)
             if company_match:
                 work_item["company"] = company_match.group(1).strip()
                 work_item["position"] = company_match.group(2).strip()
                 continue
             
             # 时间信息
-            if re.search(r'\d{4}', line) and ('至今' in line or '-' in line or '~' in line):
+            if _YEAR_PATTERN.search(line) and ('至今' in line or '-' in line or '~' in line):
                 if "period" not in work_item:
                     work_item["period"] = line
                 continue
@@ -364,9 +373,9 @@ class ResumeParserService:
                         skill_value = skill_line.split('：')[-1].split(':')[-1].strip()
                         if skill_value:
                             # 按分隔符分割技能
-                            skill_items = re.split(r'[|｜,，、]', skill_value)
+                            skill_items = _BULLET_SKILL_SEPARATOR.split(skill_value)
                             for item in skill_items:
-                                clean_item = re.sub(r'[()（）].*?[)）]', '', item).strip()
+                                clean_item = _PARENTHESES_PATTERN.sub('', item).strip()
                                 if clean_item:
                                     skills.append(clean_item)
                     else:
@@ -377,7 +386,7 @@ class ResumeParserService:
                     if '：' in skill_text or ':' in skill_text:
                         skill_value = skill_text.split('：')[-1].split(':')[-1].strip()
                         if skill_value:
-                            skill_items = re.split(r'[,，、]', skill_value)
+                            skill_items = _LIST_SKILL_SEPARATOR.split(skill_value)
                             for item in skill_items:
                                 if item.strip():
                                     skills.append(item.strip())
@@ -387,9 +396,9 @@ class ResumeParserService:
                     # 直接冒号分隔的格式
                     skill_value = line.split('：')[-1].split(':')[-1].strip()
                     if skill_value:
-                        skill_items = re.split(r'[,，、|｜]', skill_value)
+                        skill_items = _INLINE_SKILL_SEPARATOR.split(skill_value)
                         for item in skill_items:
-                            clean_item = re.sub(r'[()（）].*?[)）]', '', item).strip()
+                            clean_item = _PARENTHESES_PATTERN.sub('', item).strip()
                             if clean_item:
                                 skills.append(clean_item)
                 elif not any(char in line for char in ['#', '*', '▸', '-', '•']):
@@ -408,7 +417,7 @@ class ResumeParserService:
             return []
         
         projects_list = []
-        entries = re.split(r'\n\s*\n', projects_content.strip())
+        entries = _BLANK_LINE_PATTERN.split(projects_content.strip())
         
         for entry in entries:
             if entry.strip():
@@ -429,7 +438,7 @@ class ResumeParserService:
             project_item["name"] = lines[0]
         
         for line in lines[1:]:
-            if re.search(r'\d{4}', line):
+            if _YEAR_PATTERN.search(line):
                 project_item["period"] = line
             elif '技术栈' in line or '技术' in line:
                 project_item["technologies"] = line
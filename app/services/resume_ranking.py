@@ -0,0 +1,54 @@
+import asyncio
+from typing import List, Optional
+from app.models.schemas import RankResumeInput, RankedResume, RankingResult
+from app.services.keyword_extractor import KeywordExtractorService
+from app.services.relevance_scoring import RelevanceScorer, get_relevance_scorer
+from app.services.resume_analysis import ResumeAnalyzer, get_resume_analyzer
+
+class ResumeRankingService:
+    """一个岗位对多份简历的批量匹配与排序，除岗位关键字提取外不调用LLM"""
+
+    def __init__(self, extractor_service: KeywordExtractorService, analyzer: Optional[ResumeAnalyzer] = None,
+                 scorer: Optional[RelevanceScorer] = None):
+        self.extractor_service = extractor_service
+        self.analyzer = analyzer or get_resume_analyzer()
+        self.scorer = scorer or get_relevance_scorer()
+
+    async def rank_resumes(self, resumes: List[RankResumeInput], job_hc: str, job_keywords: Optional[List[str]] = None) -> RankingResult:
+        if job_keywords is None:
+            job_keywords = await self.extractor_service._extract_job_keywords(job_hc)
+
+        # 与关键字提取一致，别名归一为标准名（如K8s -> Kubernetes）并去重；入库/分析的简历词频同样使用标准名
+        job_keywords = keywords = self.extractor_service._canonicalize_keywords(job_keywords)
+        resume_terms = await self.analyzer.analyze(resumes)
+
+        corpus = await self.extractor_service._corpus_stats(keywords) if keywords else None
+        coverage, bm25, hits = await asyncio.to_thread(self.scorer.score_resumes, keywords, resume_terms, corpus)
+
+        scored = []
+        for i, resume in enumerate(resumes):
+            scored.append((
+                resume.resume_id or str(i),
+                float(coverage[i]),
+                float(bm25[i]),
+                sorted(keyword for j, keyword in enumerate(keywords) if hits[i, j]),
+                sorted(keyword for j, keyword in enumerate(keywords) if not hits[i, j])
+            ))
+
+        # 按BM25得分稳定排序，得分相同时保持提交顺序
+        scored.sort(key=lambda item: item[2], reverse=True)
+
+        return RankingResult(
+            job_keywords=job_keywords,
+            rankings=[
+                RankedResume(
+                    resume_id=resume_id,
+                    rank=rank,
+                    relevance_score=score,
+                    bm25_score=bm25_score,
+                    matched_keywords=matched,
+                    missing_keywords=missing
+                )
+                for rank, (resume_id, score, bm25_score, matched, missing) in enumerate(scored, 1)
+            ]
+        )
@@ -1,23 +1,42 @@
+import threading
 import markdown
 from jinja2 import Environment, BaseLoader
 from datetime import datetime
 from typing import Dict, Any
 from app.models.schemas import EditedResume, RenderedResume
+from app.services.skill_taxonomy import get_skill_taxonomy
 
 class ResumeRendererService:
     def __init__(self):
-        self.md = markdown.Markdown(extensions=['tables', 'fenced_code', 'nl2br'])
+        # Markdown实例转换时会修改自身状态，渲染在线程池中并发执行，每个线程各用一个实例
+        self._local = threading.local()
         self.jinja_env = Environment(loader=BaseLoader())
+    
+    @property
+    def md(self) -> markdown.Markdown:
+        md = getattr(self._local, "md", None)
+        if md is None:
+            md = self._local.md = markdown.Markdown(extensions=['tables', 'fenced_code', 'nl2br'])
+        return md
         
     async def render_resume(self, edited_resume: EditedResume) -> RenderedResume:
-        # 将markdown转换为HTML
-        html_content = self._markdown_to_html(edited_resume.content)
-        
-        # 应用CSS样式
-        styled_html = self._apply_styling(html_content)
+        return self.render(edited_resume)
+    
+    def render(self, edited_resume: EditedResume, template_name: str = "modern") -> RenderedResume:
+        """同步渲染，供执行器在线程池中调用"""
+        if template_name == "professional":
+            html_content = self._render_professional_template(edited_resume.content)
+        elif template_name == "creative":
+            html_content = self._render_creative_template(edited_resume.content)
+        elif template_name == "technical":
+            html_content = self._render_technical_template(edited_resume.content)
+        else:
+            # 将markdown转换为HTML，并应用CSS样式
+            html_content = self._markdown_to_html(edited_resume.content)
+            html_content = self._apply_styling(html_content)
         
         return RenderedResume(
-            html_content=styled_html,
+            html_content=html_content,
             markdown_content=edited_resume.content,
             pdf_url=None,  # 可以后续集成PDF生成
             created_at=datetime.now()
@@ -404,37 +423,15 @@ class ResumeRendererService:
     
     def _categorize_skills(self, skill_items):
         """将技能分类"""
-        categories = {
-            "编程语言": [],
-            "框架&工具": [],
-            "数据库": [],
-            "架构&设计": [],
-            "运维&部署": []
-        }
-        
-        # 定义关键词映射
-        keywords_map = {
-            "编程语言": ["Golang", "Python", "Java", "JavaScript", "C++", "TypeScript", "编程", "语言"],
-            "框架&工具": ["go-zero", "Kratos", "Flask", "Django", "React", "Vue", "框架", "库"],
-            "数据库": ["MySQL", "MongoDB", "Redis", "PostgreSQL", "数据库", "数据建模", "事务"],
-            "架构&设计": ["微服务", "架构", "设计", "DDD", "领域", "分布式", "高并发", "系统"],
-            "运维&部署": ["Docker", "Kubernetes", "CI/CD", "容器", "部署", "运维", "监控", "可观测性"]
-        }
+        taxonomy = get_skill_taxonomy()
+        categories = {category: [] for category in taxonomy.category_order}
         
         for skill in skill_items:
             skill = skill.strip()
-            categorized = False
             
-            # 根据关键词分类
-            for category, keywords in keywords_map.items():
-                if any(keyword in skill for keyword in keywords):
-                    categories[category].append(skill)
-                    categorized = True
-                    break
-            
-            # 如果没有分类，放入框架&工具
-            if not categorized:
-                categories["框架&工具"].append(skill)
+            # 根据词表分类，命中多个分类时取靠前的分类；没有分类时放入默认分类
+            category = taxonomy.categorize(skill) or taxonomy.default_category
+            categories.setdefault(category, []).append(skill)
         
         # 移除空的分类
         return {k: v for k, v in categories.items() if v}
@@ -467,22 +464,7 @@ class ResumeRendererService:
     
     async def render_with_template(self, edited_resume: EditedResume, template_name: str = "modern") -> RenderedResume:
         """使用指定模板渲染简历"""
-        if template_name == "professional":
-            html_content = self._render_professional_template(edited_resume.content)
-        elif template_name == "creative":
-            html_content = self._render_creative_template(edited_resume.content)
-        elif template_name == "technical":
-            html_content = self._render_technical_template(edited_resume.content)
-        else:
-            html_content = self._markdown_to_html(edited_resume.content)
-            html_content = self._apply_styling(html_content)
-        
-        return RenderedResume(
-            html_content=html_content,
-            markdown_content=edited_resume.content,
-            pdf_url=None,
-            created_at=datetime.now()
-        )
+        return self.render(edited_resume, template_name)
     
     def _render_professional_template(self, markdown_content: str) -> str:
         # 商务风格模板 - 更保守的设计
@@ -0,0 +1,291 @@
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional
+import numpy as np
+from app.core.cache import make_cache_key
+from app.core.config import settings
+from app.models.schemas import SemanticMatch
+from app.services.skill_taxonomy import get_skill_taxonomy
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9+#./-]+|[一-鿿]+')
+
+class HashingEmbedder:
+    """基于特征哈希的本地向量化，只依赖NumPy，在CPU上即可运行
+
+    特征包括英文单词及其字符三元组、中文单字和双字组合，以及技能词表中的
+    概念特征：命中的技能会带上标准名、全部别名和所属分类，因此
+    "服务网格"、"Istio"、"Service Mesh" 以及同一分类下的 "微服务治理" 会落在相近的方向上。
+    """
+
+    VERSION = "hash-v1"
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    @property
+    def fingerprint(self) -> str:
+        # 词表变化会改变概念特征，向量缓存随之失效
+        return f"{self.VERSION}:{self.dim}:{get_skill_taxonomy().version}"
+
+    def _add_ngrams(self, features: Dict[str, float], text: str, weight: float):
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            if token.isascii():
+                features["w:" + token] = features.get("w:" + token, 0) + weight
+                padded = f"<{token}>"
+                for i in range(len(padded) - 2):
+                    gram = "c:" + padded[i:i + 3]
+                    features[gram] = features.get(gram, 0) + weight * 0.5
+            else:
+                for i, char in enumerate(token):
+                    features["u:" + char] = features.get("u:" + char, 0) + weight * 0.5
+                    if i + 1 < len(token):
+                        gram = "b:" + token[i:i + 2]
+                        features[gram] = features.get(gram, 0) + weight
+
+    def _features(self, text: str) -> Dict[str, float]:
+        features: Dict[str, float] = {}
+        self._add_ngrams(features, text, 1.0)
+
+        taxonomy = get_skill_taxonomy()
+        for name in taxonomy.skill_matcher.find_all(text):
+            features["skill:" + name] = features.get("skill:" + name, 0) + 2.0
+            category = taxonomy.skill_categories.get(name)
+            if category:
+                features["cat:" + category] = features.get("cat:" + category, 0) + 1.0
+            for surface in taxonomy.surfaces(name):
+                self._add_ngrams(features, surface, 0.5)
+        for category in taxonomy.category_matcher.find_all(text):
+            features["cat:" + category] = features.get("cat:" + category, 0) + 3.0
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """返回形状为(len(texts), dim)的L2归一化float32矩阵"""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text).items():
+                # crc32跨进程稳定，低位决定维度，最高位决定符号，减少哈希冲突带来的偏差
+                hashed = zlib.crc32(feature.encode('utf-8'))
+                sign = 1.0 if hashed & 0x80000000 else -1.0
+                vectors[row, hashed % self.dim] += sign * weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+class SentenceVectorStore:
+    """简历句子向量的磁盘缓存，按句子内容哈希寻址
+
+    向量存放在内存映射的 .npy 矩阵中，行号与 keys.jsonl 中的内容哈希一一对应；
+    容量不足时按倍数扩容。同一份简历再次与新岗位匹配时无需重新向量化。
+    条目数超过max_entries时合并：只保留最近使用的条目重写两个文件，词表变化后
+    旧指纹的向量不再被使用，也随之淘汰。同一目录只允许一个进程写入。
+    """
+
+    INITIAL_CAPACITY = 1024
+    # 合并后保留的条目占上限的比例，留出余量，避免每次新增都触发合并
+    COMPACT_RATIO = 0.75
+
+    def __init__(self, store_dir: str, dim: int, max_entries: int = 0):
+        self.store_dir = store_dir
+        self.dim = dim
+        self.max_entries = max_entries  # 0表示不限制
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.store_dir, name)
+
+    def _load(self):
+        vectors_path = self._path("vectors.npy")
+        keys_path = self._path("keys.jsonl")
+        self._rows: Dict[str, int] = {}
+
+        if os.path.exists(vectors_path):
+            self._vectors = np.load(vectors_path, mmap_mode='r+')
+            if self._vectors.shape[1] != self.dim:
+                # 维度变化后旧向量无法使用，重新建立
+                del self._vectors
+                os.remove(vectors_path)
+                open(keys_path, 'w').close()
+                return self._load()
+            if os.path.exists(keys_path):
+                with open(keys_path, encoding='utf-8') as f:
+                    for row, line in enumerate(f):
+                        if line.strip():
+                            self._rows[json.loads(line)] = row
+        else:
+            self._vectors = np.lib.format.open_memmap(
+                vectors_path, mode='w+', dtype=np.float32, shape=(self.INITIAL_CAPACITY, self.dim)
+            )
+            open(keys_path, 'w').close()
+
+        # 最近使用时间以递增的计数表示；重新打开时按写入顺序近似
+        self._last_used: Dict[str, int] = dict(self._rows)
+        self._clock = len(self._rows)
+        self._keys_file = open(keys_path, 'a', encoding='utf-8')
+
+    def _grow(self, required: int):
+        capacity = len(self._vectors)
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        tmp_path = self._path("vectors.npy.tmp")
+        grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(capacity, self.dim))
+        grown[:len(self._vectors)] = self._vectors
+        grown.flush()
+        del grown
+        del self._vectors
+        os.replace(tmp_path, self._path("vectors.npy"))
+        self._vectors = np.load(self._path("vectors.npy"), mmap_mode='r+')
+
+    def _compact(self, keep: List[str]):
+        """只保留keep中的条目，重写向量矩阵和键文件"""
+        vectors_path = self._path("vectors.npy")
+        keys_path = self._path("keys.jsonl")
+        capacity = self.INITIAL_CAPACITY
+        while capacity < len(keep):
+            capacity *= 2
+
+        tmp_vectors = self._path("vectors.npy.tmp")
+        compacted = np.lib.format.open_memmap(tmp_vectors, mode='w+', dtype=np.float32, shape=(capacity, self.dim))
+        if keep:
+            compacted[:len(keep)] = self._vectors[[self._rows[key] for key in keep]]
+        compacted.flush()
+        del compacted
+        tmp_keys = self._path("keys.jsonl.tmp")
+        with open(tmp_keys, 'w', encoding='utf-8') as f:
+            for key in keep:
+                f.write(json.dumps(key) + "\n")
+
+        # 先清空键文件再替换矩阵：中途崩溃时最多丢失缓存，不会出现键与行错位
+        self._keys_file.close()
+        open(keys_path, 'w').close()
+        del self._vectors
+        os.replace(tmp_vectors, vectors_path)
+        os.replace(tmp_keys, keys_path)
+
+        self._vectors = np.load(vectors_path, mmap_mode='r+')
+        self._rows = {key: row for row, key in enumerate(keep)}
+        self._last_used = {key: self._last_used[key] for key in keep}
+        self._keys_file = open(keys_path, 'a', encoding='utf-8')
+
+    def get_or_embed(self, texts: List[str], embedder: HashingEmbedder) -> np.ndarray:
+        """返回各句子的向量，未缓存的句子批量向量化后追加写入"""
+        fingerprint = embedder.fingerprint
+        keys = [make_cache_key(fingerprint, text) for text in texts]
+
+        with self._lock:
+            self._clock += 1
+            for key in keys:
+                if key in self._rows:
+                    self._last_used[key] = self._clock
+            missing = list(dict.fromkeys(key for key in keys if key not in self._rows))
+            if missing and self.max_entries and len(self._rows) + len(missing) > self.max_entries:
+                # 按最近使用时间保留，本次用到的条目最新，总会被保留
+                budget = max(int(self.max_entries * self.COMPACT_RATIO) - len(missing), 0)
+                recent = sorted(self._rows, key=self._last_used.__getitem__, reverse=True)
+                keep = [key for key in recent if self._last_used[key] == self._clock]
+                keep += recent[len(keep):max(budget, len(keep))]
+                self._compact(keep)
+            if missing:
+                missing_texts = {key: text for key, text in zip(keys, texts)}
+                new_vectors = embedder.embed([missing_texts[key] for key in missing])
+                start = len(self._rows)
+                self._grow(start + len(missing))
+                self._vectors[start:start + len(missing)] = new_vectors
+                self._vectors.flush()
+                # 先写向量再登记键，中途崩溃只会留下未登记的行，下次被覆盖
+                for offset, key in enumerate(missing):
+                    self._rows[key] = start + offset
+                    self._last_used[key] = self._clock
+                    self._keys_file.write(json.dumps(key) + "\n")
+                self._keys_file.flush()
+            rows = [self._rows[key] for key in keys]
+            return np.array(self._vectors[rows])
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def close(self):
+        with self._lock:
+            self._keys_file.close()
+
+class SemanticMatcher:
+    """岗位关键字与简历句子的语义匹配：批量余弦相似度 + top-K"""
+
+    def __init__(self, embedder: Optional[HashingEmbedder] = None, store: Optional[SentenceVectorStore] = None):
+        self.embedder = embedder or HashingEmbedder(settings.semantic_dim)
+        self._store = store
+
+    @property
+    def store(self) -> SentenceVectorStore:
+        # 首次使用时才打开向量目录
+        if self._store is None:
+            self._store = get_sentence_vector_store()
+        return self._store
+
+    def match(self, keywords: List[str], sentences: List[str], top_k: Optional[int] = None,
+              threshold: Optional[float] = None) -> List[SemanticMatch]:
+        """为每个关键字找出最相似的top_k个句子，只返回最高相似度达到阈值的关键字"""
+        top_k = top_k or settings.semantic_top_k
+        threshold = settings.semantic_threshold if threshold is None else threshold
+        sentences = list(dict.fromkeys(sentence.strip() for sentence in sentences if sentence.strip()))
+        if not keywords or not sentences:
+            return []
+
+        # 简历侧向量走缓存，只有岗位关键字需要现算
+        sentence_vectors = self.store.get_or_embed(sentences, self.embedder)
+        keyword_vectors = self.embedder.embed(keywords)
+        similarities = keyword_vectors @ sentence_vectors.T  # 向量已归一化，内积即余弦相似度
+
+        k = min(top_k, len(sentences))
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        matches = []
+        for i, keyword in enumerate(keywords):
+            if top_scores[i, 0] >= threshold:
+                matches.append(SemanticMatch(
+                    keyword=keyword,
+                    sentences=[sentences[j] for j, score in zip(top[i], top_scores[i]) if score >= threshold],
+                    score=float(top_scores[i, 0])
+                ))
+        return matches
+
+_shared_store: Optional[SentenceVectorStore] = None
+_shared_matcher: Optional[SemanticMatcher] = None
+# 首次调用发生在asyncio.to_thread的线程中，加锁保证同一目录只打开一个向量存储
+_shared_lock = threading.Lock()
+
+def get_sentence_vector_store() -> SentenceVectorStore:
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = SentenceVectorStore(
+                    settings.semantic_vector_dir, settings.semantic_dim, settings.semantic_vector_max_entries
+                )
+    return _shared_store
+
+def get_semantic_matcher() -> SemanticMatcher:
+    global _shared_matcher
+    if _shared_matcher is None:
+        with _shared_lock:
+            if _shared_matcher is None:
+                _shared_matcher = SemanticMatcher()
+    return _shared_matcher
+
+def close_sentence_vector_store():
+    global _shared_store, _shared_matcher
+    with _shared_lock:
+        if _shared_store is not None:
+            _shared_store.close()
+            _shared_store = None
+            _shared_matcher = None
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from app.core.config import settings
+from app.core.log import get_logger
+from app.services.keyword_matcher import KeywordMatcher
+
+logger = get_logger(__name__)
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skill_taxonomy.json")
+
+class SkillTaxonomy:
+    """技能词表的只读快照，加载时一次性构建好所有匹配器"""
+
+    def __init__(self, data: dict):
+        self.version = data.get("version")
+        self.category_order: List[str] = list(data.get("category_keywords", {}))
+        self.default_category: str = data.get("default_category") or (self.category_order[0] if self.category_order else "")
+
+        self.skill_categories: Dict[str, str] = {}  # 标准名 -> 分类
+        self._canonical: Dict[str, str] = {}  # 小写写法 -> 标准名
+        self._surfaces_by_name: Dict[str, List[str]] = {}  # 标准名 -> [标准名, 别名...]
+        skill_patterns: Dict[str, str] = {}
+        for skill in data.get("skills", []):
+            name = skill["name"]
+            self.skill_categories[name] = skill.get("category", self.default_category)
+            self._surfaces_by_name[name] = [name] + skill.get("aliases", [])
+            for surface in [name] + skill.get("aliases", []):
+                self._canonical.setdefault(surface.lower(), name)
+                skill_patterns.setdefault(surface, name)
+
+        # 技能名/别名 -> 标准名，用于关键字提取
+        self._surfaces = list(skill_patterns)
+        self.skill_matcher = KeywordMatcher(skill_patterns)
+
+        # 技能名/别名及分类关键词 -> 分类，用于简历渲染；按分类顺序构建，靠前的分类优先
+        category_patterns: Dict[str, str] = {}
+        for category in self.category_order:
+            for surface, name in skill_patterns.items():
+                if self.skill_categories[name] == category:
+                    category_patterns.setdefault(surface, category)
+            for keyword in data["category_keywords"][category]:
+                category_patterns.setdefault(keyword, category)
+        self.category_matcher = KeywordMatcher(category_patterns)
+
+    @classmethod
+    def load(cls, path: str) -> "SkillTaxonomy":
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @property
+    def terms(self) -> List[str]:
+        """所有标准名和别名，可用作分词词典"""
+        return list(self._surfaces)
+
+    def surfaces(self, name: str) -> List[str]:
+        """技能的标准名及全部别名"""
+        return list(self._surfaces_by_name.get(name, [name]))
+
+    def canonicalize(self, term: str) -> str:
+        """把别名归一为标准名，例如 Golang -> Go，未收录的词原样返回"""
+        return self._canonical.get(term.strip().lower(), term)
+
+    def categorize(self, text: str) -> Optional[str]:
+        matched_categories = self.category_matcher.find_all(text)
+        if not matched_categories:
+            return None
+        return min(matched_categories, key=self.category_order.index)
+
+class SkillTaxonomyStore:
+    """持有当前生效的词表快照，文件变化时在后台重新构建并原子替换"""
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._mtime = os.path.getmtime(path)
+        self._last_check = time.monotonic()
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[SkillTaxonomy], None]] = []
+        self.current = SkillTaxonomy.load(path)
+
+    def add_listener(self, listener: Callable[[SkillTaxonomy], None]):
+        """注册词表更新后的回调，例如把新词加入分词词典"""
+        self._listeners.append(listener)
+
+    def reload_if_changed(self) -> bool:
+        with self._lock:
+            self._last_check = time.monotonic()
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime == self._mtime:
+                    return False
+                taxonomy = SkillTaxonomy.load(self.path)
+            except Exception as e:
+                # 文件写到一半或格式错误时保留旧词表，下次检查再试
+                logger.warning(f"技能词表加载失败，继续使用旧版本: {e}")
+                return False
+            # 新结构完全构建好之后才替换引用，请求只会看到完整的旧版或新版
+            self.current = taxonomy
+            self._mtime = mtime
+            logger.info("技能词表已重新加载", extra={"version": taxonomy.version, "skills": len(taxonomy.skill_categories)})
+        for listener in self._listeners:
+            listener(taxonomy)
+        return True
+
+    def maybe_reload(self) -> bool:
+        """距上次检查超过间隔时才检查文件，供没有后台任务的进程（如进程池worker）调用"""
+        if self.check_interval <= 0 or time.monotonic() - self._last_check < self.check_interval:
+            return False
+        return self.reload_if_changed()
+
+    async def watch(self):
+        """后台轮询文件变化，重新构建在线程中完成，不占用请求处理"""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await asyncio.to_thread(self.reload_if_changed)
+
+_store: Optional[SkillTaxonomyStore] = None
+_store_lock = threading.Lock()
+
+def get_taxonomy_store() -> SkillTaxonomyStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SkillTaxonomyStore(
+                settings.skill_taxonomy_path or DEFAULT_TAXONOMY_PATH,
+                settings.skill_taxonomy_reload_interval
+            )
+        return _store
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    return get_taxonomy_store().current
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+import jieba
+from app.core.config import settings
+from app.core.log import get_logger
+from app.services.skill_taxonomy import SkillTaxonomy, get_skill_taxonomy, get_taxonomy_store
+
+logger = get_logger(__name__)
+
+_lock = threading.Lock()
+_warmup_seconds: Optional[float] = None
+_warmup_failed = False
+
+def _add_taxonomy_terms(taxonomy: SkillTaxonomy):
+    # 技术词加入jieba词典，避免 go-zero、Node.js、领域驱动设计 之类的词被切碎；
+    # 纯英文数字的词jieba本来就整段切出，加入反而会把 Google 切成 Go + ogle
+    for term in taxonomy.terms:
+        if ' ' not in term and not (term.isascii() and term.isalnum()):
+            jieba.add_word(term)
+
+def initialize_tokenizer() -> float:
+    """预先构建jieba前缀词典并加载自定义词典，返回预热耗时（秒），重复调用直接返回"""
+    global _warmup_seconds
+    with _lock:
+        if _warmup_seconds is not None:
+            return _warmup_seconds
+
+        start = time.perf_counter()
+        if settings.jieba_cache_file:
+            # 镜像构建时预先序列化好的词典缓存，加载比重新构建快得多
+            os.makedirs(os.path.dirname(os.path.abspath(settings.jieba_cache_file)), exist_ok=True)
+            jieba.dt.cache_file = os.path.abspath(settings.jieba_cache_file)
+        jieba.initialize()
+
+        if settings.jieba_user_dict and os.path.exists(settings.jieba_user_dict):
+            jieba.load_userdict(settings.jieba_user_dict)
+
+        store = get_taxonomy_store()
+        _add_taxonomy_terms(store.current)
+        store.add_listener(_add_taxonomy_terms)
+
+        _warmup_seconds = time.perf_counter() - start
+        logger.info("jieba预热完成", extra={"seconds": round(_warmup_seconds, 3)})
+        return _warmup_seconds
+
+def warm_up_tokenizer():
+    """服务启动时在后台预热；失败时记录日志，回退为首次分词时由jieba自行加载默认词典，不让/ready一直返回503"""
+    global _warmup_failed
+    try:
+        initialize_tokenizer()
+    except Exception as e:
+        _warmup_failed = True
+        logger.error(f"jieba预热失败，将在首次分词时加载: {e}")
+
+def tokenizer_ready() -> bool:
+    return _warmup_seconds is not None or _warmup_failed
+
+def warmup_seconds() -> Optional[float]:
+    return _warmup_seconds
+
+def is_keyword_token(word: str) -> bool:
+    """分词结果中可作为关键字的词：至少两个字符且不含标点空白"""
+    return len(word) >= 2 and word.isalnum()
+
+class TokenizedResume:
+    """简历的一次性分词结果，关键字提取、经历关键字和匹配共用同一份token流
+
+    parts为(分区, 文本)列表，各段文本以空格拼接成text；jieba按空白切分文本块，
+    因此逐段分词与整体分词结果一致，并能记录每个分区在token流中的区间。
+    """
+
+    def __init__(self, parts: List[Tuple[str, str]]):
+        self.parts = parts
+        self.text = ' '.join(text for _, text in parts)
+        self.tokens: List[str] = []
+        self.sections: Dict[str, List[Tuple[int, int]]] = {}  # 分区 -> [(起始token, 结束token)]
+        # 每个分区的关键字词频和技术词计数，按分区加权时使用
+        self._section_terms: Dict[str, Counter] = {}
+        self._section_techs: Dict[str, Counter] = {}
+        skill_matcher = get_skill_taxonomy().skill_matcher
+        for section, text in parts:
+            if self.tokens:
+                self.tokens.append(' ')  # 与text中的分隔空格对应
+            start = len(self.tokens)
+            self.tokens.extend(jieba.lcut(text))
+            self.sections.setdefault(section, []).append((start, len(self.tokens)))
+            self._section_terms.setdefault(section, Counter()).update(
+                token for token in self.tokens[start:] if is_keyword_token(token)
+            )
+            self._section_techs.setdefault(section, Counter()).update(skill_matcher.count(text))
+
+        # 过滤后的关键字词和技术词计数，各阶段直接复用
+        self.terms: List[str] = [token for token in self.tokens if is_keyword_token(token)]
+        self.tech_counts: Dict[str, int] = dict(sum(self._section_techs.values(), Counter()))
+
+    def section_tokens(self, section: str) -> Iterator[str]:
+        for start, end in self.sections.get(section, []):
+            yield from self.tokens[start:end]
+
+    def keywords(self) -> List[str]:
+        return list(set(self.terms) | set(self.tech_counts))
+
+    def term_frequencies(self, section_weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """关键字词频；技术词取分词计数与匹配计数的较大值。传入分区权重时按分区加权求和"""
+        frequencies: Dict[str, float] = {}
+        for section, terms in self._section_terms.items():
+            weight = section_weights.get(section, 1.0) if section_weights else 1
+            counts = Counter(terms)
+            for tech, count in self._section_techs[section].items():
+                counts[tech] = max(counts[tech], count)
+            for term, count in counts.items():
+                frequencies[term] = frequencies.get(term, 0) + count * weight
+        return frequencies
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+简历解析的微基准测试，统计单份简历的平均解析耗时
+
+用法：
+    python benchmark_parser.py --iterations 2000
+    python benchmark_parser.py --purge-re-cache  # 每次解析前清空re模块的缓存，模拟缓存被多样流量挤占
+"""
+import argparse
+import os
+import re
+import sys
+import time
+sys.path.append('.')
+
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from app.services.resume_parser import ResumeParserService
+
+DEFAULT_RESUMES = ["example_resume.md", "test_resume.md", "debug_resume.md"]
+
+def run(resumes, iterations: int, purge_re_cache: bool) -> float:
+    """返回单份简历的平均解析耗时（微秒）"""
+    parser = ResumeParserService()
+    for content in resumes:
+        parser.parse_markdown_resume(content)  # 预热
+
+    elapsed = 0.0
+    for _ in range(iterations):
+        for content in resumes:
+            if purge_re_cache:
+                re.purge()
+            start = time.perf_counter()
+            parser.parse_markdown_resume(content)
+            elapsed += time.perf_counter() - start
+    return elapsed / (iterations * len(resumes)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="简历解析微基准测试")
+    parser.add_argument("files", nargs="*", default=DEFAULT_RESUMES)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--purge-re-cache", action="store_true")
+    args = parser.parse_args()
+
+    resumes = []
+    for path in args.files:
+        with open(path, encoding='utf-8') as f:
+            resumes.append(f.read())
+
+    modes = [True] if args.purge_re_cache else [False, True]
+    for purge in modes:
+        per_resume = run(resumes, args.iterations, purge)
+        label = "re缓存清空" if purge else "re缓存命中"
+        print(f"{label}: {per_resume:.1f} µs/份 ({len(resumes)}份简历 x {args.iterations}次)")
+
+if __name__ == "__main__":
+    main()
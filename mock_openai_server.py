@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+本地OpenAI兼容的模拟服务，用于离线测试LLM调用的并发表现
+
+用法：
+    python mock_openai_server.py --port 9000 --delay 0.5
+"""
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+DEFAULT_CONTENT = '{"keywords": ["Python", "FastAPI"], "suggestions": [], "improved_text": "", "reason": ""}'
+
+STREAM_PIECE_SIZE = 16
+
+def create_app(delay: float = 0.2, responder: Optional[Callable[[str], str]] = None, chunk_delay: float = 0.0) -> FastAPI:
+    """创建模拟应用，delay模拟模型推理耗时，responder根据prompt生成回复内容
+
+    请求带 stream=true 时按SSE逐段返回，delay为首个片段前的等待，chunk_delay为片段间隔。
+    """
+    app = FastAPI()
+    # peers记录客户端的(地址, 端口)，连接复用时多个请求来自同一端口
+    app.state.stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "peers": set()}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        stats = app.state.stats
+        stats["requests"] += 1
+        if request.client:
+            stats["peers"].add((request.client.host, request.client.port))
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        completion_id = f"chatcmpl-mock-{stats['requests']}"
+        content = responder(prompt) if responder else DEFAULT_CONTENT
+
+        if body.get("stream"):
+            async def events():
+                try:
+                    await asyncio.sleep(delay)
+                    pieces = [content[i:i + STREAM_PIECE_SIZE] for i in range(0, len(content), STREAM_PIECE_SIZE)]
+                    for i, piece in enumerate(pieces):
+                        if i and chunk_delay:
+                            await asyncio.sleep(chunk_delay)
+                        yield _chunk_event(completion_id, body, {"content": piece}, None)
+                    yield _chunk_event(completion_id, body, {}, "stop")
+                    yield "data: [DONE]\n\n"
+                finally:
+                    stats["in_flight"] -= 1
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            stats["in_flight"] -= 1
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": len(prompt), "completion_tokens": len(content), "total_tokens": len(prompt) + len(content)}
+        }
+
+    return app
+
+def _chunk_event(completion_id: str, body: dict, delta: dict, finish_reason: Optional[str]) -> str:
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def run_mock_server(delay: float = 0.2, responder: Optional[Callable[[str], str]] = None, chunk_delay: float = 0.0):
+    """在后台线程中启动模拟服务，返回(base_url, app)"""
+    app = create_app(delay, responder, chunk_delay)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}/v1", app
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI兼容的模拟服务")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.delay, chunk_delay=args.chunk_delay), host="127.0.0.1", port=args.port)
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+API接口测试，使用FastAPI TestClient，在禁用AI的情况下运行
+"""
+import os
+import sys
+sys.path.append('.')
+
+os.environ['ENABLE_AI'] = 'False'
+
+from fastapi.testclient import TestClient
+
+RESUME = """# 张三
+
+## 个人信息
+- 邮箱：test@example.com
+- 电话：13800138000
+
+## 专业技能
+- Python, FastAPI, Docker
+- MySQL, Redis
+
+## 工作经历
+### 2020-2024 | 后端工程师 | 某科技公司
+- 负责Python后端服务的设计与开发
+- 使用Docker部署微服务
+
+## 项目经历
+### 数据平台
+- 基于FastAPI构建数据服务
+"""
+
+JOB_HC = "招聘Python后端工程师，熟悉FastAPI、Docker、Kubernetes，有微服务经验"
+
+def get_client():
+    from app.main import app
+    return TestClient(app)
+
+def test_job_profile_reused_by_optimize():
+    client = get_client()
+
+    response = client.post("/api/v1/job-profiles", json={"job_hc": JOB_HC})
+    assert response.status_code == 200, response.text
+    profile = response.json()
+    assert profile["profile_id"].startswith("jp_")
+    assert "Python" in profile["job_keywords"]
+
+    again = client.post("/api/v1/job-profiles", json={"job_hc": "  " + JOB_HC + "\n"})
+    assert again.json()["profile_id"] == profile["profile_id"], "Same HC should map to the same profile"
+
+    result = client.post("/api/v1/optimize-resume", json={
+        "markdown_content": RESUME,
+        "job_profile_id": profile["profile_id"]
+    })
+    assert result.status_code == 200, result.text
+    assert sorted(result.json()["extracted_keywords"]["job_keywords"]) == sorted(profile["job_keywords"])
+
+    missing = client.post("/api/v1/optimize-resume", json={
+        "markdown_content": RESUME,
+        "job_profile_id": "jp_unknown"
+    })
+    assert missing.status_code == 404, missing.text
+    print("✓ Job profile is created once and reused by /optimize-resume")
+
+def test_rank_resumes_orders_by_relevance():
+    client = get_client()
+
+    weak_resume = "# 李四\n\n## 专业技能\n- Excel, PPT\n"
+    resumes = [{"resume_id": f"weak-{i}", "markdown_content": weak_resume} for i in range(9)]
+    resumes.insert(4, {"resume_id": "strong", "markdown_content": RESUME})
+
+    response = client.post("/api/v1/rank-resumes", json={"job_hc": JOB_HC, "resumes": resumes})
+    assert response.status_code == 200, response.text
+    rankings = response.json()["rankings"]
+    assert len(rankings) == 10
+    assert rankings[0]["resume_id"] == "strong", rankings[0]
+    assert rankings[0]["rank"] == 1 and "Python" in rankings[0]["matched_keywords"]
+    assert [r["resume_id"] for r in rankings[1:]] == [f"weak-{i}" for i in range(9)], "Ties keep input order"
+
+    empty = client.post("/api/v1/rank-resumes", json={"job_hc": JOB_HC, "resumes": [{"resume_id": "x"}]})
+    assert empty.status_code == 400, empty.text
+    print("✓ /rank-resumes ranks resumes by relevance in one request")
+
+def test_ranking_and_index_match_skill_aliases():
+    import asyncio
+    import tempfile
+    from app.models.schemas import RankResumeInput
+    from app.services.keyword_extractor import KeywordExtractorService
+    from app.services.resume_index import ResumeIndex, ResumeIndexService
+    from app.services.resume_ranking import ResumeRankingService
+
+    extractor = KeywordExtractorService()
+    resumes = [
+        RankResumeInput(resume_id="alias", markdown_content="# 王五\n\n## 专业技能\n- 熟悉K8s\n"),
+        RankResumeInput(resume_id="canonical", markdown_content="# 赵六\n\n## 专业技能\n- Kubernetes 和 Go\n")
+    ]
+    ranked = asyncio.run(ResumeRankingService(extractor).rank_resumes(resumes, "", ["K8s", "Golang"]))
+    matched = {r.resume_id: r.matched_keywords for r in ranked.rankings}
+    assert ranked.job_keywords == ["Kubernetes", "Go"]
+    assert matched == {"canonical": ["Go", "Kubernetes"], "alias": ["Kubernetes"]}, matched
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ResumeIndex(tmp)
+        service = ResumeIndexService(extractor, index)
+        try:
+            asyncio.run(service.add_resumes(resumes))
+            assert index.stats()["terms"] and "K8s" not in index._delta, "Stored terms use canonical names"
+            results = asyncio.run(service.query("", ["K8s", "Golang"]))
+        finally:
+            index.close()
+    assert [r.resume_id for r in results.rankings] == ["canonical", "alias"]
+    assert results.rankings[0].matched_keywords == ["Kubernetes", "Go"]
+    print("✓ Ranking and the resume index match job skill aliases to canonical names")
+
+def test_optimize_resume_stream_emits_stages():
+    import json
+    client = get_client()
+
+    events = []
+    with client.stream("POST", "/api/v1/optimize-resume/stream", json={"markdown_content": RESUME, "job_hc": JOB_HC}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                events.append(line[len("event: "):])
+    assert events[:3] == ["start", "parsed", "keywords"], events
+    assert "suggestion" in events
+    assert events[-3:] == ["edited", "rendered", "done"], events
+
+    with client.stream("POST", "/api/v1/optimize-resume/stream?format=ndjson", json={"markdown_content": RESUME, "job_hc": JOB_HC}) as response:
+        records = [json.loads(line) for line in response.iter_lines() if line]
+    assert records[-1]["event"] == "done"
+    assert records[-2]["data"]["html_content"], "Rendered HTML is streamed as the last stage"
+    print("✓ /optimize-resume/stream emits each stage as it completes")
+
+def test_ready_after_tokenizer_warmup():
+    import time
+    import jieba
+    from app.main import app
+
+    # 进入上下文才会执行lifespan，触发后台预热
+    with TestClient(app) as client:
+        for _ in range(100):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                break
+            assert response.status_code == 503, response.text
+            time.sleep(0.1)
+        assert response.status_code == 200, response.text
+        assert response.json()["warmup_seconds"] is not None
+
+    assert jieba.dt.initialized
+    assert "go-zero" in jieba.lcut("熟悉go-zero框架"), "Taxonomy terms are added to the jieba dictionary"
+    print("✓ /ready reports ready once jieba is warmed up")
+
+def test_ready_when_tokenizer_warmup_fails():
+    import jieba
+    from app.services import tokenizer
+
+    original = jieba.initialize
+    saved = tokenizer._warmup_seconds
+
+    def broken():
+        raise OSError("dictionary cache is not writable")
+
+    jieba.initialize = broken
+    tokenizer._warmup_seconds = None
+    try:
+        tokenizer.warm_up_tokenizer()
+        assert tokenizer.tokenizer_ready(), "A failed warm-up falls back to lazy loading instead of staying not-ready"
+    finally:
+        jieba.initialize = original
+        tokenizer._warmup_seconds = saved
+        tokenizer._warmup_failed = False
+    print("✓ A failed jieba warm-up falls back to lazy loading")
+
+def test_async_optimize_job_polling():
+    import asyncio
+    import time
+    from app.main import app
+    from app.services.job_queue import JobQueue, JobQueueFull, JobStore
+
+    # worker在lifespan所在的事件循环中运行，需要进入上下文
+    with TestClient(app) as client:
+        response = client.post("/api/v1/optimize-resume?async=true", json={"markdown_content": RESUME, "job_hc": JOB_HC})
+        assert response.status_code == 202, response.text
+        process_id = response.json()["process_id"]
+        assert response.json()["status"] in ("queued", "running")
+
+        for _ in range(100):
+            job = client.get(f"/api/v1/jobs/{process_id}").json()
+            if job["status"] in ("succeeded", "failed"):
+                break
+            time.sleep(0.05)
+        assert job["status"] == "succeeded", job
+        assert {"parse", "extract", "edit", "render"} <= set(job["stage_timings"]), job["stage_timings"]
+        assert job["result"]["process_id"] == process_id
+        assert job["result"]["rendered_resume"]["html_content"]
+
+        assert client.get("/api/v1/jobs/unknown").status_code == 404
+
+    async def overflow():
+        queue = JobQueue(JobStore(), workers=1, max_pending=1)
+        blocker = asyncio.Event()
+        async def runner(job):
+            await blocker.wait()
+        try:
+            queue.submit("a", runner)
+            await asyncio.sleep(0)  # worker取走第一个任务
+            queue.submit("b", runner)
+            try:
+                queue.submit("c", runner)
+            except JobQueueFull:
+                return queue.get("a").status, queue.get("b").status
+            raise AssertionError("Queue should reject jobs beyond max_pending")
+        finally:
+            await queue.shutdown()
+
+    assert asyncio.run(overflow()) == ("running", "queued")
+    print("✓ async=true returns a job id that can be polled for stage timings and the result")
+
+def test_metrics_and_stage_timings():
+    client = get_client()
+
+    response = client.post("/api/v1/optimize-resume", json={"markdown_content": RESUME, "job_hc": JOB_HC, "include_stage_timings": True})
+    assert response.status_code == 200, response.text
+    timings = response.json()["stage_timings"]
+    for name in ("parse", "job_keywords", "resume_keywords", "apply", "render"):
+        assert name in timings, timings
+    assert timings["extract"] >= timings["resume_keywords"]
+
+    response = client.post("/api/v1/optimize-resume", json={"markdown_content": RESUME, "job_hc": JOB_HC})
+    assert response.json()["stage_timings"] is None, "Timings are only returned on request"
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert "# TYPE qiulao_stage_duration_seconds histogram" in text
+    assert 'qiulao_stage_duration_seconds_bucket{stage="parse",le="+Inf"}' in text
+    assert 'qiulao_stage_duration_seconds_count{stage="apply"}' in text
+    assert 'qiulao_llm_fallbacks_total{component="skills"}' in text, "AI is disabled, so every section falls back"
+    assert 'qiulao_cache_misses_total{cache="job_keywords"}' in text
+    assert 'qiulao_in_flight{kind="optimize"} 0' in text
+    print("✓ /metrics exposes stage histograms, fallback counters and cache stats")
+
+def test_structured_logging_with_process_id():
+    import io
+    import json
+    from contextlib import redirect_stdout
+    from app.core.log import bind_process_id, configure_logging, get_logger, shutdown_logging
+    from app.services.resume_parser import ResumeParserService
+
+    def capture(debug_sample_rate):
+        buffer = io.StringIO()
+        configure_logging(level="DEBUG", log_format="json", debug_sample_rate=debug_sample_rate)
+        with redirect_stdout(buffer):
+            with bind_process_id("req-1"):
+                ResumeParserService().parse_markdown_resume(RESUME)
+                get_logger("test").info("done")
+            shutdown_logging()  # 等待后台线程写完队列中的日志
+        return [json.loads(line) for line in buffer.getvalue().splitlines() if line]
+
+    try:
+        records = capture(1.0)
+        assert any(record["level"] == "DEBUG" for record in records), records
+        assert all(record["process_id"] == "req-1" for record in records), records
+        assert "13800138000" not in json.dumps(records, ensure_ascii=False), "Resume content must not be logged"
+
+        records = capture(0.0)
+        assert [record["message"] for record in records] == ["done"], "DEBUG output is sampled away"
+    finally:
+        configure_logging()
+    print("✓ Logs are JSON lines tagged with process_id, without resume content")
+
+def test_stage_executor_offloads_parse_and_tokenize():
+    import asyncio
+    from app.services.executors import StageExecutor, parse_resume, tokenize_resume
+
+    executor = StageExecutor("process", thread_workers=2, process_workers=1)
+
+    async def run():
+        await executor.prewarm()
+        assert executor.ready
+        # 单个worker同时收到两份简历，一份执行中、一份排队
+        tasks = [asyncio.ensure_future(executor.parse_resume(RESUME)) for _ in range(2)]
+        await asyncio.sleep(0)
+        counts = {(labels["pool"], labels["state"]): value for labels, value in executor.task_counts()}
+        assert counts[("process", "running")] == 1 and counts[("process", "queued")] == 1, counts
+        parsed = (await asyncio.gather(*tasks))[0]
+        tokenized = await executor.tokenize_resume(parsed)
+        html = await executor.run_light(lambda text: text.upper(), "ok")
+        return parsed, tokenized, html
+
+    try:
+        parsed, tokenized, html = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert parsed == parse_resume(RESUME), "Parsing in a worker process matches parsing in-process"
+    assert tokenized.tokens == tokenize_resume(parsed).tokens
+    assert html == "OK"
+    assert all(value == 0 for _, value in executor.task_counts())
+
+    response = get_client().get("/metrics")
+    assert 'qiulao_executor_tasks{pool="process",state="queued"}' in response.text
+    print("✓ Parsing and tokenization run in pre-warmed worker processes with queue depth metrics")
+
+def test_stage_executor_falls_back_when_prewarm_fails():
+    import asyncio
+    from concurrent.futures.process import BrokenProcessPool
+    from app.services.executors import StageExecutor
+
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker failed to start")
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            pass
+
+    executor = StageExecutor("process", thread_workers=2, process_workers=2)
+    executor._get_process_pool = lambda: BrokenPool()
+
+    async def run():
+        await executor.prewarm()
+        return await executor.parse_resume(RESUME)
+
+    try:
+        parsed = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert executor.ready and executor.mode == "thread", "A failed prewarm falls back to threads instead of staying not-ready"
+    assert "worker failed to start" in executor.prewarm_error
+    assert parsed.skills
+    print("✓ A failed process pool prewarm falls back to the thread pool")
+
+def test_routers_share_service_container():
+    from app.api import keyword_extractor, optimization, resume_ranking
+    from app.main import app
+    from app.services.keyword_extractor import KeywordExtractorService
+
+    # 路由模块导入时不再各自创建服务
+    for module in (keyword_extractor, optimization, resume_ranking):
+        assert not any(isinstance(value, KeywordExtractorService) for value in vars(module).values()), module.__name__
+
+    with TestClient(app) as client:
+        services = app.state.services
+        profile = client.post("/api/v1/job-profiles", json={"job_hc": JOB_HC}).json()
+        response = client.post("/api/v1/optimize-resume", json={"markdown_content": RESUME, "job_profile_id": profile["profile_id"]})
+        assert response.status_code == 200, response.text
+        assert app.state.services is services, "Every request uses the container created in lifespan"
+        assert services.profiles.extractor_service is services.extractor
+        assert services.editor.llm_client is services.extractor.llm_client is services.llm_client
+        assert KeywordExtractorService().llm_client is services.llm_client, "Services built outside the container share its client"
+    assert app.state.services is None, "The container is released on shutdown"
+    print("✓ Routers share one service container created in lifespan")
+
+def test_incremental_reoptimization_reuses_unchanged_sections():
+    from app.core.metrics import LLM_FALLBACKS
+
+    def regenerated():
+        # AI禁用时每个重新生成的部分都会走一次备用逻辑
+        return sum(LLM_FALLBACKS.value(component=name) for name in ("skills", "work_experience", "projects"))
+
+    client = get_client()
+    first = client.post("/api/v1/optimize-resume", json={"markdown_content": RESUME, "job_hc": JOB_HC}).json()
+    assert first["reused_sections"] is None
+
+    # 备用逻辑生成的建议不沿用（按部分沿用LLM建议见test_llm_client），关键字和渲染结果仍沿用
+    before = regenerated()
+    unchanged = client.post("/api/v1/optimize-resume", json={
+        "markdown_content": RESUME, "job_hc": JOB_HC, "previous_process_id": first["process_id"]
+    }).json()
+    assert regenerated() == before + 2, "Fallback sections are regenerated"
+    assert unchanged["reused_sections"] == []
+    assert unchanged["extracted_keywords"] == first["extracted_keywords"]
+    assert unchanged["edited_resume"]["content"] == first["edited_resume"]["content"]
+    assert unchanged["rendered_resume"]["html_content"] == first["rendered_resume"]["html_content"]
+
+    expired = client.post("/api/v1/optimize-resume", json={
+        "markdown_content": RESUME, "job_hc": JOB_HC, "previous_process_id": "unknown"
+    })
+    assert expired.status_code == 200 and expired.json()["reused_sections"] is None
+    print("✓ Resubmitting with previous_process_id reuses keywords and rendering, not fallback suggestions")
+
+def test_invalid_request_options_rejected():
+    client = get_client()
+
+    for value in (0, -5):
+        response = client.post("/api/v1/optimize-resume", json={
+            "markdown_content": RESUME, "job_hc": JOB_HC, "max_concurrency": value
+        })
+        assert response.status_code == 422, response.text
+
+    response = client.post("/api/v1/optimize-resume", json={
+        "markdown_content": RESUME, "job_hc": JOB_HC, "edit_mode": "bogus"
+    })
+    assert response.status_code == 422, response.text
+
+    response = client.post("/api/v1/optimize-resume", json={"markdown_content": RESUME})
+    assert response.status_code == 422, response.text
+    # 仅解析简历的接口不需要岗位
+    response = client.post("/api/v1/parse-resume", json={"markdown_content": RESUME})
+    assert response.status_code == 200, response.text
+    print("✓ Invalid request options are rejected with 422")
+
+def main():
+    print("Running API tests...")
+    test_job_profile_reused_by_optimize()
+    test_rank_resumes_orders_by_relevance()
+    test_ranking_and_index_match_skill_aliases()
+    test_optimize_resume_stream_emits_stages()
+    test_ready_after_tokenizer_warmup()
+    test_ready_when_tokenizer_warmup_fails()
+    test_async_optimize_job_polling()
+    test_metrics_and_stage_timings()
+    test_structured_logging_with_process_id()
+    test_stage_executor_offloads_parse_and_tokenize()
+    test_stage_executor_falls_back_when_prewarm_fails()
+    test_routers_share_service_container()
+    test_incremental_reoptimization_reuses_unchanged_sections()
+    test_invalid_request_options_rejected()
+    print("\n🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+缓存层测试：内存LRU/TTL、SQLite持久化以及岗位关键字缓存命中
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+sys.path.append('.')
+
+os.environ['ENABLE_AI'] = 'False'
+
+def test_ttl_cache_eviction_and_expiry():
+    from app.core.cache import TTLCache
+
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a变为最近使用
+    cache.set("c", 3)
+    assert cache.get("b") is None, "Least recently used entry should be evicted"
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    time.sleep(0.06)
+    assert cache.get("a") is None, "Expired entry should be dropped"
+    print("✓ LRU eviction and TTL expiry work")
+
+def test_sqlite_tier_survives_restart():
+    from app.core.cache import TieredCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "cache.db")
+        first = TieredCache("test", db_path=db_path)
+        first.set("key", ["Python", "Go"])
+        first.disk.close()
+
+        second = TieredCache("test", db_path=db_path)
+        assert second.get("key") == ["Python", "Go"]
+        assert second.get("key") == ["Python", "Go"]
+        stats = second.stats()
+        assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1, stats
+        second.disk.close()
+    print("✓ SQLite tier persists across cache instances")
+
+def test_job_keywords_cached_by_normalized_hc():
+    from app.services.keyword_extractor import KeywordExtractorService
+
+    extractor = KeywordExtractorService()
+    extractor.job_keywords_cache.clear()
+    hits_before = extractor.job_keywords_cache.hits
+
+    first = asyncio.run(extractor._extract_job_keywords("招聘 Python 后端工程师，熟悉Docker"))
+    second = asyncio.run(extractor._extract_job_keywords("  招聘 Python\n后端工程师，熟悉Docker  "))
+    assert sorted(first) == sorted(second)
+    assert extractor.job_keywords_cache.hits == hits_before + 1, extractor.job_keywords_cache.stats()
+
+    second.append("mutated")
+    third = asyncio.run(extractor._extract_job_keywords("招聘 Python 后端工程师，熟悉Docker"))
+    assert "mutated" not in third, "Callers must not be able to mutate cached values"
+    print("✓ Job keywords are served from cache for equivalent HC text")
+
+def main():
+    print("Running cache tests...")
+    test_ttl_cache_eviction_and_expiry()
+    test_sqlite_tier_survives_restart()
+    test_job_keywords_cached_by_normalized_hc()
+    print("\n🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -77,6 +77,51 @@ def test_basic_functionality():
         print(f"✗ Basic functionality test failed: {e}")
         return False
 
+def test_city_alternation():
+    """City names are matched as whole words, not as single characters"""
+    try:
+        from app.services.resume_parser import ResumeParserService
+
+        result = ResumeParserService().parse_markdown_resume("## 个人信息\n- 姓名：李海\n- 现居：深圳南山区\n")
+        # 字符集写法会把姓名里的“海”当成城市
+        assert result.personal_info.get('address') == "深圳南山区", result.personal_info
+
+        print(f"✓ Parsed address: {result.personal_info['address']}")
+        return True
+    except Exception as e:
+        print(f"✗ City alternation test failed: {e}")
+        return False
+
+def test_work_experience_segmentation():
+    """Both entry formats are split in one pass; long histories stay linear"""
+    try:
+        import time
+        from app.services.resume_parser import ResumeParserService
+
+        parser = ResumeParserService()
+        content = "## 工作经历\n2020-2024 | 后端工程师 | 甲公司\n- 负责A\n**乙公司** | 开发工程师\n- 负责B\n"
+        entries = parser.parse_markdown_resume(content).work_experience
+        assert [entry.get('company') for entry in entries] == ["甲公司", "乙公司"], entries
+
+        # 粗体条目下以年份开头的明细行不能被拆成新条目
+        content = "## 工作经历\n**丙公司** | 后端工程师\n2020-2023 | 北京 | 全职\n- 负责C\n**丁公司** | 测试工程师\n- 负责D\n"
+        entries = parser.parse_markdown_resume(content).work_experience
+        assert [entry.get('company') for entry in entries] == ["丙公司", "丁公司"], entries
+        assert "2020-2023 | 北京 | 全职" in entries[0]["raw_text"], entries
+
+        pasted = "".join(f"**公司{i}** | 工程师 " + "x" * 200 + "\n" for i in range(20000))
+        start = time.perf_counter()
+        entries = parser._extract_work_experience({"工作经历": pasted})
+        elapsed = time.perf_counter() - start
+        assert len(entries) == 20000
+        assert elapsed < 2.0, f"Segmenting 20000 entries took {elapsed:.2f}s"
+
+        print(f"✓ Segmented 20000 work entries in {elapsed:.2f}s")
+        return True
+    except Exception as e:
+        print(f"✗ Work experience segmentation test failed: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("Running CI tests...")
@@ -89,6 +134,12 @@ def main():
     print("\n2. Testing basic functionality...")
     success &= test_basic_functionality()
     
+    print("\n3. Testing address parsing...")
+    success &= test_city_alternation()
+    
+    print("\n4. Testing work experience segmentation...")
+    success &= test_work_experience_segmentation()
+    
     if success:
         print("\n🎉 All tests passed!")
         sys.exit(0)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+多模式关键字匹配器测试：单词边界、大小写和中文词
+"""
+import os
+import sys
+sys.path.append('.')
+
+os.environ['ENABLE_AI'] = 'False'
+
+def test_word_boundaries_and_case():
+    from app.services.keyword_matcher import KeywordMatcher
+
+    matcher = KeywordMatcher(["Go", "Java", "JavaScript", "C++", "微服务", "CI/CD"])
+    assert matcher.find_all("在Google负责golang开发") == [], "Go must not match inside Google or golang"
+    assert matcher.find_all("熟悉JavaScript") == ["JavaScript"], "Java must not match inside JavaScript"
+    assert matcher.find_all("精通go、java和c++，负责微服务治理与ci/cd") == ["Go", "Java", "C++", "微服务", "CI/CD"]
+    assert matcher.count("Go go GO Google") == {"Go": 3}
+    print("✓ Matcher respects word boundaries and ignores case")
+
+def test_extractor_and_renderer_use_matcher():
+    from app.services.keyword_extractor import KeywordExtractorService
+    from app.services.resume_renderer import ResumeRendererService
+    from app.services.tokenizer import TokenizedResume
+
+    extractor = KeywordExtractorService()
+    keywords = extractor._extract_resume_keywords(TokenizedResume([("skills", "曾在Google使用Python和Kubernetes")]))
+    assert "Python" in keywords and "Kubernetes" in keywords
+    assert "Go" not in keywords
+
+    renderer = ResumeRendererService()
+    categories = renderer._categorize_skills(["Python, Docker", "Kubernetes 运维", "沟通能力"])
+    assert categories == {"编程语言": ["Python, Docker"], "框架&工具": ["沟通能力"], "运维&部署": ["Kubernetes 运维"]}, categories
+    print("✓ Extractor and renderer match tech keywords through the automaton")
+
+def test_tokenized_resume_matches_full_text_segmentation():
+    import jieba
+    from app.services.keyword_extractor import KeywordExtractorService
+    from app.services.resume_parser import ResumeParserService
+
+    parsed = ResumeParserService().parse_markdown_resume(
+        "# 张三\n\n## 专业技能\n- Python, Kubernetes\n\n"
+        "## 工作经历\n### 2020-2024 | 后端工程师 | 某科技公司\n- 负责微服务架构设计\n- 使用K8s部署服务\n"
+    )
+    extractor = KeywordExtractorService()
+    tokenized = extractor.tokenize_resume(parsed)
+
+    assert tokenized.tokens == jieba.lcut(tokenized.text), "Per-part segmentation equals one pass over the text"
+    assert list(tokenized.section_tokens("responsibilities")) == jieba.lcut("负责微服务架构设计") + jieba.lcut("使用K8s部署服务")
+    assert {"Python", "Kubernetes", "架构设计"} <= set(extractor._extract_resume_keywords(tokenized))
+    assert tokenized.term_frequencies()["Kubernetes"] == 2, "Alias K8s counts toward Kubernetes"
+    assert tokenized.term_frequencies({"skills": 2.0})["Kubernetes"] == 3, "Skills section is weighted"
+    assert "架构设计" in extractor._extract_experience_keywords(parsed.work_experience, tokenized)
+    print("✓ Resume is tokenized once and shared by keyword stages")
+
+def test_taxonomy_aliases_and_hot_reload():
+    import json
+    import tempfile
+    import time
+    from app.services.skill_taxonomy import SkillTaxonomyStore, get_skill_taxonomy
+
+    taxonomy = get_skill_taxonomy()
+    assert taxonomy.canonicalize("golang") == "Go"
+    assert taxonomy.canonicalize("K8s") == "Kubernetes"
+    assert taxonomy.skill_matcher.find_all("熟悉Golang、K8s和PG") == ["Go", "Kubernetes", "PostgreSQL"]
+
+    data = {"category_keywords": {"语言": []}, "skills": [{"name": "Go", "category": "语言", "aliases": []}]}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "taxonomy.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        store = SkillTaxonomyStore(path, check_interval=0)
+        old = store.current
+        assert old.skill_matcher.find_all("Golang") == []
+
+        data["skills"][0]["aliases"] = ["Golang"]
+        time.sleep(0.01)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.utime(path, (time.time() + 1, time.time() + 1))
+        assert store.reload_if_changed()
+        assert store.current is not old, "Reload should swap in a new snapshot"
+        assert store.current.skill_matcher.find_all("Golang") == ["Go"]
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{broken")
+        os.utime(path, (time.time() + 2, time.time() + 2))
+        assert not store.reload_if_changed(), "Broken files keep the previous taxonomy"
+        assert store.current.skill_matcher.find_all("Golang") == ["Go"]
+    print("✓ Taxonomy resolves aliases and hot-reloads atomically")
+
+def test_semantic_match_with_cached_sentence_vectors():
+    import tempfile
+    import numpy as np
+    from app.services.semantic_matcher import HashingEmbedder, SemanticMatcher, SentenceVectorStore
+
+    class SmallStore(SentenceVectorStore):
+        INITIAL_CAPACITY = 2  # 触发扩容
+
+    sentences = ["基于Istio搭建服务网格，负责流量管控", "熟悉Python和FastAPI", "负责数据报表开发"]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SmallStore(tmp, dim=512)
+        matcher = SemanticMatcher(HashingEmbedder(512), store)
+        matches = matcher.match(["微服务治理", "Rust"], sentences, top_k=2)
+        assert [m.keyword for m in matches] == ["微服务治理"], matches
+        assert matches[0].sentences == ["基于Istio搭建服务网格，负责流量管控"]
+        assert len(store) == 3
+
+        # 换一个岗位只需向量化岗位关键字，简历句子直接命中缓存
+        matcher.match(["Python"], sentences + ["负责数据报表开发"])
+        assert len(store) == 3
+        store.close()
+
+        reloaded = SmallStore(tmp, dim=512)
+        assert len(reloaded) == 3
+        vectors = reloaded.get_or_embed(sentences, HashingEmbedder(512))
+        assert abs(float(vectors[0] @ HashingEmbedder(512).embed([sentences[0]])[0]) - 1) < 1e-5
+        reloaded.close()
+
+        # 超过条目上限时只保留最近使用的条目，磁盘占用不再无限增长
+        capped = SmallStore(os.path.join(tmp, "capped"), dim=512, max_entries=8)
+        embedder = HashingEmbedder(512)
+        capped.get_or_embed(sentences, embedder)
+        for batch in range(5):
+            capped.get_or_embed([f"负责第{batch}期项目的模块{i}开发" for i in range(3)] + sentences[:1], embedder)
+        assert len(capped) <= 8
+        capped.close()
+        reopened = SmallStore(os.path.join(tmp, "capped"), dim=512, max_entries=8)
+        assert len(reopened) == len(capped)
+        vectors = reopened.get_or_embed([sentences[0], "负责第4期项目的模块2开发"], embedder)
+        assert len(reopened) == len(capped), "Recently used sentences survive compaction"
+        assert np.allclose(vectors, embedder.embed([sentences[0], "负责第4期项目的模块2开发"]), atol=1e-5)
+        reopened.close()
+    print("✓ Semantic matching reuses memory-mapped sentence vectors")
+
+def main():
+    print("Running keyword matcher tests...")
+    test_word_boundaries_and_case()
+    test_extractor_and_renderer_use_matcher()
+    test_tokenized_resume_matches_full_text_segmentation()
+    test_semantic_match_with_cached_sentence_vectors()
+    test_taxonomy_aliases_and_hot_reload()
+    print("\n🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+LLM客户端并发测试，使用本地模拟的OpenAI兼容服务，无需API Key
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+sys.path.append('.')
+
+os.environ['ENABLE_AI'] = 'False'
+
+from mock_openai_server import run_mock_server
+
+DELAY = 0.3
+CONCURRENCY = 20
+
+def test_concurrent_calls_do_not_serialize():
+    """并发的LLM调用总耗时应接近单次调用，而不是累加"""
+    from app.services.llm_client import LLMClient
+
+    async def run(base_url):
+        client = LLMClient(api_key="mock-key", base_url=base_url)
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[client.chat(f"prompt {i}") for i in range(CONCURRENCY)])
+            return results, time.perf_counter() - start
+        finally:
+            await client.close()
+
+    with run_mock_server(delay=DELAY) as (base_url, app):
+        results, elapsed = asyncio.run(run(base_url))
+
+    assert all(results), "All calls should return content"
+    assert app.state.stats["max_in_flight"] > 1, "Calls should overlap on the server"
+    assert elapsed < DELAY * CONCURRENCY / 4, f"{CONCURRENCY} calls took {elapsed:.2f}s"
+    print(f"✓ {CONCURRENCY} concurrent calls finished in {elapsed:.2f}s (serial: {DELAY * CONCURRENCY:.1f}s)")
+
+def test_event_loop_not_blocked():
+    """LLM调用进行期间，事件循环仍能处理其他协程"""
+    from app.services.keyword_extractor import KeywordExtractorService
+    from app.services.llm_client import LLMClient
+
+    async def run(base_url):
+        client = LLMClient(api_key="mock-key", base_url=base_url)
+        extractor = KeywordExtractorService(llm_client=client)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        try:
+            keywords = await extractor._extract_job_keywords("招聘Python后端工程师")
+        finally:
+            tick_task.cancel()
+            await client.close()
+        return keywords, ticks
+
+    with run_mock_server(delay=DELAY) as (base_url, _):
+        keywords, ticks = asyncio.run(run(base_url))
+
+    assert keywords == ["Python", "FastAPI"], keywords
+    assert ticks >= 10, f"Event loop only ticked {ticks} times during the LLM call"
+    print(f"✓ Event loop ticked {ticks} times during a {DELAY}s LLM call")
+
+def _uncached_editor(client):
+    """各测试的模拟服务回复不同，先清空按prompt缓存的回复，避免命中其他测试的结果"""
+    from app.services.resume_editor import ResumeEditorService
+
+    editor = ResumeEditorService(llm_client=client)
+    editor.suggestion_cache.clear()
+    return editor
+
+def _entry_responder(prompt):
+    """把prompt中的条目标记原样带回，便于校验结果顺序"""
+    marker = re.search(r'ENTRY-[WP]\d+', prompt)
+    if marker:
+        return json.dumps({"improved_text": f"{marker.group()} 优化后", "reason": "mock"}, ensure_ascii=False)
+    return json.dumps({"suggestions": [{"original": "Python", "improved": "Python, FastAPI", "reason": "mock"}]})
+
+def test_editor_fans_out_suggestions_in_order():
+    """多段经历的建议并发生成，受并发上限约束，且按原始顺序返回"""
+    from app.models.schemas import ParsedResume, ExtractedKeywords
+    from app.services.llm_client import LLMClient
+
+    parsed = ParsedResume(
+        personal_info={},
+        education=[],
+        work_experience=[{"raw_text": f"ENTRY-W{i} 负责后端服务的设计与开发工作"} for i in range(6)],
+        skills=["Python"],
+        projects=[{"raw_text": f"ENTRY-P{i} 基于FastAPI的数据平台项目"} for i in range(8)],
+        raw_sections={}
+    )
+    keywords = ExtractedKeywords(job_keywords=[], skill_keywords=[], experience_keywords=[],
+                                 matched_keywords=[], missing_keywords=["FastAPI"], relevance_score=0)
+
+    async def run(base_url):
+        client = LLMClient(api_key="mock-key", base_url=base_url)
+        editor = _uncached_editor(client)
+        try:
+            start = time.perf_counter()
+            suggestions = await editor._generate_edit_suggestions(parsed, keywords, "Python工程师", max_concurrency=5)
+            return suggestions, time.perf_counter() - start
+        finally:
+            await client.close()
+
+    with run_mock_server(delay=DELAY, responder=_entry_responder) as (base_url, app):
+        suggestions, elapsed = asyncio.run(run(base_url))
+
+    sections = [s.section for s in suggestions]
+    expected = ["技能"] + [f"工作经历{i+1}" for i in range(6)] + [f"项目经历{i+1}" for i in range(8)]
+    assert sections == expected, sections
+    assert suggestions[3].suggested_text.startswith("ENTRY-W2"), suggestions[3].suggested_text
+    assert app.state.stats["max_in_flight"] <= 5, app.state.stats
+    assert elapsed < DELAY * len(expected) / 2, f"15 suggestion calls took {elapsed:.2f}s"
+    print(f"✓ {len(expected)} suggestion calls finished in {elapsed:.2f}s with max {app.state.stats['max_in_flight']} in flight")
+
+def test_closing_suggestion_stream_cancels_pending_calls():
+    """流式消费到第一条建议后关闭，其余LLM调用被取消，不再发往服务端"""
+    from contextlib import aclosing
+    from app.models.schemas import ParsedResume, ExtractedKeywords
+    from app.services.llm_client import LLMClient
+
+    parsed = ParsedResume(
+        personal_info={}, education=[], skills=["Python"], raw_sections={},
+        work_experience=[{"raw_text": f"ENTRY-W{i} 负责后端服务的设计与开发工作"} for i in range(10)],
+        projects=[]
+    )
+    keywords = ExtractedKeywords(job_keywords=[], skill_keywords=[], experience_keywords=[],
+                                 matched_keywords=[], missing_keywords=[], relevance_score=0)
+
+    async def run(base_url):
+        client = LLMClient(api_key="mock-key", base_url=base_url)
+        editor = _uncached_editor(client)
+        try:
+            async with aclosing(editor.iter_edit_suggestions(parsed, keywords, "Python工程师", max_concurrency=2)) as results:
+                async for index, suggestions in results:
+                    break
+            await asyncio.sleep(DELAY * 2)
+            return index, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        finally:
+            await client.close()
+
+    with run_mock_server(delay=DELAY, responder=_entry_responder) as (base_url, app):
+        index, leftover = asyncio.run(run(base_url))
+
+    assert index in (0, 1), index
+    assert not leftover, leftover
+    assert app.state.stats["requests"] <= 4, app.state.stats
+    print(f"✓ Closing the suggestion stream cancelled the rest ({app.state.stats['requests']}/11 calls sent)")
+
+def _batched_responder(prompt):
+    """批量prompt返回整份简历的建议，逐段prompt沿用条目标记"""
+    if "每段以[段落名]开头" not in prompt:
+        return _entry_responder(prompt)
+    if "BROKEN" in prompt:
+        return "抱歉，这里没有JSON"
+    sections = [{"section": name, "improved_text": f"{name} 批量优化", "reason": "mock"}
+                for name in re.findall(r'\[((?:工作|项目)经历\d+)\]', prompt)]
+    content = json.dumps({"skills": [], "sections": sections}, ensure_ascii=False)
+    if "TRUNCATED" in prompt:
+        # 回复在第二段之后被截断（如超出max_tokens）
+        return content[:content.index("项目经历1") - len('{"section": "')]
+    return content
+
+def test_batched_mode_uses_single_call_and_falls_back():
+    """批量模式只发起一次调用；返回无法解析时退回逐段模式"""
+    from app.models.schemas import ParsedResume, ExtractedKeywords
+    from app.services.llm_client import LLMClient
+
+    def make_resume(tag):
+        return ParsedResume(
+            personal_info={}, education=[], skills=[], raw_sections={},
+            work_experience=[{"raw_text": f"ENTRY-W{i} {tag} 负责后端服务的设计与开发"} for i in range(2)],
+            projects=[{"raw_text": f"ENTRY-P{i} {tag} 基于FastAPI的数据平台项目"} for i in range(3)]
+        )
+    keywords = ExtractedKeywords(job_keywords=[], skill_keywords=[], experience_keywords=[],
+                                 matched_keywords=[], missing_keywords=[], relevance_score=0)
+
+    async def run(base_url, resume):
+        client = LLMClient(api_key="mock-key", base_url=base_url)
+        editor = _uncached_editor(client)
+        try:
+            return await editor._generate_edit_suggestions(resume, keywords, "Python工程师", edit_mode="batched")
+        finally:
+            await client.close()
+
+    with run_mock_server(delay=0.05, responder=_batched_responder) as (base_url, app):
+        suggestions = asyncio.run(run(base_url, make_resume("OK")))
+        assert app.state.stats["requests"] == 1, app.state.stats
+        assert [s.section for s in suggestions] == ["工作经历1", "工作经历2", "项目经历1", "项目经历2", "项目经历3"]
+        assert suggestions[0].suggested_text == "工作经历1 批量优化"
+
+        fallback = asyncio.run(run(base_url, make_resume("BROKEN")))
+        assert app.state.stats["requests"] == 1 + 1 + 1 + 5, app.state.stats
+        assert fallback[1].suggested_text.startswith("ENTRY-W0"), fallback
+
+        truncated = asyncio.run(run(base_url, make_resume("TRUNCATED")))
+        assert app.state.stats["requests"] == 8 + 1 + 3, "Only the sections missing from the cut-off reply are retried"
+        assert [s.section for s in truncated] == ["工作经历1", "工作经历2", "项目经历1", "项目经历2", "项目经历3"]
+        assert truncated[1].suggested_text == "工作经历2 批量优化"
+        assert truncated[2].suggested_text.startswith("ENTRY-P0"), truncated
+    print("✓ Batched mode uses one call and falls back to per-section prompts")
+
+def test_skill_suggestions_stream_before_completion_finishes():
+    """技能建议按对象流式产出，第一条建议远早于整段回复结束"""
+    from app.models.schemas import ParsedResume, ExtractedKeywords
+    from app.services.llm_client import LLMClient
+
+    items = [{"original": f"技能{i}", "improved": f"熟练掌握技能{i}并用于生产环境", "reason": "突出岗位相关经验"} for i in range(8)]
+    content = "```json\n" + json.dumps({"suggestions": items}, ensure_ascii=False) + "\n```"
+    parsed = ParsedResume(personal_info={}, education=[], work_experience=[], projects=[],
+                          skills=["Python"], raw_sections={})
+    keywords = ExtractedKeywords(job_keywords=[], skill_keywords=[], experience_keywords=[],
+                                 matched_keywords=[], missing_keywords=["FastAPI"], relevance_score=0)
+
+    async def run(base_url):
+        client = LLMClient(api_key="mock-key", base_url=base_url)
+        editor = _uncached_editor(client)
+        try:
+            start = time.perf_counter()
+            arrivals = []
+            async for index, suggestions in editor.iter_edit_suggestions(parsed, keywords, "Python工程师"):
+                arrivals.extend((time.perf_counter() - start, suggestion) for suggestion in suggestions)
+            return arrivals, time.perf_counter() - start
+        finally:
+            await client.close()
+
+    with run_mock_server(delay=0.05, responder=lambda prompt: content, chunk_delay=0.02) as (base_url, _):
+        arrivals, elapsed = asyncio.run(run(base_url))
+
+    assert [s.original_text for _, s in arrivals] == [item["original"] for item in items]
+    assert arrivals[0][0] < elapsed / 3, f"first suggestion at {arrivals[0][0]:.2f}s of {elapsed:.2f}s"
+    print(f"✓ First skill suggestion streamed at {arrivals[0][0]:.2f}s, full completion took {elapsed:.2f}s")
+
+def test_disabled_client_returns_empty():
+    from app.services.llm_client import LLMClient
+
+    client = LLMClient(api_key="")
+    assert not client.enabled
+    assert asyncio.run(client.chat("hello")) == ""
+    print("✓ Disabled client falls back to empty response")
+
+def test_calls_reuse_pooled_connections():
+    """连续调用复用同一条keep-alive连接，并发调用不超过连接池上限"""
+    from app.services.llm_client import LLMClient, create_http_client
+
+    async def run(base_url):
+        client = LLMClient(api_key="mock-key", base_url=base_url, http_client=create_http_client(max_connections=2))
+        try:
+            for i in range(5):
+                assert await client.chat(f"sequential {i}")
+            sequential_peers = set(app.state.stats["peers"])
+            results = await asyncio.gather(*[client.chat(f"concurrent {i}") for i in range(10)])
+            return sequential_peers, results
+        finally:
+            await client.close()
+
+    with run_mock_server(delay=0.05) as (base_url, app):
+        sequential_peers, results = asyncio.run(run(base_url))
+
+    assert all(results)
+    assert len(sequential_peers) == 1, f"Sequential calls opened {len(sequential_peers)} connections"
+    assert len(app.state.stats["peers"]) <= 2, app.state.stats["peers"]
+    assert app.state.stats["max_in_flight"] <= 2, "Concurrent calls wait for a pooled connection"
+    print(f"✓ 15 calls used {len(app.state.stats['peers'])} pooled connections")
+
+def test_unchanged_sections_reuse_cached_suggestions():
+    """重新提交时只有改动的段落重新调用LLM，bypass_cache时全部重新调用"""
+    from app.models.schemas import ParsedResume, ExtractedKeywords
+    from app.services.llm_client import LLMClient
+
+    def resume(edited_entry):
+        work = [{"raw_text": f"ENTRY-W{i} 负责后端服务的设计与开发工作"} for i in range(3)]
+        work[1]["raw_text"] = edited_entry
+        return ParsedResume(personal_info={}, education=[], work_experience=work, skills=["Python"],
+                            projects=[{"raw_text": "ENTRY-P0 基于FastAPI的数据平台项目"}], raw_sections={})
+    keywords = ExtractedKeywords(job_keywords=[], skill_keywords=[], experience_keywords=[],
+                                 matched_keywords=[], missing_keywords=["FastAPI"], relevance_score=0)
+
+    async def run(base_url, app):
+        client = LLMClient(api_key="mock-key", base_url=base_url)
+        editor = _uncached_editor(client)
+        counts = []
+        try:
+            for parsed, bypass_cache in [(resume("ENTRY-W1 负责后端服务"), False),
+                                         (resume("ENTRY-W1 负责后端服务的开发"), False),
+                                         (resume("ENTRY-W1 负责后端服务的开发"), True)]:
+                before = app.state.stats["requests"]
+                suggestions = await editor._generate_edit_suggestions(parsed, keywords, "Python工程师", bypass_cache=bypass_cache)
+                counts.append(app.state.stats["requests"] - before)
+            return suggestions, counts
+        finally:
+            await client.close()
+
+    with run_mock_server(delay=0.01, responder=_entry_responder) as (base_url, app):
+        suggestions, counts = asyncio.run(run(base_url, app))
+
+    assert counts == [5, 1, 5], counts
+    assert [s.section for s in suggestions] == ["技能", "工作经历1", "工作经历2", "工作经历3", "项目经历1"]
+    print(f"✓ LLM calls per submission: {counts} (first, after editing one entry, bypass_cache)")
+
+def test_degraded_job_profile_is_re_extracted():
+    """AI调用失败时保存的画像标记为降级，再次创建同一岗位时重新调用LLM"""
+    from app.services.job_profile import JobProfileService
+    from app.services.keyword_extractor import KeywordExtractorService
+    from app.services.llm_client import LLMClient
+
+    replies = iter(["not json", json.dumps({"keywords": ["Go", "gRPC"]})])
+
+    async def run(base_url):
+        client = LLMClient(api_key="mock-key", base_url=base_url)
+        profiles = JobProfileService(KeywordExtractorService(llm_client=client))
+        try:
+            hc = f"招聘Go后端工程师 {time.time()}"
+            return await profiles.create_profile(hc), await profiles.create_profile(hc)
+        finally:
+            await client.close()
+
+    with run_mock_server(delay=0.01, responder=lambda prompt: next(replies)) as (base_url, _):
+        first, second = asyncio.run(run(base_url))
+
+    assert first.degraded and second.profile_id == first.profile_id
+    assert not second.degraded and second.job_keywords == ["Go", "gRPC"], second
+    print("✓ A degraded job profile is re-extracted on the next create")
+
+def test_history_reuses_unchanged_llm_sections_only():
+    """增量优化只沿用输入未变且由LLM生成的部分：匹配关键字变化不影响经历，上次退回备用逻辑的部分重新调用"""
+    from datetime import datetime
+    from app.models.schemas import ParsedResume, ExtractedKeywords, OptimizationResult, RenderedResume
+    from app.services.llm_client import LLMClient
+    from app.services.optimization_history import OptimizationHistory
+    from app.services.resume_editor import collect_fallback_sections
+
+    def resume(edited_entry):
+        work = [{"raw_text": f"ENTRY-W{i} 负责后端服务的设计与开发工作"} for i in range(3)]
+        work[1]["raw_text"] = edited_entry
+        return ParsedResume(personal_info={}, education=[], work_experience=work, skills=["Python"],
+                            projects=[{"raw_text": "ENTRY-P0 基于FastAPI的数据平台项目"}], raw_sections={})
+
+    def keywords(matched):
+        return ExtractedKeywords(job_keywords=[], skill_keywords=[], experience_keywords=[],
+                                 matched_keywords=matched, missing_keywords=["FastAPI"], relevance_score=0)
+
+    def responder(prompt):
+        # 第三段工作经历的调用失败，走备用逻辑
+        return "" if "ENTRY-W2" in prompt else _entry_responder(prompt)
+
+    async def run(base_url, app):
+        client = LLMClient(api_key="mock-key", base_url=base_url)
+        editor = _uncached_editor(client)
+        history = OptimizationHistory(editor)
+        try:
+            first = resume("ENTRY-W1 负责后端服务")
+            with collect_fallback_sections() as fallbacks:
+                edited = await editor.edit_resume(first, keywords(["Python"]), "Python工程师")
+            rendered = RenderedResume(html_content="", markdown_content=edited.content, created_at=datetime.now())
+            history.save(OptimizationResult(original_resume=first, extracted_keywords=keywords(["Python"]), edited_resume=edited,
+                                            rendered_resume=rendered, process_id="incremental-1"), "Python工程师", fallbacks)
+
+            editor.suggestion_cache.clear()
+            second = resume("ENTRY-W1 负责后端服务的开发")
+            reused = history.get("incremental-1").reusable_suggestions(second, keywords(["Docker", "Python"]), "Python工程师")
+            before = app.state.stats["requests"]
+            suggestions = await editor._generate_edit_suggestions(second, keywords(["Docker", "Python"]), "Python工程师", reused=reused)
+            return fallbacks, reused, suggestions, app.state.stats["requests"] - before
+        finally:
+            await client.close()
+
+    with run_mock_server(delay=0.01, responder=responder) as (base_url, app):
+        fallbacks, reused, suggestions, calls = asyncio.run(run(base_url, app))
+
+    assert fallbacks == {"工作经历3"}, fallbacks
+    assert sorted(reused) == [0, 1, 4], "Skills, the untouched entry and the project are reused despite new matched keywords"
+    assert calls == 2, "Only the edited entry and the previous fallback call the LLM again"
+    assert [s.section for s in suggestions] == ["技能", "工作经历1", "工作经历2", "工作经历3", "项目经历1"]
+    print(f"✓ Incremental re-optimization called the LLM {calls} times (edited entry + previous fallback)")
+
+def test_history_reuses_identical_entries_once_each():
+    """两段原文相同的经历指纹相同，各自只沿用上次对应那一段的建议，不会重复"""
+    from datetime import datetime
+    from app.models.schemas import EditedResume, EditSuggestion, ParsedResume, ExtractedKeywords, OptimizationResult, RenderedResume
+    from app.services.llm_client import LLMClient
+    from app.services.optimization_history import OptimizationHistory
+
+    entry = {"raw_text": "负责后端服务的设计与开发工作"}
+    parsed = ParsedResume(personal_info={}, education=[], work_experience=[entry, dict(entry)], skills=["Python"],
+                          projects=[], raw_sections={})
+    keywords = ExtractedKeywords(job_keywords=[], skill_keywords=[], experience_keywords=[],
+                                 matched_keywords=["Python"], missing_keywords=[], relevance_score=0)
+    suggestions = [EditSuggestion(section=name, original_text=entry["raw_text"], suggested_text=f"{name}的建议", reason="", priority="high")
+                   for name in ("技能", "工作经历1", "工作经历2")]
+    edited = EditedResume(content="", suggestions=suggestions, improvement_summary="")
+    rendered = RenderedResume(html_content="", markdown_content="", created_at=datetime.now())
+
+    history = OptimizationHistory(_uncached_editor(LLMClient(api_key="")))
+    history.save(OptimizationResult(original_resume=parsed, extracted_keywords=keywords, edited_resume=edited,
+                                    rendered_resume=rendered, process_id="identical-entries"), "Python工程师")
+    reused = history.get("identical-entries").reusable_suggestions(parsed, keywords, "Python工程师")
+
+    assert sorted(reused) == [0, 1, 2], reused
+    for index, name in ((1, "工作经历1"), (2, "工作经历2")):
+        assert [s.suggested_text for s in reused[index]] == [f"{name}的建议"], reused[index]
+        assert [s.section for s in reused[index]] == [name]
+    print("✓ Identical entries each reuse exactly their own previous suggestions")
+
+def main():
+    print("Running LLM client tests...")
+    test_disabled_client_returns_empty()
+    test_concurrent_calls_do_not_serialize()
+    test_event_loop_not_blocked()
+    test_editor_fans_out_suggestions_in_order()
+    test_closing_suggestion_stream_cancels_pending_calls()
+    test_batched_mode_uses_single_call_and_falls_back()
+    test_skill_suggestions_stream_before_completion_finishes()
+    test_calls_reuse_pooled_connections()
+    test_unchanged_sections_reuse_cached_suggestions()
+    test_degraded_job_profile_is_re_extracted()
+    test_history_reuses_unchanged_llm_sections_only()
+    test_history_reuses_identical_entries_once_each()
+    print("\n🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+简历倒排索引测试：增量增删、合并持久化与top-K查询
+"""
+import os
+import sys
+import tempfile
+sys.path.append('.')
+
+os.environ['ENABLE_AI'] = 'False'
+
+def test_incremental_add_remove_and_query():
+    from app.services.resume_index import ResumeIndex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ResumeIndex(tmp, compact_threshold=1000)
+        index.add("alice", {"Python": 3, "Docker": 1, "FastAPI": 2})
+        index.add("bob", {"Java": 2, "Spring": 1})
+        index.add("carol", {"Python": 1, "Kubernetes": 1})
+
+        results = index.query(["Python", "Docker", "Kubernetes"], top_k=5)
+        # 两份简历都命中两个关键字，carol的简历更短，BM25长度归一化后排在前面
+        assert [r[0] for r in results] == ["carol", "alice"], results
+        assert results[1][2] == ["Python", "Docker"] and results[1][3] == ["Kubernetes"]
+
+        index.remove("alice")
+        index.add("carol", {"Python": 1, "Docker": 1, "Kubernetes": 1})  # 替换旧版本
+        results = index.query(["Python", "Docker", "Kubernetes"], top_k=5)
+        assert [r[0] for r in results] == ["carol"], results
+        assert results[0][1] == 1.0
+        index.close()
+    print("✓ Incremental add/remove is reflected in queries")
+
+def test_compaction_and_reload_from_disk():
+    from app.services.resume_index import ResumeIndex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ResumeIndex(tmp, compact_threshold=1000)
+        for i in range(50):
+            terms = {"Python": 1}
+            if i % 2 == 0:
+                terms["Go"] = i
+            index.add(f"r{i}", terms)
+        index.remove("r10")
+        index.compact()
+        index.add("late", {"Go": 100, "Python": 1})  # 合并后的增量只在日志中
+        index.close()
+
+        reloaded = ResumeIndex(tmp)
+        assert reloaded.stats()["resumes"] == 50, reloaded.stats()
+        assert reloaded.stats()["segment_resumes"] == 49
+        results = reloaded.query(["Go", "Python"], top_k=3)
+        assert [r[0] for r in results] == ["late", "r48", "r46"], results
+        assert "r10" not in [r[0] for r in reloaded.query(["Go"], top_k=100)]
+        reloaded.close()
+    print("✓ Compacted segments and the change journal survive a reload")
+
+def test_idf_weighting_and_vectorized_scoring():
+    from app.services.relevance_scoring import RelevanceScorer
+    from app.services.resume_index import ResumeIndex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ResumeIndex(tmp)
+        for i in range(20):
+            index.add(f"r{i}", {"负责": 3, "Python": 1})
+        index.add("k8s", {"负责": 1, "Kubernetes": 1})
+        index.compact()
+
+        doc_count, document_frequencies, avg_length = index.corpus_stats(["负责", "Kubernetes", "Rust"])
+        assert doc_count == 21 and list(document_frequencies) == [21, 1, 0]
+        assert avg_length > 0
+
+        scorer = RelevanceScorer()
+        coverage, bm25, hits = scorer.score_resumes(
+            ["负责", "Kubernetes"],
+            [{"负责": 5}, {"Kubernetes": 1}, {}],
+            (doc_count, document_frequencies[:2], avg_length)
+        )
+        assert coverage[1] > 0.9 > 0.1 > coverage[0], "Filler terms carry almost no weight"
+        assert bm25[1] > bm25[0] > bm25[2] == 0
+        assert hits.tolist() == [[True, False], [False, True], [False, False]]
+
+        results = index.query(["负责", "Kubernetes"], top_k=1)
+        assert results[0][0] == "k8s", results
+        index.close()
+    print("✓ Job keywords are IDF-weighted over the indexed corpus")
+
+def test_corpus_stats_do_not_create_index():
+    from app.core.config import settings
+    from app.services import resume_index
+    from app.services.relevance_scoring import index_corpus_stats
+
+    original_dir = settings.resume_index_dir
+    resume_index.close_resume_index()
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.resume_index_dir = os.path.join(tmp, "resume_index")
+        try:
+            assert index_corpus_stats(["Python"]) is None
+            assert not os.path.exists(settings.resume_index_dir), "Scoring must not create an empty index on disk"
+
+            resume_index.get_resume_index().add("alice", {"Python": 1})
+            assert index_corpus_stats(["Python"])[0] == 1
+        finally:
+            resume_index.close_resume_index()
+            settings.resume_index_dir = original_dir
+    print("✓ Corpus stats are only read from an index that already exists")
+
+def main():
+    print("Running resume index tests...")
+    test_incremental_add_remove_and_query()
+    test_compaction_and_reload_from_disk()
+    test_idf_weighting_and_vectorized_scoring()
+    test_corpus_stats_do_not_create_index()
+    print("\n🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()